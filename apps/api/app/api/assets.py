@@ -1,16 +1,72 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-import os
-import base64
-import uuid
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+import binascii
+from typing import AsyncGenerator, Optional
 from app.api.deps import get_db
 from app.core.config import settings
 from app.models.projects import Project as ProjectModel
-from app.services.assets import write_bytes
+from app.services.assets import (
+    AssetTooLargeError,
+    asset_attachment,
+    get_asset_path,
+    link_asset,
+    list_assets,
+    store_base64,
+    store_upload,
+)
+from app.services.image_pipeline import image_pipeline
 
 router = APIRouter(prefix="/api/assets", tags=["assets"]) 
 
+# Multipart framing (boundary lines, part headers) allowed on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _asset_response(asset, deduplicated: bool = False, original_filename: str | None = None) -> dict:
+    return {
+        "path": f"assets/{asset.filename}",
+        "absolute_path": get_asset_path(asset),
+        "filename": asset.filename,
+        "original_filename": original_filename or asset.original_filename,
+        "sha256": asset.sha256,
+        "size": asset.size_bytes,
+        "mime_type": asset.mime_type,
+        "deduplicated": deduplicated
+    }
+
+
+async def _capped_body(request: Request, limit: int) -> AsyncGenerator[bytes, None]:
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > limit:
+            raise AssetTooLargeError(f"Asset exceeds {settings.asset_max_upload_bytes} bytes")
+        yield chunk
+
+
+async def _receive_upload(request: Request) -> Optional[UploadFile]:
+    """
+    The multipart "file" part of the request
+
+    The size cap applies to the raw body as it arrives (and to Content-Length up front),
+    so an oversized upload is cut off before it is spooled to disk.
+    """
+    limit = settings.asset_max_upload_bytes + MULTIPART_OVERHEAD_BYTES
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > limit:
+        raise AssetTooLargeError(f"Asset exceeds {settings.asset_max_upload_bytes} bytes")
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        return None
+    form = await MultiPartParser(request.headers, _capped_body(request, limit), max_files=1, max_fields=8).parse()
+    file = form.get("file")
+    if not isinstance(file, UploadFile):
+        await form.close()
+        return None
+    return file
+
 
 class LogoRequest(BaseModel):
     b64_png: str  # Accept base64-encoded PNG (fallback if no OpenAI key)
@@ -21,53 +77,70 @@ async def upload_logo(project_id: str, body: LogoRequest, db: Session = Depends(
     row = db.get(ProjectModel, project_id)
     if not row:
         raise HTTPException(status_code=404, detail="Project not found")
-    project_assets = os.path.join(settings.projects_root, project_id, "assets")
-    data = base64.b64decode(body.b64_png)
-    logo_path = os.path.join(project_assets, "logo.png")
-    write_bytes(logo_path, data)
-    return {"path": f"assets/logo.png"}
+    try:
+        asset, _ = store_base64(db, project_id, body.b64_png, "logo.png", "image/png")
+    except AssetTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Logo must be base64-encoded")
+    link_asset(asset, "logo.png")
+    return {"path": f"assets/logo.png", "sha256": asset.sha256}
 
 
 @router.post("/{project_id}/upload")
-async def upload_image(project_id: str, file: UploadFile = File(...), db: Session = Depends(get_db)):
-    """Upload an image file to project assets directory"""
-    print(f"📤 Image upload request: project_id={project_id}, filename={file.filename}")
-    
+async def upload_image(project_id: str, request: Request, db: Session = Depends(get_db)):
+    """Upload an image file (multipart field "file") to project assets directory"""
     # Verify project exists
     row = db.get(ProjectModel, project_id)
     if not row:
         print(f"❌ Project not found: {project_id}")
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Check if file is an image
-    print(f"📁 File info: content_type={file.content_type}, size={file.size}")
-    if not file.content_type or not file.content_type.startswith('image/'):
-        print(f"❌ Invalid file type: {file.content_type}")
-        raise HTTPException(status_code=400, detail="File must be an image")
-    
-    # Create assets directory if it doesn't exist
-    project_assets = os.path.join(settings.projects_root, project_id, "assets")
-    print(f"📁 Assets directory: {project_assets}")
-    os.makedirs(project_assets, exist_ok=True)
-    
-    # Generate unique filename to avoid conflicts
-    file_extension = os.path.splitext(file.filename or 'image.png')[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(project_assets, unique_filename)
-    print(f"💾 Saving to: {file_path}")
+    try:
+        file = await _receive_upload(request)
+    except AssetTooLargeError as e:
+        print(f"❌ Upload too large for project {project_id}")
+        raise HTTPException(status_code=413, detail=str(e))
+    except MultiPartException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    if file is None:
+        raise HTTPException(status_code=400, detail="Multipart field 'file' is required")
+    print(f"📤 Image upload request: project_id={project_id}, filename={file.filename}")
     
     try:
-        # Save file
-        content = await file.read()
-        write_bytes(file_path, content)
-        print(f"✅ File saved successfully: {len(content)} bytes")
+        # Check if file is an image
+        print(f"📁 File info: content_type={file.content_type}, size={file.size}")
+        if not file.content_type or not file.content_type.startswith('image/'):
+            print(f"❌ Invalid file type: {file.content_type}")
+            raise HTTPException(status_code=400, detail="File must be an image")
         
-        return {
-            "path": f"assets/{unique_filename}",
-            "absolute_path": file_path,
-            "filename": unique_filename,
-            "original_filename": file.filename
-        }
+        # Copied to the asset store in chunks; identical content is stored once per project
+        asset, deduplicated = await store_upload(db, project_id, file)
+        print(f"✅ File saved: {asset.filename} ({asset.size_bytes} bytes{', deduplicated' if deduplicated else ''})")
+        if (asset.mime_type or "").startswith("image/"):
+            # Downscale in the background so a later act/chat referencing it finds it ready
+            image_pipeline.prepare(asset_attachment(asset))
+        return _asset_response(asset, deduplicated, file.filename)
+    except HTTPException:
+        raise
+    except AssetTooLargeError as e:
+        print(f"❌ Upload too large: {file.filename}")
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         print(f"❌ Failed to save file: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
+    finally:
+        await file.close()
+
+
+@router.get("/{project_id}")
+async def get_project_assets(project_id: str, db: Session = Depends(get_db)):
+    """Asset index for a project, most recently uploaded first"""
+    row = db.get(ProjectModel, project_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return [
+        {**_asset_response(asset), "upload_count": asset.upload_count,
+         "created_at": asset.created_at.isoformat(), "last_uploaded_at": asset.last_uploaded_at.isoformat()}
+        for asset in list_assets(db, project_id)
+    ]
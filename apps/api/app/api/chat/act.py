@@ -3,12 +3,14 @@ Act Execution API Endpoints
 Handles CLI execution and AI actions
 """
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+import binascii
 from datetime import datetime
 import uuid
 import asyncio
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_db
 from app.models.projects import Project
@@ -18,6 +20,10 @@ from app.models.commits import Commit
 from app.models.user_requests import UserRequest
 from app.services.cli.unified_manager import UnifiedCLIManager, CLIType
 from app.services.git_ops import commit_all
+from app.services.type_check_daemon import type_check_daemons
+from app.services.checkpoints import create_checkpoint
+from app.services.assets import AssetTooLargeError, asset_attachment, find_asset, store_base64
+from app.services.image_pipeline import image_pipeline
 from app.core.websocket.manager import manager
 from app.core.terminal_ui import ui
 
@@ -31,12 +37,20 @@ class ImageAttachment(BaseModel):
     mime_type: str = "image/jpeg"
 
 
+class AssetRef(BaseModel):
+    """An already uploaded asset, by content hash or by the path the upload returned"""
+    sha256: str | None = None
+    path: str | None = None
+    name: str | None = None
+
+
 class ActRequest(BaseModel):
     instruction: str
     conversation_id: str | None = None
     cli_preference: str | None = None
     fallback_enabled: bool = True
     images: List[ImageAttachment] = []
+    assets: List[AssetRef] = []
     is_initial_prompt: bool = False
 
 
@@ -47,12 +61,45 @@ class ActResponse(BaseModel):
     message: str
 
 
+def _load_attachments(db: Session, project_id: str, body: ActRequest) -> List[Dict[str, Any]]:
+    """Blocking part of resolve_attachments: asset lookups, base64 decoding and file writes"""
+    attachments = []
+    for ref in body.assets:
+        asset = find_asset(db, project_id, sha256=ref.sha256, path=ref.path)
+        if asset is None:
+            raise HTTPException(status_code=400, detail=f"Unknown asset: {ref.sha256 or ref.path}")
+        attachments.append(asset_attachment(asset, ref.name))
+    for image in body.images:
+        try:
+            asset, _ = store_base64(db, project_id, image.base64_data, image.name, image.mime_type)
+        except AssetTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except (binascii.Error, ValueError):
+            raise HTTPException(status_code=400, detail=f"Invalid base64 data for image {image.name}")
+        attachments.append(asset_attachment(asset, image.name))
+    return attachments
+
+
+async def resolve_attachments(db: Session, project_id: str, body: ActRequest) -> List[Dict[str, Any]]:
+    """
+    Turn asset refs (and legacy inline base64 images) into file attachments for the CLI
+
+    Inline images are stored as assets once, so retries and repeated images dedupe and
+    no base64 is carried into the background task. Oversized images start downscaling
+    right away, while the session is being set up.
+    """
+    attachments = await run_in_threadpool(_load_attachments, db, project_id, body)
+    for attachment in attachments:
+        image_pipeline.prepare(attachment)
+    return attachments
+
+
 async def execute_act_instruction(
     project_id: str,
     instruction: str,
     session_id: str,
     conversation_id: str,
-    images: List[ImageAttachment],
+    images: List[Dict[str, Any]],
     db: Session,
     is_initial_prompt: bool = False
 ):
@@ -109,7 +156,7 @@ async def execute_chat_task(
     session: ChatSession,
     instruction: str,
     conversation_id: str,
-    images: List[ImageAttachment],
+    images: List[Dict[str, Any]],
     db: Session,
     cli_preference: CLIType = None,
     fallback_enabled: bool = True,
@@ -260,7 +307,7 @@ async def execute_act_task(
     session: ChatSession,
     instruction: str,
     conversation_id: str,
-    images: List[ImageAttachment],
+    images: List[Dict[str, Any]],
     db: Session,
     cli_preference: CLIType = None,
     fallback_enabled: bool = True,
@@ -309,6 +356,21 @@ async def execute_act_task(
             }
         })
         
+        # Snapshot the tree so this run can be rolled back or inspected in a worktree
+        try:
+            checkpoint = await asyncio.to_thread(
+                create_checkpoint, project_repo_path, f"Before act: {instruction[:72]}"
+            )
+            ui.debug(f"Created checkpoint {checkpoint['id']}", "ACT")
+        except Exception as e:
+            ui.warning(f"Checkpoint failed: {e}", "ACT")
+        
+        # Warm up the incremental type checker used by the edit hook
+        try:
+            await type_check_daemons.ensure_started(project_id, project_repo_path)
+        except Exception as e:
+            ui.warning(f"Type-check daemon unavailable: {e}", "ACT")
+        
         # Initialize CLI manager
         cli_manager = UnifiedCLIManager(
             project_id=project_id,
@@ -511,6 +573,8 @@ async def run_act(
         ui.error(f"Project {project_id} not found", "ACT API")
         raise HTTPException(status_code=404, detail="Project not found")
     
+    attachments = await resolve_attachments(db, project_id, body)
+    
     # Determine CLI preference
     cli_preference = CLIType(body.cli_preference or project.preferred_cli)
     fallback_enabled = body.fallback_enabled if body.fallback_enabled is not None else project.fallback_enabled
@@ -527,7 +591,8 @@ async def run_act(
             "type": "act_instruction",
             "cli_preference": cli_preference.value,
             "fallback_enabled": fallback_enabled,
-            "has_images": len(body.images) > 0
+            "has_images": len(attachments) > 0,
+            "attachments": [{"name": a["name"], "sha256": a["sha256"]} for a in attachments]
         },
         conversation_id=conversation_id,
         created_at=datetime.utcnow()
@@ -601,7 +666,7 @@ async def run_act(
         session,
         body.instruction,
         conversation_id,
-        body.images,
+        attachments,
         db,
         cli_preference,
         fallback_enabled,
@@ -631,6 +696,8 @@ async def run_chat(
         ui.error(f"Project {project_id} not found", "CHAT API")
         raise HTTPException(status_code=404, detail="Project not found")
     
+    attachments = await resolve_attachments(db, project_id, body)
+    
     # Determine CLI preference
     cli_preference = CLIType(body.cli_preference or project.preferred_cli)
     fallback_enabled = body.fallback_enabled if body.fallback_enabled is not None else project.fallback_enabled
@@ -647,7 +714,8 @@ async def run_chat(
             "type": "chat_instruction",
             "cli_preference": cli_preference.value,
             "fallback_enabled": fallback_enabled,
-            "has_images": len(body.images) > 0
+            "has_images": len(attachments) > 0,
+            "attachments": [{"name": a["name"], "sha256": a["sha256"]} for a in attachments]
         },
         conversation_id=conversation_id,
         created_at=datetime.utcnow()
@@ -707,7 +775,7 @@ async def run_chat(
         session,
         body.instruction,
         conversation_id,
-        body.images,
+        attachments,
         db,
         cli_preference,
         fallback_enabled,
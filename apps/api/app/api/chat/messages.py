@@ -2,17 +2,31 @@
 Chat Messages API Endpoints
 Handles message CRUD operations
 """
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List, Optional
 from datetime import datetime
 import uuid
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_db
+from app.db.session import SessionLocal
 from app.models.projects import Project
 from app.models.messages import Message
 from app.models.user_requests import UserRequest
+from app.services.message_payloads import load_payload
+from app.services.message_archive import (
+    archive_project_messages,
+    clear_archive,
+    find_archived_message,
+    format_key_time,
+    message_key,
+    read_archived_messages,
+)
+from app.services.message_search import search_messages
+from app.services.project_summaries import refresh_project_summary
 from app.core.websocket.manager import manager
 
 
@@ -32,6 +46,24 @@ class MessageResponse(BaseModel):
     created_at: datetime
 
 
+class MessageSearchResult(BaseModel):
+    id: str
+    role: str
+    message_type: str | None
+    conversation_id: str | None = None
+    session_id: str | None = None
+    created_at: datetime
+    snippet: str
+
+
+class MessageSearchResponse(BaseModel):
+    query: str
+    results: List[MessageSearchResult]
+    limit: int
+    offset: int
+    has_more: bool
+
+
 class SendMessageRequest(BaseModel):
     content: str
     role: str = "user"
@@ -41,17 +73,28 @@ class SendMessageRequest(BaseModel):
 @router.get("/{project_id}/messages", response_model=List[MessageResponse])
 async def get_messages(
     project_id: str, 
+    response: Response,
     conversation_id: Optional[str] = None, 
     cli_filter: Optional[str] = None,
-    limit: int = Query(100, le=1000),
+    limit: int = Query(100, ge=1, le=1000),
+    before_id: Optional[str] = None,
+    after_id: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get messages for a project with optional filters"""
+    """
+    Get visible messages for a project with optional filters, oldest first
+
+    Pages are keyset-based on (created_at, id): pass the first returned id as
+    `before_id` to load older messages, or the last one as `after_id` for newer ones.
+    The `X-Has-More` header tells whether another page exists in that direction.
+    """
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+    if before_id and after_id:
+        raise HTTPException(status_code=400, detail="Use either before_id or after_id, not both")
     
-    query = db.query(Message).filter(Message.project_id == project_id)
+    query = db.query(Message).filter(Message.project_id == project_id, Message.hidden.is_(False))
     
     if conversation_id:
         query = query.filter(Message.conversation_id == conversation_id)
@@ -59,16 +102,38 @@ async def get_messages(
     if cli_filter:
         query = query.filter(Message.cli_source == cli_filter)
     
-    messages = query.order_by(Message.created_at.desc()).limit(limit).all()
+    cursor_key = None
+    cursor_id = before_id or after_id
+    if cursor_id:
+        cursor = db.query(Message.created_at, Message.id).filter(
+            Message.id == cursor_id, Message.project_id == project_id
+        ).first()
+        if cursor:
+            cursor_key = (format_key_time(cursor.created_at), cursor.id)
+            cursor_time = cursor.created_at
+        else:
+            archived_cursor = find_archived_message(project_id, cursor_id)
+            if not archived_cursor:
+                raise HTTPException(status_code=404, detail="Cursor message not found")
+            cursor_key = message_key(archived_cursor)
+            cursor_time = datetime.fromisoformat(archived_cursor["created_at"])
+        if before_id:
+            query = query.filter(or_(
+                Message.created_at < cursor_time,
+                and_(Message.created_at == cursor_time, Message.id < cursor_id)
+            ))
+        else:
+            query = query.filter(or_(
+                Message.created_at > cursor_time,
+                and_(Message.created_at == cursor_time, Message.id > cursor_id)
+            ))
     
-    # Filter out messages marked as hidden from UI
-    filtered_messages = []
-    for msg in messages:
-        if msg.metadata_json and msg.metadata_json.get("hidden_from_ui", False):
-            continue  # Skip hidden messages
-        filtered_messages.append(msg)
+    if after_id:
+        rows = query.order_by(Message.created_at.asc(), Message.id.asc()).limit(limit + 1).all()
+    else:
+        rows = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1).all()
     
-    return [
+    messages = [
         MessageResponse(
             id=msg.id,
             role=msg.role,
@@ -80,8 +145,108 @@ async def get_messages(
             conversation_id=msg.conversation_id,
             cli_source=msg.metadata_json.get("cli_type") if msg.metadata_json else None,
             created_at=msg.created_at
-        ) for msg in reversed(filtered_messages)
+        ) for msg in rows
     ]
+    
+    # Merge in archived conversations (older history moved out of the database). When the
+    # database alone filled the page, only archived rows ahead of its last row can matter.
+    bound = (format_key_time(rows[limit].created_at), rows[limit].id) if len(rows) > limit else None
+    archived = read_archived_messages(
+        project_id,
+        limit + 1,
+        before=cursor_key if before_id else None,
+        after=cursor_key if after_id else None,
+        conversation_id=conversation_id,
+        cli_source=cli_filter,
+        bound=bound
+    )
+    if archived:
+        seen = {msg.id for msg in messages}
+        messages.extend(
+            MessageResponse(
+                id=record["id"],
+                role=record["role"],
+                message_type=record["message_type"],
+                content=record["content"],
+                metadata_json=record["metadata_json"],
+                parent_message_id=record["parent_message_id"],
+                session_id=record["session_id"],
+                conversation_id=record["conversation_id"],
+                cli_source=record["metadata_json"].get("cli_type") if record["metadata_json"] else None,
+                created_at=datetime.fromisoformat(record["created_at"])
+            ) for record in archived if record["id"] not in seen
+        )
+        messages.sort(key=lambda m: (format_key_time(m.created_at), m.id), reverse=not after_id)
+    
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if not after_id:
+        messages.reverse()
+    
+    response.headers["X-Has-More"] = "true" if has_more else "false"
+    return messages
+
+
+@router.get("/{project_id}/messages/search", response_model=MessageSearchResponse)
+async def search_project_messages(
+    project_id: str,
+    q: str = Query(..., min_length=1, max_length=256),
+    conversation_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over visible chat messages; `snippet` is HTML-escaped with matches wrapped in <mark>"""
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    rows = search_messages(db, project_id, q, limit=limit + 1, offset=offset, conversation_id=conversation_id)
+    return MessageSearchResponse(
+        query=q,
+        results=[MessageSearchResult(**row) for row in rows[:limit]],
+        limit=limit,
+        offset=offset,
+        has_more=len(rows) > limit
+    )
+
+
+@router.get("/{project_id}/messages/{message_id}/payload")
+async def get_message_payload(project_id: str, message_id: str, db: Session = Depends(get_db)):
+    """Load the raw CLI event and full tool input stored outside a message's metadata"""
+    message = db.query(Message).filter(Message.id == message_id, Message.project_id == project_id).first()
+    if message:
+        payload = load_payload(db, message_id)
+    else:
+        archived = find_archived_message(project_id, message_id)
+        if not archived:
+            raise HTTPException(status_code=404, detail="Message not found")
+        payload = archived.get("payload")
+    
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Message has no stored payload")
+    
+    return {"message_id": message_id, "payload": payload}
+
+
+@router.post("/{project_id}/messages/archive")
+async def archive_messages(
+    project_id: str,
+    older_than_days: int = Query(30, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Move conversations idle for `older_than_days` to compressed archive segments"""
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    def archive() -> int:
+        # Compression, fsyncs and batch deletes run off the event loop, in their own session
+        with SessionLocal() as session:
+            return archive_project_messages(session, project_id, older_than_days)
+    
+    archived = await run_in_threadpool(archive)
+    return {"archived": archived}
 
 
 @router.get("/{project_id}/active-session")
@@ -218,7 +383,10 @@ async def clear_messages(
         query = query.filter(Message.conversation_id == conversation_id)
     
     deleted_count = query.delete()
+    # Bulk deletes bypass ORM events, so recompute the project summary explicitly
+    refresh_project_summary(db.connection(), project_id)
     db.commit()
+    clear_archive(project_id, conversation_id)
     
     await manager.send_message(project_id, {
         "type": "messages_cleared",
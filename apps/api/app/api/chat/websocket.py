@@ -7,6 +7,7 @@ import logging
 
 from app.core.websocket.manager import manager
 from app.core.terminal_ui import ui
+from app.services.env_watcher import env_watcher
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -18,6 +19,8 @@ async def websocket_endpoint(websocket: WebSocket, project_id: str):
     ui.info(f"Connection attempt for project: {project_id}", "WebSocket")
     try:
         await manager.connect(websocket, project_id)
+        # Keep env_vars in step with agent edits to .env while the project is open
+        env_watcher.watch(project_id)
         
         while True:
             try:
@@ -34,4 +37,6 @@ async def websocket_endpoint(websocket: WebSocket, project_id: str):
     except Exception as e:
         ui.error(f"Setup error for project {project_id}: {e}", "WebSocket")
     finally:
-        manager.disconnect(websocket, project_id)
\ No newline at end of file
+        manager.disconnect(websocket, project_id)
+        if project_id not in manager.active_connections:
+            await env_watcher.unwatch(project_id)
\ No newline at end of file
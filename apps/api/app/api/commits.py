@@ -1,12 +1,24 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+import asyncio
 import os
+import subprocess
 from app.core.config import settings
+from app.core.terminal_ui import ui
 from app.api.deps import get_db
 from sqlalchemy.orm import Session
 from app.models.projects import Project as ProjectModel
 from app.services.git_ops import list_commits, show_diff, hard_reset
+from app.services.checkpoints import (
+    create_checkpoint,
+    list_checkpoints,
+    delete_checkpoint,
+    restore_checkpoint,
+    list_worktrees,
+    materialize_worktree,
+    remove_worktree,
+)
 
 router = APIRouter(prefix="/api/commits", tags=["commits"])
 
@@ -19,6 +31,17 @@ class Commit(BaseModel):
     message: str
 
 
+class CheckpointCreate(BaseModel):
+    label: Optional[str] = None
+
+
+def _get_repo(project_id: str, db: Session) -> str:
+    row = db.get(ProjectModel, project_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return os.path.join(settings.projects_root, project_id, "repo")
+
+
 @router.get("/{project_id}", response_model=List[Commit])
 async def commits(project_id: str, db: Session = Depends(get_db)) -> List[Commit]:
     row = db.get(ProjectModel, project_id)
@@ -43,5 +66,66 @@ async def revert_to(project_id: str, commit_sha: str, db: Session = Depends(get_
     if not row:
         raise HTTPException(status_code=404, detail="Project not found")
     repo = os.path.join(settings.projects_root, project_id, "repo")
-    hard_reset(repo, commit_sha)
+    # Keep the discarded state recoverable, and keep git off the event loop
+    try:
+        checkpoint = await asyncio.to_thread(create_checkpoint, repo, f"Before revert to {commit_sha[:8]}")
+    except (subprocess.CalledProcessError, OSError) as e:
+        # e.g. no git identity or an empty repo: the revert itself must still work
+        detail = getattr(e, "stderr", None) or e
+        ui.warning(f"Checkpoint before revert failed for {project_id}: {detail}", "Checkpoints")
+        checkpoint = None
+    await asyncio.to_thread(hard_reset, repo, commit_sha)
+    return {"ok": True, "checkpoint_id": checkpoint["id"] if checkpoint else None}
+
+
+@router.get("/{project_id}/checkpoints")
+async def get_checkpoints(project_id: str, db: Session = Depends(get_db)):
+    repo = _get_repo(project_id, db)
+    return {
+        "checkpoints": await asyncio.to_thread(list_checkpoints, repo),
+        "worktrees": list_worktrees(project_id)
+    }
+
+
+@router.post("/{project_id}/checkpoints")
+async def post_checkpoint(project_id: str, body: CheckpointCreate, db: Session = Depends(get_db)):
+    repo = _get_repo(project_id, db)
+    return await asyncio.to_thread(create_checkpoint, repo, body.label or "Manual checkpoint")
+
+
+@router.post("/{project_id}/checkpoints/{checkpoint_id}/restore")
+async def post_restore_checkpoint(project_id: str, checkpoint_id: str, db: Session = Depends(get_db)):
+    repo = _get_repo(project_id, db)
+    try:
+        return await asyncio.to_thread(restore_checkpoint, repo, checkpoint_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.delete("/{project_id}/checkpoints/{checkpoint_id}")
+async def remove_checkpoint(project_id: str, checkpoint_id: str, db: Session = Depends(get_db)):
+    repo = _get_repo(project_id, db)
+    try:
+        await asyncio.to_thread(delete_checkpoint, repo, checkpoint_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"ok": True}
+
+
+@router.post("/{project_id}/checkpoints/{checkpoint_id}/worktree")
+async def post_checkpoint_worktree(project_id: str, checkpoint_id: str, db: Session = Depends(get_db)):
+    repo = _get_repo(project_id, db)
+    try:
+        return await asyncio.to_thread(materialize_worktree, project_id, repo, checkpoint_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.delete("/{project_id}/checkpoints/{checkpoint_id}/worktree")
+async def delete_checkpoint_worktree(project_id: str, checkpoint_id: str, db: Session = Depends(get_db)):
+    repo = _get_repo(project_id, db)
+    try:
+        await asyncio.to_thread(remove_worktree, project_id, repo, checkpoint_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"ok": True}
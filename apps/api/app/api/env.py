@@ -15,7 +15,6 @@ from app.services.env_manager import (
     sync_db_to_env_file,
     get_env_var_conflicts
 )
-from app.core.crypto import secret_box
 
 router = APIRouter(prefix="/api/env", tags=["env"]) 
 
@@ -63,30 +62,25 @@ async def get_env_vars(project_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Project not found")
     
     try:
-        # Get encrypted vars from DB
+        # Decrypted values come from the per-project cache
+        values = load_env_vars_from_db(db, project_id)
         db_env_vars = db.query(EnvVar).filter(
             EnvVar.project_id == project_id
         ).all()
         
-        result = []
-        for env_var in db_env_vars:
-            try:
-                # Decrypt value for API response
-                decrypted_value = secret_box.decrypt(env_var.value_encrypted)
-                result.append(EnvVarResponse(
-                    id=env_var.id,
-                    key=env_var.key,
-                    value=decrypted_value,
-                    scope=env_var.scope,
-                    var_type=env_var.var_type,
-                    is_secret=env_var.is_secret,
-                    description=env_var.description
-                ))
-            except Exception as e:
-                print(f"⚠️  Failed to decrypt env var {env_var.key}: {e}")
-                continue
-        
-        return result
+        return [
+            EnvVarResponse(
+                id=env_var.id,
+                key=env_var.key,
+                value=values[env_var.key],
+                scope=env_var.scope,
+                var_type=env_var.var_type,
+                is_secret=env_var.is_secret,
+                description=env_var.description
+            )
+            for env_var in db_env_vars
+            if env_var.key in values
+        ]
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get env vars: {str(e)}")
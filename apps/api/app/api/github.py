@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
 import os
+import asyncio
 import logging
 
 from app.api.deps import get_db
@@ -15,11 +16,11 @@ from app.services.github_service import GitHubService, GitHubAPIError, check_rep
 from app.services.token_service import get_token
 from app.services.git_ops import (
     add_remote, 
-    push_to_remote, 
     initialize_main_branch, 
     set_git_config,
     commit_all
 )
+from app.services.github_push_queue import github_push_queue
 from uuid import uuid4
 
 logger = logging.getLogger(__name__)
@@ -42,6 +43,7 @@ class GitPushResponse(BaseModel):
     success: bool
     message: str
     branch: Optional[str] = None
+    queued: bool = False
 
 
 @router.get("/github/check-repo/{repo_name}")
@@ -296,8 +298,13 @@ async def disconnect_github_repository(project_id: str, db: Session = Depends(ge
 
 
 @router.post("/projects/{project_id}/github/push", response_model=GitPushResponse)
-async def push_github_repository(project_id: str, db: Session = Depends(get_db)):
-    """Push current repo to remote origin. Used by Publish/Update in UI."""
+async def push_github_repository(project_id: str, wait: bool = True, db: Session = Depends(get_db)):
+    """
+    Push current repo to remote origin. Used by Publish/Update in UI.
+
+    With wait=false the push runs in the background and completion is reported
+    over WebSocket as a `github_push` event.
+    """
     # Check project
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
@@ -330,44 +337,16 @@ async def push_github_repository(project_id: str, db: Session = Depends(get_db))
     # Branch
     default_branch = connection.service_data.get("default_branch", "main")
 
-    # Commit any pending changes (optional harmless)
-    commit_all(repo_path, "Publish from Lovable UI")
-
-    # Push
-    result = push_to_remote(repo_path, "origin", default_branch)
-    if not result.get("success"):
-        raise HTTPException(status_code=500, detail=f"Git push failed: {result.get('error', 'unknown')}")
-
-    # Update metadata on connections for UI (published flag)
-    try:
-        from datetime import datetime
-        # Update GitHub connection record
-        svc = connection
-        data = svc.service_data or {}
-        data.update({
-            "last_push_at": datetime.utcnow().isoformat() + "Z",
-            "last_pushed_branch": default_branch,
-        })
-        svc.service_data = data
-        db.commit()
-    except Exception as e:
-        logger = logging.getLogger(__name__)
-        logger.warning(f"Failed updating GitHub connection after push: {e}")
+    # Commit and push in the project's background worker; concurrent requests are coalesced
+    push_future = github_push_queue.enqueue(project_id, repo_path, default_branch)
+    if not wait:
+        return GitPushResponse(success=True, message="Push queued", branch=default_branch, queued=True)
 
-    # If Vercel connected, ensure we store computed deployment URL for convenience
     try:
-        vercel_conn = db.query(ProjectServiceConnection).filter(
-            ProjectServiceConnection.project_id == project_id,
-            ProjectServiceConnection.provider == "vercel"
-        ).first()
-        if vercel_conn:
-            vercel_data = vercel_conn.service_data or {}
-            # Don't set deployment_url until actual deployment happens
-            vercel_data["last_published_at"] = data.get("last_push_at")
-            vercel_conn.service_data = vercel_data
-            db.commit()
+        result = await asyncio.shield(push_future)
     except Exception as e:
-        logger = logging.getLogger(__name__)
-        logger.warning(f"Failed updating Vercel connection after push: {e}")
+        raise HTTPException(status_code=500, detail=f"Git push failed: {e}")
+    if not result.get("success"):
+        raise HTTPException(status_code=500, detail=f"Git push failed: {result.get('error', 'unknown')}")
 
     return GitPushResponse(success=True, message="Pushed to GitHub", branch=default_branch)
\ No newline at end of file
@@ -2,11 +2,11 @@
 Project CRUD Operations
 Handles create, read, update, delete operations for projects
 """
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request, Response
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
-from sqlalchemy import desc, func
+from sqlalchemy import desc
 from sqlalchemy.orm import Session
 import re
 import uuid
@@ -17,8 +17,10 @@ from app.api.deps import get_db
 from app.models.projects import Project as ProjectModel
 from app.models.messages import Message
 from app.models.project_services import ProjectServiceConnection
+from app.models.project_summaries import ProjectSummary
 from app.models.sessions import Session as SessionModel
 from app.services.project.initializer import initialize_project
+from app.services.project_summaries import compute_projects_etag, default_services
 from app.core.websocket.manager import manager as websocket_manager
 
 # Project ID validation regex
@@ -208,51 +210,28 @@ async def projects_health():
 
 
 @router.get("/", response_model=List[Project])
-async def list_projects(db: Session = Depends(get_db)) -> List[Project]:
+async def list_projects(request: Request, response: Response, db: Session = Depends(get_db)) -> List[Project]:
     """List all projects with their status and last activity"""
     
-    # Get projects with their last message time using subquery
-    last_message_subquery = (
-        db.query(
-            Message.project_id,
-            func.max(Message.created_at).label('last_message_at')
-        )
-        .group_by(Message.project_id)
-        .subquery()
-    )
+    # Conditional GET: skip building the list when nothing changed
+    etag = compute_projects_etag(db)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     
-    # Query projects with last message time
-    projects_with_last_message = (
-        db.query(ProjectModel, last_message_subquery.c.last_message_at)
-        .outerjoin(
-            last_message_subquery,
-            ProjectModel.id == last_message_subquery.c.project_id
-        )
+    # One indexed join against the materialized summaries
+    projects_with_summary = (
+        db.query(ProjectModel, ProjectSummary)
+        .outerjoin(ProjectSummary, ProjectModel.id == ProjectSummary.project_id)
         .order_by(desc(ProjectModel.created_at))
         .all()
     )
     
     result: List[Project] = []
-    for project, last_message_at in projects_with_last_message:
-        # Get service connections for this project
-        services = {}
-        service_connections = db.query(ProjectServiceConnection).filter(
-            ProjectServiceConnection.project_id == project.id
-        ).all()
-        
-        for conn in service_connections:
-            services[conn.provider] = {
-                "connected": True,
-                "status": conn.status
-            }
-        
-        # Ensure all service types are represented
-        for provider in ["github", "supabase", "vercel"]:
-            if provider not in services:
-                services[provider] = {
-                    "connected": False,
-                    "status": "disconnected"
-                }
+    for project, summary in projects_with_summary:
+        services = default_services()
+        if summary and summary.services:
+            services.update(summary.services)
         
         # Extract AI-generated info from settings
         ai_info = project.settings or {}
@@ -265,7 +244,7 @@ async def list_projects(db: Session = Depends(get_db)) -> List[Project]:
             preview_url=project.preview_url,
             created_at=project.created_at,
             last_active_at=project.last_active_at,
-            last_message_at=last_message_at,
+            last_message_at=summary.last_message_at if summary else None,
             services=services,
             features=ai_info.get('features'),
             tech_stack=ai_info.get('tech_stack'),
@@ -468,6 +447,10 @@ async def delete_project(project_id: str, db: Session = Depends(get_db)):
         ProjectServiceConnection.project_id == project_id
     ).delete()
     
+    # Bulk deletes bypass the ORM events that maintain the summary; drop it explicitly
+    # rather than relying on the foreign key cascade being enforced
+    db.query(ProjectSummary).filter(ProjectSummary.project_id == project_id).delete()
+    
     # Delete project
     db.delete(project)
     db.commit()
@@ -477,7 +460,7 @@ async def delete_project(project_id: str, db: Session = Depends(get_db)):
         from app.services.project.initializer import cleanup_project
         cleanup_success = await cleanup_project(project_id)
         if cleanup_success:
-            print(f"✅ Project files deleted successfully for {project_id}")
+            print(f"✅ Project files moved to trash for {project_id}, removing in background")
         else:
             print(f"⚠️ Project files may not have been fully deleted for {project_id}")
     except Exception as e:
@@ -0,0 +1,94 @@
+"""
+Project Usage
+Session, token, cost and duration totals served from the daily usage rollups,
+plus per-tool latency statistics
+"""
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.models.projects import Project as ProjectModel
+from app.services.tool_telemetry import get_tool_stats
+from app.services.usage import GROUP_COLUMNS, get_project_usage
+
+
+router = APIRouter()
+
+
+class UsageRow(BaseModel):
+    day: Optional[date] = None
+    cli_type: Optional[str] = None
+    model: Optional[str] = None
+    sessions: int
+    turns: int
+    messages: int
+    tools_used: int
+    total_tokens: int
+    total_cost_usd: float
+    duration_ms: int
+    avg_duration_ms: int
+    last_session_at: Optional[datetime] = None
+
+
+class UsageResponse(BaseModel):
+    project_id: str
+    since: date
+    until: date
+    group_by: List[str]
+    totals: UsageRow
+    rows: List[UsageRow]
+
+
+@router.get("/{project_id}/usage", response_model=UsageResponse)
+async def get_usage(
+    project_id: str,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    group_by: List[str] = Query(default=["day"]),
+    db: Session = Depends(get_db)
+):
+    """Usage totals for a date range (default: last 30 days), grouped by day, cli_type and/or model"""
+    if not db.get(ProjectModel, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    unknown = [name for name in group_by if name not in GROUP_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported group_by: {', '.join(unknown)}")
+
+    return get_project_usage(db, project_id, since=since, until=until, group_by=group_by)
+
+
+class ToolLatencyBucket(BaseModel):
+    le_ms: Optional[int] = None  # None = slower than the last bound
+    count: int
+
+
+class ToolStats(BaseModel):
+    tool_name: str
+    calls: int
+    errors: int
+    error_rate: float
+    incomplete: int
+    total_duration_ms: int
+    avg_duration_ms: int
+    p50_ms: Optional[int] = None
+    p95_ms: Optional[int] = None
+    max_duration_ms: Optional[int] = None
+    histogram: List[ToolLatencyBucket]
+
+
+@router.get("/{project_id}/usage/tools", response_model=List[ToolStats])
+async def get_tool_usage(
+    project_id: str,
+    days: int = Query(default=30, ge=1, le=365),
+    db: Session = Depends(get_db)
+):
+    """Per-tool latency histograms and error rates, tools with the most total run time first"""
+    if not db.get(ProjectModel, project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    return get_tool_stats(db, project_id, days=days)
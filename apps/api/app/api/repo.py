@@ -1,12 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional
+from urllib.parse import quote
 import os
+import time
 from pathlib import Path
 from app.core.config import settings
 from app.api.deps import get_db
 from sqlalchemy.orm import Session
 from app.models.projects import Project as ProjectModel
+from app.services.code_search import search_project
+from app.services.repo_files import (
+    guess_mime_type,
+    is_binary_file,
+    iter_file_range,
+    parse_range_header,
+    read_line_window,
+    read_text_file
+)
 
 router = APIRouter(prefix="/api/repo", tags=["repo"])
 
@@ -57,8 +70,7 @@ async def repo_tree(project_id: str, dir: str = Query("."), db: Session = Depend
     return entries
 
 
-@router.get("/{project_id}/file")
-async def repo_file(project_id: str, path: str, db: Session = Depends(get_db)):
+def _resolve_repo_file(project_id: str, path: str, db: Session) -> str:
     row = db.get(ProjectModel, project_id)
     if not row:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -66,5 +78,116 @@ async def repo_file(project_id: str, path: str, db: Session = Depends(get_db)):
     target = _safe_join(repo_root, path)
     if not os.path.isfile(target):
         raise HTTPException(status_code=404, detail="File not found")
-    with open(target, "r", encoding="utf-8", errors="ignore") as f:
-        return {"path": path, "content": f.read()}
+    return target
+
+
+@router.get("/{project_id}/file")
+async def repo_file(
+    project_id: str,
+    path: str,
+    start_line: Optional[int] = Query(None, ge=1),
+    max_lines: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db)
+):
+    """
+    Return file content as JSON.
+    Binary files are not decoded; use /raw for their bytes. Text files larger than
+    the inline limit (or any request with start_line/max_lines) get a line window.
+    """
+    target = _resolve_repo_file(project_id, path, db)
+    size = os.path.getsize(target)
+
+    if await run_in_threadpool(is_binary_file, target):
+        return {
+            "path": path,
+            "content": "",
+            "binary": True,
+            "size": size,
+            "mime_type": guess_mime_type(target),
+            "raw_url": f"/api/repo/{project_id}/raw?path={quote(path)}"
+        }
+
+    windowed = start_line is not None or max_lines is not None or size > settings.repo_file_inline_max_bytes
+    if not windowed:
+        content = await run_in_threadpool(read_text_file, target)
+        return {"path": path, "content": content, "binary": False, "size": size}
+
+    window = await run_in_threadpool(
+        read_line_window,
+        target,
+        start_line or 1,
+        max_lines or settings.repo_file_window_lines,
+        settings.repo_file_inline_max_bytes
+    )
+    return {
+        "path": path,
+        "binary": False,
+        "size": size,
+        **window,
+        # truncated: more of the file exists past this window; line_truncated: the last line was cut
+        "truncated": window["has_more"],
+        "line_truncated": window["truncated"]
+    }
+
+
+@router.get("/{project_id}/raw")
+async def repo_file_raw(project_id: str, path: str, request: Request, db: Session = Depends(get_db)):
+    """Stream raw file bytes with single-range HTTP Range support"""
+    target = _resolve_repo_file(project_id, path, db)
+    size = os.path.getsize(target)
+    media_type = guess_mime_type(target)
+
+    try:
+        byte_range = parse_range_header(request.headers.get("range"), size)
+    except ValueError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        # Full body: let the server use sendfile / pathsend where available
+        return FileResponse(target, media_type=media_type, headers={"Accept-Ranges": "bytes"})
+
+    start, end = byte_range
+    return StreamingResponse(
+        iterate_in_threadpool(iter_file_range(target, start, end)),
+        status_code=206,
+        media_type=media_type,
+        headers={
+            "Accept-Ranges": "bytes",
+            "Content-Range": f"bytes {start}-{end}/{size}",
+            "Content-Length": str(end - start + 1)
+        }
+    )
+
+
+@router.get("/{project_id}/search")
+async def repo_search(
+    project_id: str,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=200),
+    context: int = Query(2, ge=0, le=10),
+    case_sensitive: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Search repository contents using the per-project trigram index"""
+    row = db.get(ProjectModel, project_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Project not found")
+    repo_root = os.path.join(settings.projects_root, project_id, "repo")
+    if not os.path.isdir(repo_root):
+        raise HTTPException(status_code=400, detail="Project repository not found")
+
+    started = time.perf_counter()
+    found = await run_in_threadpool(
+        search_project,
+        project_id,
+        q,
+        limit=limit,
+        context_lines=context,
+        case_sensitive=case_sensitive
+    )
+    return {
+        "query": q,
+        "results": found["results"],
+        "skipped_files": found["skipped_files"],
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
@@ -2,8 +2,10 @@ import subprocess
 import asyncio
 import json
 from typing import Dict, Any
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from app.api.deps import get_db
 from app.services.cli.unified_manager import CLIType, CursorAgentCLI
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
@@ -143,4 +145,46 @@ async def update_global_settings(settings: GlobalSettingsModel) -> Dict[str, Any
         "cli_settings": settings.cli_settings
     })
     
-    return {"success": True, "settings": GLOBAL_SETTINGS}
\ No newline at end of file
+    return {"success": True, "settings": GLOBAL_SETTINGS}
+
+
+def _rotation_status(db: Session, job) -> Dict[str, Any]:
+    from app.core.crypto import secret_box
+    from app.services.key_rotation import count_pending, key_rotation_runner
+
+    return {
+        "current_key_id": secret_box.primary_key_id,
+        "configured_key_ids": secret_box.key_ids,
+        "pending": count_pending(db),
+        "job": {
+            "id": job.id,
+            "target_key_id": job.target_key_id,
+            "status": job.status,
+            "active": key_rotation_runner.running and key_rotation_runner.job_id == job.id,
+            "total": job.total,
+            "processed": job.processed,
+            "rotated": job.rotated,
+            "failed": job.failed,
+            "error": job.error,
+            "started_at": job.started_at.isoformat(),
+            "updated_at": job.updated_at.isoformat(),
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None
+        } if job else None
+    }
+
+
+@router.get("/encryption")
+async def get_encryption_status(db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """Current key, env vars still under older keys and the latest rotation job"""
+    from app.services.key_rotation import get_rotation
+    return _rotation_status(db, get_rotation(db))
+
+
+@router.post("/encryption/rotate")
+async def rotate_encryption_key(db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """Re-encrypt env vars under the first key in ENCRYPTION_KEYS, in the background"""
+    from app.services.key_rotation import key_rotation_runner, start_rotation
+    job = start_rotation(db)
+    if job.status == "running":
+        key_rotation_runner.run(job.id)
+    return _rotation_status(db, job)
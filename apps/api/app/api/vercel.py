@@ -12,7 +12,7 @@ from datetime import datetime
 from app.api.deps import get_db
 from app.models.projects import Project
 from app.models.project_services import ProjectServiceConnection
-from app.services.vercel_service import VercelService, VercelAPIError, check_project_availability, start_deployment_monitoring, stop_deployment_monitoring, get_active_monitoring_projects
+from app.services.vercel_service import VercelService, VercelAPIError, check_project_availability, start_deployment_monitoring, stop_deployment_monitoring, get_active_monitoring_projects, deployment_poller
 from app.services.token_service import get_token
 
 logger = logging.getLogger(__name__)
@@ -305,13 +305,11 @@ async def deploy_to_vercel(
 
         # 백그라운드 배포 모니터링 시작
         try:
-            from app.api.deps import SessionLocal
             logger.info(f"🚀 Starting background monitoring for deployment {deployment_result['deployment_id']}")
             await start_deployment_monitoring(
                 project_id=project_id,
                 deployment_id=deployment_result["deployment_id"],
-                vercel_token=vercel_token,
-                db_session_factory=SessionLocal
+                vercel_token=vercel_token
             )
             logger.info(f"🚀 Background monitoring started successfully")
         except Exception as e:
@@ -444,7 +442,8 @@ async def get_current_deployment_status(project_id: str, db: Session = Depends(g
         "deployment_id": current_deployment["deployment_id"],
         "status": current_deployment["status"],
         "deployment_url": current_deployment["deployment_url"],
-        "last_checked_at": current_deployment["last_checked_at"]
+        # Unchanged polls are not written to the database; the poller knows the latest check
+        "last_checked_at": deployment_poller.last_checked_at(project_id) or current_deployment.get("last_checked_at")
     }
 
 
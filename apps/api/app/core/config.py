@@ -31,21 +31,87 @@ def find_project_root() -> Path:
 PROJECT_ROOT = find_project_root()
 
 
+def normalize_database_url(url: str) -> str:
+    """Map plain PostgreSQL URLs (e.g. from hosting providers) to the psycopg 3 driver"""
+    for prefix in ("postgres://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix):]
+    return url
+
+
 class Settings(BaseModel):
     api_port: int = int(os.getenv("API_PORT", "8080"))
     
     # SQLite database URL
-    database_url: str = os.getenv(
+    database_url: str = normalize_database_url(os.getenv(
         "DATABASE_URL",
         f"sqlite:///{PROJECT_ROOT / 'data' / 'cc.db'}",
-    )
+    ))
+    
+    # Connection pool for server databases (PostgreSQL)
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    db_pool_timeout: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
     
     # Use project root relative paths
     projects_root: str = os.getenv("PROJECTS_ROOT", str(PROJECT_ROOT / "data" / "projects"))
     projects_root_host: str = os.getenv("PROJECTS_ROOT_HOST", os.getenv("PROJECTS_ROOT", str(PROJECT_ROOT / "data" / "projects")))
     
+    # SQLite performance profile (ignored for other databases)
+    sqlite_journal_mode: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    sqlite_cache_size_kb: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    sqlite_maintenance_interval_minutes: float = float(os.getenv("SQLITE_MAINTENANCE_INTERVAL_MINUTES", "10"))
+    # Serialize write transactions from all sessions through one process-wide gate
+    sqlite_single_writer: bool = os.getenv("SQLITE_SINGLE_WRITER", "false").lower() in ("1", "true", "yes")
+    
     preview_port_start: int = int(os.getenv("PREVIEW_PORT_START", "3100"))
     preview_port_end: int = int(os.getenv("PREVIEW_PORT_END", "3999"))
 
+    # Repo file API: text files above this size are served as line windows
+    repo_file_inline_max_bytes: int = int(os.getenv("REPO_FILE_INLINE_MAX_BYTES", str(1024 * 1024)))
+    repo_file_window_lines: int = int(os.getenv("REPO_FILE_WINDOW_LINES", "2000"))
+
+    # Asset uploads: streamed to disk in chunks and rejected above this size
+    asset_max_upload_bytes: int = int(os.getenv("ASSET_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+
+    # Image attachments larger than this (long edge in px, or bytes) are downscaled before the CLI sees them
+    image_max_dimension: int = int(os.getenv("IMAGE_MAX_DIMENSION", "1568"))
+    image_max_bytes: int = int(os.getenv("IMAGE_MAX_BYTES", str(2 * 1024 * 1024)))
+    image_pipeline_workers: int = int(os.getenv("IMAGE_PIPELINE_WORKERS", "2"))
+
+    # Tool inputs larger than this are moved from message metadata to message_payloads
+    message_inline_payload_bytes: int = int(os.getenv("MESSAGE_INLINE_PAYLOAD_BYTES", "2048"))
+
+    # Conversations idle for this many days are moved to compressed archive segments (0 disables)
+    message_archive_after_days: int = int(os.getenv("MESSAGE_ARCHIVE_AFTER_DAYS", "30"))
+    message_archive_interval_hours: float = float(os.getenv("MESSAGE_ARCHIVE_INTERVAL_HOURS", "6"))
+
+    # Maximum concurrent git pushes across all projects
+    github_push_workers: int = int(os.getenv("GITHUB_PUSH_WORKERS", "4"))
+
+    # Shared keep-alive pools for outbound GitHub/Vercel API calls
+    http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    http_max_connections_per_host: int = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+    http_keepalive_seconds: float = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+    http_timeout_seconds: float = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+    http_connect_timeout_seconds: float = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+
+    # Provider API endpoints (point at benchmarks/mock_servers.py for offline load tests)
+    github_api_base: str = os.getenv("GITHUB_API_BASE", "https://api.github.com").rstrip("/")
+    vercel_api_base: str = os.getenv("VERCEL_API_BASE", "https://api.vercel.com").rstrip("/")
+
+    # GitHub API pacing: below this share of the hourly budget requests are spread until the reset
+    github_rate_limit_reserve: float = float(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "0.1"))
+    github_rate_limit_max_wait_seconds: float = float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT_SECONDS", "30"))
+    # How long a 404 (e.g. "repo name is free") is reused without asking GitHub again
+    github_negative_cache_seconds: float = float(os.getenv("GITHUB_NEGATIVE_CACHE_SECONDS", "10"))
+
+    # .env watcher: bursts of edits are synced to the DB once the file has been quiet this long
+    env_watch_debounce_seconds: float = float(os.getenv("ENV_WATCH_DEBOUNCE_SECONDS", "0.5"))
+
 
 settings = Settings()
\ No newline at end of file
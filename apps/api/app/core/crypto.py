@@ -1,24 +1,96 @@
-import base64
+import hashlib
 import os
-from typing import Optional
-from cryptography.fernet import Fernet
+from typing import List, Optional
+from cryptography.fernet import Fernet, MultiFernet
+
+from app.core.config import PROJECT_ROOT
+
+
+def key_id(key: str) -> str:
+    """Short stable identifier of a key, stored next to each ciphertext"""
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+
+def _split_keys(value: Optional[str]) -> List[str]:
+    return [key.strip() for key in (value or "").split(",") if key.strip()]
+
+
+def _load_or_create_key_file(path: str) -> str:
+    """Dev fallback: a generated key kept on disk so stored secrets survive restarts"""
+    try:
+        with open(path) as f:
+            key = f.read().strip()
+        if key:
+            return key
+    except FileNotFoundError:
+        pass
+    key = Fernet.generate_key().decode()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(key + "\n")
+    except FileExistsError:
+        # Another process created it first
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        # Unwritable data dir: ephemeral key, secrets will not survive a restart
+        pass
+    return key
+
+
+def load_keys() -> List[str]:
+    """
+    Encryption keys, newest first
+
+    ENCRYPTION_KEYS lists keys comma-separated with the current key first and retired
+    keys after it (kept until the rotation job has re-encrypted everything);
+    ENCRYPTION_KEY is the single-key form.
+    """
+    keys = _split_keys(os.getenv("ENCRYPTION_KEYS")) or _split_keys(os.getenv("ENCRYPTION_KEY"))
+    if keys:
+        return keys
+    return [_load_or_create_key_file(
+        os.getenv("ENCRYPTION_KEY_FILE", str(PROJECT_ROOT / "data" / "encryption.key"))
+    )]
 
 
 class SecretBox:
-    def __init__(self, key: Optional[str] = None) -> None:
-        # Expect a base64 urlsafe key. If none provided, derive from env or generate (dev only)
-        key = key or os.getenv("ENCRYPTION_KEY")
-        if key is None:
-            # Dev fallback: generate ephemeral key
-            key = base64.urlsafe_b64encode(os.urandom(32)).decode()
-        self._fernet = Fernet(key)
+    def __init__(self, key: Optional[str] = None, keys: Optional[List[str]] = None) -> None:
+        # Expect base64 urlsafe keys; the first encrypts, all of them decrypt.
+        # Without explicit keys they are loaded on first use, so importing this module
+        # never creates the dev key file
+        self._keys = keys or ([key] if key else None)
+        self._key_ids: Optional[List[str]] = None
+        self._fernet: Optional[MultiFernet] = None
+
+    def _load(self) -> MultiFernet:
+        if self._fernet is None:
+            keys = self._keys or load_keys()
+            self._key_ids = [key_id(k) for k in keys]
+            self._fernet = MultiFernet([Fernet(k) for k in keys])
+        return self._fernet
+
+    @property
+    def key_ids(self) -> List[str]:
+        self._load()
+        return self._key_ids
+
+    @property
+    def primary_key_id(self) -> str:
+        return self.key_ids[0]
 
     def encrypt(self, plaintext: str) -> str:
-        token = self._fernet.encrypt(plaintext.encode("utf-8"))
+        token = self._load().encrypt(plaintext.encode("utf-8"))
         return token.decode("utf-8")
 
     def decrypt(self, ciphertext: str) -> str:
-        return self._fernet.decrypt(ciphertext.encode("utf-8")).decode("utf-8")
+        return self._load().decrypt(ciphertext.encode("utf-8")).decode("utf-8")
+
+    def rotate(self, ciphertext: str) -> str:
+        """Re-encrypt under the current key (raises InvalidToken if no configured key fits)"""
+        return self._load().rotate(ciphertext.encode("utf-8")).decode("utf-8")
 
 
 secret_box = SecretBox()
@@ -0,0 +1,31 @@
+"""
+Periodic SQLite maintenance: WAL checkpoints and query planner statistics
+"""
+import asyncio
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.terminal_ui import ui
+from app.db.session import engine
+
+
+def run_sqlite_maintenance() -> None:
+    """Truncate the WAL so it does not grow unbounded, then refresh planner statistics"""
+    with engine.connect() as conn:
+        busy, log_frames, checkpointed = conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)")).one()
+        conn.execute(text("PRAGMA optimize"))
+        conn.commit()
+    if busy:
+        ui.debug(f"WAL checkpoint incomplete ({checkpointed}/{log_frames} frames), readers active", "DB")
+
+
+async def run_maintenance_scheduler() -> None:
+    if not settings.database_url.startswith("sqlite") or settings.sqlite_maintenance_interval_minutes <= 0:
+        return
+    while True:
+        await asyncio.sleep(settings.sqlite_maintenance_interval_minutes * 60)
+        try:
+            await asyncio.to_thread(run_sqlite_maintenance)
+        except Exception as e:
+            ui.warning(f"SQLite maintenance failed: {e}", "DB")
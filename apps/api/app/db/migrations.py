@@ -0,0 +1,177 @@
+"""
+Schema Migrations
+Numbered, idempotent upgrade steps recorded in a schema_version row, so an
+up-to-date database costs a single query at startup
+"""
+import hashlib
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, String, Table, inspect, insert, select, text, update
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.core.terminal_ui import ui
+from app.db.base import Base
+import app.models  # noqa: F401 ensures models are imported for metadata
+from app.models.messages import Message
+from app.services.message_search import setup_message_fts
+from app.services.project_summaries import backfill_project_summaries
+from app.services.usage import backfill_usage_rollups
+
+
+# Kept out of Base.metadata so it never shows up in the model fingerprint
+_version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _version_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("fingerprint", String(64), nullable=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Arbitrary key for pg_advisory_lock so concurrent nodes don't migrate at the same time
+ADVISORY_LOCK_KEY = 7_341_928_105
+
+
+def _add_message_hidden(conn: Connection) -> None:
+    """Add and backfill the messages.hidden column on databases created before it existed"""
+    if "hidden" in {col["name"] for col in inspect(conn).get_columns("messages")}:
+        return
+    ui.info("Adding messages.hidden column")
+    conn.execute(text("ALTER TABLE messages ADD COLUMN hidden BOOLEAN NOT NULL DEFAULT FALSE"))
+    messages = Message.__table__
+    updated = conn.execute(
+        update(messages)
+        .where(messages.c.metadata_json["hidden_from_ui"].as_boolean().is_(True))
+        .values(hidden=True)
+    ).rowcount
+    ui.success(f"Backfilled hidden flag on {updated} messages")
+
+
+def _add_env_var_key_version(conn: Connection) -> None:
+    """Add env_vars.key_version; existing rows stay NULL until the rotation job tags them"""
+    if "key_version" in {col["name"] for col in inspect(conn).get_columns("env_vars")}:
+        return
+    ui.info("Adding env_vars.key_version column")
+    conn.execute(text("ALTER TABLE env_vars ADD COLUMN key_version VARCHAR(16)"))
+
+
+def _drop_message_hidden_index(conn: Connection) -> None:
+    """The single-column index on messages.hidden is redundant with ix_messages_project_hidden_created"""
+    conn.execute(text("DROP INDEX IF EXISTS ix_messages_hidden"))
+
+
+def _drop_unused_gin_indexes(conn: Connection) -> None:
+    """No query filters metadata_json or service_data by containment, so their GIN indexes only cost writes"""
+    conn.execute(text("DROP INDEX IF EXISTS ix_messages_metadata_gin"))
+    conn.execute(text("DROP INDEX IF EXISTS idx_service_data_gin"))
+
+
+def _backfill_project_summaries(conn: Connection) -> None:
+    created = backfill_project_summaries(conn)
+    if created:
+        ui.info(f"Created summaries for {created} projects")
+
+
+def _backfill_usage_rollups(conn: Connection) -> None:
+    counted = backfill_usage_rollups(conn)
+    if counted:
+        ui.info(f"Added {counted} earlier sessions to the usage rollups")
+
+
+# (version, description, step); append only, never renumber
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "messages.hidden column", _add_message_hidden),
+    (2, "message full-text index", setup_message_fts),
+    (3, "project summaries", _backfill_project_summaries),
+    (4, "usage rollups", _backfill_usage_rollups),
+    (5, "env_vars.key_version column", _add_env_var_key_version),
+    (6, "drop messages.hidden single-column index", _drop_message_hidden_index),
+    (7, "drop unused JSONB GIN indexes", _drop_unused_gin_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_fingerprint(metadata: MetaData = Base.metadata) -> str:
+    """Hash of the declared tables, columns and indexes; changes when a model gains a table or index"""
+    parts = []
+    for table in metadata.sorted_tables:
+        parts.append(f"table {table.name}")
+        parts.extend(f"column {table.name}.{col.name} {type(col.type).__name__}" for col in table.columns)
+        parts.extend(
+            f"index {index.name} {','.join(col.name for col in index.columns)}"
+            for index in sorted(table.indexes, key=lambda index: index.name or "")
+        )
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _read_version(conn: Connection) -> Tuple[int, Optional[str]]:
+    try:
+        row = conn.execute(
+            select(schema_version.c.version, schema_version.c.fingerprint).where(schema_version.c.id == 1)
+        ).first()
+    except DBAPIError:
+        row = None  # No schema_version table yet: legacy or empty database
+    conn.rollback()
+    return (row.version, row.fingerprint) if row else (0, None)
+
+
+def _store_version(conn: Connection, version: int, fingerprint: Optional[str]) -> None:
+    values = {"version": version, "fingerprint": fingerprint, "applied_at": datetime.utcnow()}
+    result = conn.execute(update(schema_version).where(schema_version.c.id == 1).values(**values))
+    if result.rowcount == 0:
+        conn.execute(insert(schema_version).values(id=1, **values))
+
+
+def _sync_indexes(conn: Connection) -> None:
+    # create_all does not add new indexes to tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+def run_migrations(engine: Engine) -> int:
+    """Bring the database up to LATEST_VERSION; returns the number of steps applied"""
+    fingerprint = schema_fingerprint()
+    with engine.connect() as conn:
+        current, stored_fingerprint = _read_version(conn)
+        if current >= LATEST_VERSION and stored_fingerprint == fingerprint:
+            return 0
+
+        is_postgres = conn.dialect.name == "postgresql"
+        if is_postgres:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            conn.commit()
+            # Another node may have migrated while we waited for the lock
+            current, stored_fingerprint = _read_version(conn)
+
+        try:
+            applied = 0
+            if stored_fingerprint != fingerprint:
+                with conn.begin():
+                    Base.metadata.create_all(bind=conn)
+                    _version_metadata.create_all(bind=conn)
+
+            for version, description, step in MIGRATIONS:
+                if version <= current:
+                    continue
+                ui.info(f"Applying schema migration {version}: {description}")
+                with conn.begin():
+                    step(conn)
+                    _store_version(conn, version, stored_fingerprint)
+                applied += 1
+
+            if stored_fingerprint != fingerprint:
+                with conn.begin():
+                    _sync_indexes(conn)
+                    _store_version(conn, LATEST_VERSION, fingerprint)
+            return applied
+        finally:
+            if is_postgres:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                conn.commit()
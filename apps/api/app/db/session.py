@@ -3,31 +3,73 @@ from sqlalchemy.orm import sessionmaker
 from pathlib import Path
 from app.core.config import settings
 
-# Ensure data directory exists
-db_path = settings.database_url.replace("sqlite:///", "")
-Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+is_sqlite = settings.database_url.startswith("sqlite")
 
-# Create engine with SQLite-specific settings
-connect_args = {}
-if settings.database_url.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+engine_options = {}
+if is_sqlite:
+    # Ensure data directory exists
+    db_path = settings.database_url.replace("sqlite:///", "")
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    engine_options["connect_args"] = {"check_same_thread": False, "timeout": settings.sqlite_busy_timeout_ms / 1000}
+else:
+    if settings.database_url.startswith("postgresql+psycopg"):
+        # Optional dependency: SQLite installs never import it
+        try:
+            import psycopg  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError(
+                "DATABASE_URL points at PostgreSQL but psycopg is not installed; "
+                "pip install 'psycopg[binary,pool]>=3.1'"
+            ) from e
+    # Pooled connections shared by all request handlers and background workers of this node
+    engine_options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+    )
 
 engine = create_engine(
     settings.database_url, 
-    connect_args=connect_args,
-    pool_pre_ping=True
+    pool_pre_ping=True,
+    **engine_options
 )
 
-# Enable foreign key constraints for SQLite
-if settings.database_url.startswith("sqlite"):
+
+def sqlite_pragmas(
+    journal_mode: str = settings.sqlite_journal_mode,
+    synchronous: str = settings.sqlite_synchronous,
+    busy_timeout_ms: int = settings.sqlite_busy_timeout_ms,
+    cache_size_kb: int = settings.sqlite_cache_size_kb,
+    mmap_size: int = settings.sqlite_mmap_size
+) -> list[str]:
+    """PRAGMA statements applied to every new SQLite connection"""
+    return [
+        "PRAGMA foreign_keys=ON",
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={int(busy_timeout_ms)}",
+        f"PRAGMA cache_size=-{int(cache_size_kb)}",  # Negative value = KiB
+        f"PRAGMA mmap_size={int(mmap_size)}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+# Enable foreign key constraints and the tuned performance profile for SQLite
+if is_sqlite:
     @event.listens_for(engine, "connect")
     def set_sqlite_pragma(dbapi_conn, connection_record):
         cursor = dbapi_conn.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
+        for statement in sqlite_pragmas():
+            cursor.execute(statement)
         cursor.close()
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+if is_sqlite and settings.sqlite_single_writer:
+    from app.db.writer import install_write_gate
+    install_write_gate(SessionLocal)
+
 def get_db():
     """Database session dependency"""
     db = SessionLocal()
@@ -0,0 +1,9 @@
+"""
+Portable column types
+"""
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# JSON on SQLite, binary JSONB (indexable with GIN) on PostgreSQL
+JSONType = JSON().with_variant(JSONB(), "postgresql")
@@ -0,0 +1,67 @@
+"""
+Single-writer gate for SQLite
+
+SQLite allows one writer at a time; concurrent writers otherwise spin on busy_timeout
+and can still fail with "database is locked". With SQLITE_SINGLE_WRITER enabled every
+session takes a process-wide lock when it first writes (flush or ORM DML) and holds it
+until its transaction ends, so writes queue in-process instead of contending in SQLite.
+
+Worker threads wait for the gate; code running on the event loop thread (sync sessions
+inside async endpoints) only takes it when it is free, because waiting there would stall
+every request, including the one holding the gate. When it is busy, that write falls back
+to SQLite's own busy_timeout handling.
+"""
+import asyncio
+import threading
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.terminal_ui import ui
+
+
+_write_lock = threading.Lock()
+_LOCK_HELD_KEY = "single_writer_lock_held"
+
+
+def _on_event_loop_thread() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _acquire(session) -> None:
+    if session.info.get(_LOCK_HELD_KEY):
+        return
+    if _on_event_loop_thread():
+        acquired = _write_lock.acquire(blocking=False)
+    else:
+        # Never wait longer than SQLite itself would; fall back to SQLite locking on timeout
+        acquired = _write_lock.acquire(timeout=settings.sqlite_busy_timeout_ms / 1000)
+        if not acquired:
+            ui.warning("Timed out waiting for the database write gate", "DB")
+    if acquired:
+        session.info[_LOCK_HELD_KEY] = True
+
+
+def _before_flush(session, flush_context, instances) -> None:
+    _acquire(session)
+
+
+def _do_orm_execute(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _acquire(orm_execute_state.session)
+
+
+def _after_transaction_end(session, transaction) -> None:
+    if transaction.parent is None and session.info.pop(_LOCK_HELD_KEY, False):
+        _write_lock.release()
+
+
+def install_write_gate(session_factory) -> None:
+    """Serialize write transactions of all sessions created by `session_factory`"""
+    event.listen(session_factory, "before_flush", _before_flush)
+    event.listen(session_factory, "do_orm_execute", _do_orm_execute)
+    event.listen(session_factory, "after_transaction_end", _after_transaction_end)
@@ -14,10 +14,20 @@ from app.api.github import router as github_router
 from app.api.vercel import router as vercel_router
 from app.core.logging import configure_logging
 from app.core.terminal_ui import ui
-from sqlalchemy import inspect
-from app.db.base import Base
 import app.models  # noqa: F401 ensures models are imported for metadata
 from app.db.session import engine
+from app.db.migrations import run_migrations
+from app.services.type_check_daemon import type_check_daemons
+from app.services.env_watcher import env_watcher
+from app.services.key_rotation import key_rotation_runner
+from app.services.image_pipeline import image_pipeline
+from app.services.project.trash import project_reaper
+from app.services.message_archive import run_archive_scheduler
+from app.db.maintenance import run_maintenance_scheduler
+from app.services.http_clients import start_http_clients, close_http_clients
+from app.services.vercel_service import deployment_poller
+import app.services.project_summaries  # noqa: F401 registers summary ORM events
+import asyncio
 import os
 
 configure_logging()
@@ -74,11 +84,10 @@ def health():
 
 @app.on_event("startup")
 def on_startup() -> None:
-    # Auto create tables if not exist; production setups should use Alembic
-    ui.info("Initializing database tables")
-    inspector = inspect(engine)
-    Base.metadata.create_all(bind=engine)
-    ui.success("Database initialization complete")
+    # Apply pending schema migrations; a current database costs one query
+    applied = run_migrations(engine)
+    if applied:
+        ui.success(f"Applied {applied} schema migrations")
     
     # Show available endpoints
     ui.info("API server ready")
@@ -98,3 +107,29 @@ def on_startup() -> None:
         "Port": os.getenv("PORT", "8000")
     }
     ui.status_line(env_info)
+
+
+_background_tasks: list[asyncio.Task] = []
+
+
+@app.on_event("startup")
+async def start_background_jobs() -> None:
+    await start_http_clients()
+    await deployment_poller.resume()
+    await key_rotation_runner.resume()
+    await project_reaper.resume()
+    _background_tasks.append(asyncio.create_task(run_archive_scheduler()))
+    _background_tasks.append(asyncio.create_task(run_maintenance_scheduler()))
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    for task in _background_tasks:
+        task.cancel()
+    await type_check_daemons.stop_all()
+    await env_watcher.stop_all()
+    await deployment_poller.stop()
+    await key_rotation_runner.stop()
+    await project_reaper.stop()
+    image_pipeline.shutdown()
+    await close_http_clients()
@@ -1,6 +1,7 @@
 # Import all models to ensure they are registered with the metadata
 from app.models.projects import Project
 from app.models.messages import Message
+from app.models.message_payloads import MessagePayload
 from app.models.sessions import Session
 from app.models.tools import ToolUsage
 from app.models.commits import Commit
@@ -8,11 +9,16 @@ from app.models.env_vars import EnvVar
 from app.models.tokens import ServiceToken
 from app.models.project_services import ProjectServiceConnection
 from app.models.user_requests import UserRequest
+from app.models.project_summaries import ProjectSummary
+from app.models.usage_rollups import UsageRollup
+from app.models.key_rotations import KeyRotation
+from app.models.assets import Asset
 
 
 __all__ = [
     "Project",
     "Message",
+    "MessagePayload",
     "Session",
     "ToolUsage",
     "Commit",
@@ -20,4 +26,8 @@ __all__ = [
     "ServiceToken",
     "ProjectServiceConnection",
     "UserRequest",
+    "ProjectSummary",
+    "UsageRollup",
+    "KeyRotation",
+    "Asset",
 ]
@@ -0,0 +1,27 @@
+"""
+Per-project index of uploaded assets, keyed by content hash
+"""
+from sqlalchemy import String, DateTime, ForeignKey, Integer, BigInteger, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from app.db.base import Base
+
+
+class Asset(Base):
+    """One stored file under projects_root/{project_id}/assets, shared by identical uploads"""
+    __tablename__ = "assets"
+    __table_args__ = (
+        UniqueConstraint("project_id", "sha256", name="unique_project_asset"),
+    )
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    project_id: Mapped[str] = mapped_column(String(64), ForeignKey("projects.id", ondelete="CASCADE"), index=True)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    filename: Mapped[str] = mapped_column(String(128), nullable=False)  # {sha256}{ext}, relative to assets/
+    original_filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    mime_type: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    upload_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)  # Includes deduplicated re-uploads
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    last_uploaded_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
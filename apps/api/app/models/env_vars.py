@@ -16,6 +16,7 @@ class EnvVar(Base):
     # Variable Info
     key: Mapped[str] = mapped_column(String(128), nullable=False)
     value_encrypted: Mapped[str] = mapped_column(Text, nullable=False)  # Always encrypted
+    key_version: Mapped[str | None] = mapped_column(String(16), nullable=True, index=True)  # crypto.key_id of the encrypting key
     
     # Scope & Type
     scope: Mapped[str] = mapped_column(String(32), default="runtime")  # runtime, build, preview
@@ -0,0 +1,27 @@
+"""
+Progress of env var re-encryption jobs
+"""
+from sqlalchemy import String, DateTime, Integer, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from app.db.base import Base
+
+
+class KeyRotation(Base):
+    """One pass re-encrypting env_vars under a target key, checkpointed per batch"""
+    __tablename__ = "key_rotations"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    target_key_id: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(16), default="running", nullable=False)  # running, completed, cancelled
+
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # Rows needing rotation when started
+    processed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rotated: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    failed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # Not decryptable with any configured key
+    last_id: Mapped[str | None] = mapped_column(String(64), nullable=True)  # Checkpoint: env_vars.id of the last row handled
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    started_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -0,0 +1,24 @@
+"""
+Large message payloads (raw CLI events, big tool inputs) kept out of messages.metadata_json
+"""
+from sqlalchemy import String, DateTime, ForeignKey, Integer, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column, relationship, backref
+from datetime import datetime
+from app.db.base import Base
+
+
+class MessagePayload(Base):
+    """Compressed side-table payload, loaded on demand"""
+    __tablename__ = "message_payloads"
+
+    message_id: Mapped[str] = mapped_column(String(64), ForeignKey("messages.id", ondelete="CASCADE"), primary_key=True)
+    encoding: Mapped[str] = mapped_column(String(16), nullable=False, default="zlib+json")
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    raw_size: Mapped[int] = mapped_column(Integer, nullable=False)  # Uncompressed JSON size in bytes
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    message = relationship(
+        "Message",
+        backref=backref("payload", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    )
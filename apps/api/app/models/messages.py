@@ -1,10 +1,11 @@
 """
 Unified message model for all chat, Claude Code SDK, and tool interactions
 """
-from sqlalchemy import String, DateTime, ForeignKey, Text, JSON, Integer, Numeric, Boolean
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, DateTime, ForeignKey, Text, Integer, Numeric, Boolean, Index, event
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 from datetime import datetime
 from app.db.base import Base
+from app.db.types import JSONType
 
 
 class Message(Base):
@@ -22,7 +23,12 @@ class Message(Base):
     content: Mapped[str] = mapped_column(Text, nullable=False)
     
     # Metadata - flexible JSON storage for various message types
-    metadata_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    metadata_json: Mapped[dict | None] = mapped_column(JSONType, nullable=True)
+    
+    # Denormalized from metadata_json["hidden_from_ui"] at flush time so history queries can
+    # filter in SQL (ix_messages_project_hidden_created covers it). Mutating metadata_json in
+    # place still needs flag_modified() for the JSON itself to be saved.
+    hidden: Mapped[bool] = mapped_column(Boolean, default=False, server_default="0", nullable=False)
     
     # Threading & Session
     parent_message_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("messages.id", ondelete="SET NULL"), nullable=True)
@@ -46,4 +52,19 @@ class Message(Base):
     # Relationships
     project = relationship("Project", back_populates="messages")
     parent_message = relationship("Message", remote_side=[id], backref="replies")
-    session = relationship("Session", back_populates="messages")
\ No newline at end of file
+    session = relationship("Session", back_populates="messages")
+
+    __table_args__ = (
+        Index("ix_messages_project_created", "project_id", "created_at"),
+        Index("ix_messages_project_hidden_created", "project_id", "hidden", "created_at", "id"),
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _sync_hidden(session, flush_context, instances) -> None:
+    # Runs on every flush so in-place edits of metadata_json are picked up too
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, Message):
+            hidden = bool(obj.metadata_json and obj.metadata_json.get("hidden_from_ui", False))
+            if obj.hidden is not hidden:
+                obj.hidden = hidden
@@ -1,10 +1,11 @@
 """
 Project service connections model for tracking Git, Supabase, Vercel integrations
 """
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey, Index
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
+from app.db.types import JSONType
 
 
 class ProjectServiceConnection(Base):
@@ -18,7 +19,7 @@ class ProjectServiceConnection(Base):
     status = Column(String(32), default="connected")  # 'connected', 'disconnected', 'error', 'pending'
     
     # Service-specific connection data
-    service_data = Column(JSON, nullable=True)  # Store provider-specific info
+    service_data = Column(JSONType, nullable=True)  # Store provider-specific info
     # Examples:
     # GitHub: {"repo_url": "https://github.com/user/repo", "repo_name": "my-app", "default_branch": "main"}
     # Supabase: {"project_url": "https://xxx.supabase.co", "project_id": "xxx", "database_name": "postgres"}
@@ -0,0 +1,18 @@
+"""
+Materialized per-project summary used by the project list
+"""
+from sqlalchemy import String, DateTime, ForeignKey, Integer, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from app.db.base import Base
+
+
+class ProjectSummary(Base):
+    """Message stats and service states, maintained incrementally by write paths"""
+    __tablename__ = "project_summaries"
+
+    project_id: Mapped[str] = mapped_column(String(64), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    message_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_message_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    services: Mapped[dict | None] = mapped_column(JSON, nullable=True)  # provider -> {"connected", "status"}
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
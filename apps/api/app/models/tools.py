@@ -1,7 +1,7 @@
 """
 Tool usage tracking for Claude Code SDK
 """
-from sqlalchemy import String, DateTime, ForeignKey, JSON, Integer, Boolean, Text
+from sqlalchemy import String, DateTime, ForeignKey, JSON, Integer, Boolean, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from app.db.base import Base
@@ -10,6 +10,9 @@ from app.db.base import Base
 class ToolUsage(Base):
     """Track individual tool usage within sessions"""
     __tablename__ = "tools_usage"
+    __table_args__ = (
+        Index("ix_tools_usage_project_created", "project_id", "created_at"),
+    )
 
     id: Mapped[str] = mapped_column(String(64), primary_key=True)
     session_id: Mapped[str] = mapped_column(String(64), ForeignKey("sessions.id", ondelete="CASCADE"), index=True)
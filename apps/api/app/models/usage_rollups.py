@@ -0,0 +1,28 @@
+"""
+Daily usage rollups per project, CLI and model
+"""
+from sqlalchemy import String, Date, DateTime, ForeignKey, Integer, BigInteger, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import date, datetime
+from app.db.base import Base
+
+
+class UsageRollup(Base):
+    """Session totals for one day, maintained incrementally when a session reports its result"""
+    __tablename__ = "usage_rollups"
+
+    project_id: Mapped[str] = mapped_column(String(64), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    cli_type: Mapped[str] = mapped_column(String(32), primary_key=True)
+    model: Mapped[str] = mapped_column(String(64), primary_key=True, default="")  # "" when the CLI default was used
+
+    sessions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    turns: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    messages: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    tools_used: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_tokens: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    total_cost_usd: Mapped[float] = mapped_column(Numeric(14, 6), default=0, nullable=False)
+    duration_ms: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    last_session_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,6 +1,21 @@
+import base64
+import hashlib
+import mimetypes
 import os
+import re
+import shutil
+import tempfile
+import uuid
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
+
+from fastapi import UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.assets import Asset
 
 
 def ensure_dir(path: str) -> None:
@@ -17,3 +32,200 @@ def write_text(path: str, data: str) -> None:
     ensure_dir(str(Path(path).parent))
     with open(path, "w", encoding="utf-8") as f:
         f.write(data)
+
+
+# Content-addressed asset storage: projects_root/{project_id}/assets/{sha256}{ext}
+
+ASSET_CHUNK_SIZE = 1024 * 1024
+
+EXTENSION_RE = re.compile(r"^\.[a-z0-9]{1,8}$")
+
+MIME_TYPE_RE = re.compile(r"^[a-z0-9][a-z0-9!#$&^_.+-]*/[a-z0-9][a-z0-9!#$&^_.+-]*$")
+
+# Asset.mime_type column width
+MIME_TYPE_MAX_LENGTH = 64
+
+
+class AssetTooLargeError(Exception):
+    """Upload exceeded settings.asset_max_upload_bytes"""
+
+
+def get_assets_dir(project_id: str) -> str:
+    return os.path.join(settings.projects_root, project_id, "assets")
+
+
+def asset_extension(filename: Optional[str], mime_type: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    if EXTENSION_RE.match(ext):
+        return ext
+    return (mimetypes.guess_extension(mime_type or "") or "") if mime_type else ""
+
+
+def normalize_mime_type(mime_type: Optional[str], filename: Optional[str] = None) -> Optional[str]:
+    """Bare lowercase type/subtype that fits the column; client-supplied values that don't are guessed from the filename"""
+    value = (mime_type or "").split(";", 1)[0].strip().lower()
+    if len(value) <= MIME_TYPE_MAX_LENGTH and MIME_TYPE_RE.match(value):
+        return value
+    guessed = mimetypes.guess_type(filename or "")[0]
+    return guessed if guessed and len(guessed) <= MIME_TYPE_MAX_LENGTH else None
+
+
+class AssetWriter:
+    """Streams an upload to a temp file next to its final location, hashing as it goes"""
+
+    def __init__(self, project_id: str, max_bytes: Optional[int] = None):
+        self.project_id = project_id
+        self.max_bytes = settings.asset_max_upload_bytes if max_bytes is None else max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+        assets_dir = get_assets_dir(project_id)
+        ensure_dir(assets_dir)
+        fd, self.temp_path = tempfile.mkstemp(dir=assets_dir, prefix=".upload-", suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            self.discard()
+            raise AssetTooLargeError(f"Asset exceeds {self.max_bytes} bytes")
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def discard(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.unlink(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+    def commit(
+        self,
+        db: Session,
+        original_filename: Optional[str] = None,
+        mime_type: Optional[str] = None
+    ) -> Tuple[Asset, bool]:
+        """Move the file into place unless identical content is stored already; returns (asset, deduplicated)"""
+        self._file.close()
+        mime_type = normalize_mime_type(mime_type, original_filename)
+        sha256 = self._hash.hexdigest()
+        assets_dir = get_assets_dir(self.project_id)
+        now = datetime.utcnow()
+
+        asset = db.query(Asset).filter(Asset.project_id == self.project_id, Asset.sha256 == sha256).first()
+        if asset is not None:
+            stored_path = os.path.join(assets_dir, asset.filename)
+            if os.path.exists(stored_path):
+                self.discard()
+            else:
+                os.replace(self.temp_path, stored_path)
+            asset.upload_count += 1
+            asset.last_uploaded_at = now
+            db.commit()
+            return asset, True
+
+        filename = f"{sha256}{asset_extension(original_filename, mime_type)}"
+        os.replace(self.temp_path, os.path.join(assets_dir, filename))
+        asset = Asset(
+            id=str(uuid.uuid4()),
+            project_id=self.project_id,
+            sha256=sha256,
+            filename=filename,
+            original_filename=(original_filename or "")[:255] or None,
+            mime_type=mime_type,
+            size_bytes=self.size,
+            created_at=now,
+            last_uploaded_at=now
+        )
+        db.add(asset)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent upload of the same content won; the file it wrote is identical
+            db.rollback()
+            asset = db.query(Asset).filter(Asset.project_id == self.project_id, Asset.sha256 == sha256).one()
+            return asset, True
+        return asset, False
+
+
+async def store_upload(db: Session, project_id: str, upload: UploadFile) -> Tuple[Asset, bool]:
+    """Store an UploadFile chunk by chunk; raises AssetTooLargeError past the size limit"""
+    if upload.size is not None and upload.size > settings.asset_max_upload_bytes:
+        raise AssetTooLargeError(f"Asset exceeds {settings.asset_max_upload_bytes} bytes")
+    writer = AssetWriter(project_id)
+    try:
+        while True:
+            chunk = await upload.read(ASSET_CHUNK_SIZE)
+            if not chunk:
+                break
+            writer.write(chunk)
+        return writer.commit(db, upload.filename, upload.content_type)
+    except BaseException:
+        writer.discard()
+        raise
+
+
+def store_base64(
+    db: Session,
+    project_id: str,
+    b64_data: str,
+    original_filename: Optional[str] = None,
+    mime_type: Optional[str] = None
+) -> Tuple[Asset, bool]:
+    """Decode base64 (optionally a data: URL) in aligned slices straight into the asset store"""
+    if b64_data.startswith("data:") and "," in b64_data:
+        header, b64_data = b64_data.split(",", 1)
+        mime_type = mime_type or header[5:].split(";", 1)[0] or None
+    b64_data = "".join(b64_data.split())
+    if len(b64_data) // 4 * 3 > settings.asset_max_upload_bytes + 2:
+        raise AssetTooLargeError(f"Asset exceeds {settings.asset_max_upload_bytes} bytes")
+
+    writer = AssetWriter(project_id)
+    try:
+        step = ASSET_CHUNK_SIZE // 3 * 4  # Multiple of 4 so every slice decodes on its own
+        for start in range(0, len(b64_data), step):
+            writer.write(base64.b64decode(b64_data[start:start + step], validate=True))
+        return writer.commit(db, original_filename, mime_type)
+    except BaseException:
+        writer.discard()
+        raise
+
+
+def get_asset_path(asset: Asset) -> str:
+    return os.path.join(get_assets_dir(asset.project_id), asset.filename)
+
+
+def link_asset(asset: Asset, name: str) -> str:
+    """Point a fixed name in the assets dir (e.g. logo.png) at a stored asset, atomically"""
+    target = os.path.join(get_assets_dir(asset.project_id), name)
+    temp_path = f"{target}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.link(get_asset_path(asset), temp_path)
+    except OSError:
+        shutil.copyfile(get_asset_path(asset), temp_path)
+    os.replace(temp_path, target)
+    return target
+
+
+def list_assets(db: Session, project_id: str) -> List[Asset]:
+    return db.query(Asset).filter(Asset.project_id == project_id).order_by(Asset.last_uploaded_at.desc()).all()
+
+
+def find_asset(db: Session, project_id: str, sha256: Optional[str] = None, path: Optional[str] = None) -> Optional[Asset]:
+    """Look up an uploaded asset by content hash or by its stored path (assets/<filename>)"""
+    query = db.query(Asset).filter(Asset.project_id == project_id)
+    if sha256:
+        return query.filter(Asset.sha256 == sha256.lower()).first()
+    if path:
+        return query.filter(Asset.filename == os.path.basename(path)).first()
+    return None
+
+
+def asset_attachment(asset: Asset, name: Optional[str] = None) -> dict:
+    """What the CLI gets for an attached asset: a path on disk instead of inline bytes"""
+    return {
+        "name": name or asset.original_filename or asset.filename,
+        "path": get_asset_path(asset),
+        "mime_type": asset.mime_type,
+        "sha256": asset.sha256,
+    }
@@ -0,0 +1,170 @@
+"""
+Git Checkpoints
+Lightweight snapshots of a project's working tree stored as refs/checkpoints/*,
+restorable in place or materialized as detached git worktrees
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+
+CHECKPOINT_REF_PREFIX = "refs/checkpoints/"
+
+# Oldest checkpoints beyond this count are pruned when a new one is created
+MAX_CHECKPOINTS = 50
+
+_repo_locks: Dict[str, threading.Lock] = {}
+_repo_locks_guard = threading.Lock()
+
+
+def _repo_lock(repo_path: str) -> threading.Lock:
+    with _repo_locks_guard:
+        return _repo_locks.setdefault(os.path.realpath(repo_path), threading.Lock())
+
+
+def _git(args: List[str], cwd: str, env: Optional[dict] = None) -> str:
+    res = subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True, env=env)
+    return res.stdout.strip()
+
+
+def get_worktrees_root(project_id: str) -> str:
+    return os.path.join(settings.projects_root, project_id, "worktrees")
+
+
+def _resolve(repo_path: str, checkpoint_id: str) -> str:
+    if "/" in checkpoint_id or checkpoint_id.startswith("."):
+        raise ValueError(f"Invalid checkpoint id: {checkpoint_id}")
+    try:
+        return _git(["rev-parse", "--verify", f"{CHECKPOINT_REF_PREFIX}{checkpoint_id}^{{commit}}"], cwd=repo_path)
+    except subprocess.CalledProcessError:
+        raise ValueError(f"Checkpoint not found: {checkpoint_id}")
+
+
+def create_checkpoint(repo_path: str, label: str = "Checkpoint") -> dict:
+    """
+    Snapshot the working tree (including untracked, non-ignored files) without touching
+    HEAD, the real index or any file on disk
+
+    A copy of the index is used so `git add -A` only re-hashes files whose stat data changed.
+    """
+    with _repo_lock(repo_path):
+        git_dir = _git(["rev-parse", "--absolute-git-dir"], cwd=repo_path)
+        fd, tmp_index = tempfile.mkstemp(prefix="checkpoint-index-", dir=git_dir)
+        os.close(fd)
+        try:
+            real_index = os.path.join(git_dir, "index")
+            if os.path.exists(real_index):
+                shutil.copyfile(real_index, tmp_index)
+            else:
+                os.remove(tmp_index)
+            env = {**os.environ, "GIT_INDEX_FILE": tmp_index}
+            _git(["add", "-A"], cwd=repo_path, env=env)
+            tree = _git(["write-tree"], cwd=repo_path, env=env)
+        finally:
+            if os.path.exists(tmp_index):
+                os.remove(tmp_index)
+
+        try:
+            parent_args = ["-p", _git(["rev-parse", "--verify", "HEAD"], cwd=repo_path)]
+        except subprocess.CalledProcessError:
+            parent_args = []  # Repository without commits yet
+
+        checkpoint_id = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        sha = _git(["commit-tree", tree, *parent_args, "-m", label], cwd=repo_path)
+        _git(["update-ref", f"{CHECKPOINT_REF_PREFIX}{checkpoint_id}", sha], cwd=repo_path)
+
+    prune_checkpoints(repo_path)
+    return {"id": checkpoint_id, "sha": sha, "tree": tree, "label": label}
+
+
+def list_checkpoints(repo_path: str) -> List[dict]:
+    """List checkpoints, newest first"""
+    fmt = "%(refname:strip=2)%01%(objectname)%01%(creatordate:iso)%01%(subject)"
+    out = _git(["for-each-ref", "--sort=-creatordate", f"--format={fmt}", CHECKPOINT_REF_PREFIX], cwd=repo_path)
+    checkpoints = []
+    for line in out.splitlines():
+        checkpoint_id, sha, date, label = line.split("\x01")
+        checkpoints.append({"id": checkpoint_id, "sha": sha, "date": date, "label": label})
+    return checkpoints
+
+
+def prune_checkpoints(repo_path: str, keep: int = MAX_CHECKPOINTS) -> int:
+    """Delete the oldest checkpoint refs beyond `keep`; returns the number removed"""
+    stale = list_checkpoints(repo_path)[keep:]
+    for checkpoint in stale:
+        _git(["update-ref", "-d", f"{CHECKPOINT_REF_PREFIX}{checkpoint['id']}"], cwd=repo_path)
+    return len(stale)
+
+
+def delete_checkpoint(repo_path: str, checkpoint_id: str) -> None:
+    _resolve(repo_path, checkpoint_id)
+    _git(["update-ref", "-d", f"{CHECKPOINT_REF_PREFIX}{checkpoint_id}"], cwd=repo_path)
+
+
+def restore_checkpoint(repo_path: str, checkpoint_id: str) -> dict:
+    """
+    Restore the working tree and branch to a checkpoint in place
+
+    The current state is checkpointed first so the restore itself can be undone.
+    Only files that differ from the checkpoint are rewritten; ignored files are left alone.
+    """
+    sha = _resolve(repo_path, checkpoint_id)
+    backup = create_checkpoint(repo_path, f"Before restoring {checkpoint_id}")
+
+    with _repo_lock(repo_path):
+        # Track new files so read-tree removes those absent from the checkpoint
+        _git(["add", "-A"], cwd=repo_path)
+        _git(["read-tree", "-u", "--reset", f"{sha}^{{tree}}"], cwd=repo_path)
+        try:
+            parent = _git(["rev-parse", "--verify", f"{sha}^"], cwd=repo_path)
+            _git(["reset", "-q", "--soft", parent], cwd=repo_path)
+        except subprocess.CalledProcessError:
+            pass  # Checkpoint taken before the first commit
+        # Uncommitted changes from the checkpoint stay in the working tree, unstaged
+        try:
+            _git(["reset", "-q"], cwd=repo_path)
+        except subprocess.CalledProcessError:
+            pass
+
+    return {"restored": checkpoint_id, "sha": sha, "backup": backup["id"]}
+
+
+def list_worktrees(project_id: str) -> List[dict]:
+    root = get_worktrees_root(project_id)
+    if not os.path.isdir(root):
+        return []
+    return [
+        {"checkpoint_id": name, "path": os.path.join(root, name)}
+        for name in sorted(os.listdir(root))
+        if os.path.isdir(os.path.join(root, name))
+    ]
+
+
+def materialize_worktree(project_id: str, repo_path: str, checkpoint_id: str) -> dict:
+    """Check a checkpoint out as a detached worktree under data/projects/{id}/worktrees"""
+    sha = _resolve(repo_path, checkpoint_id)
+    path = os.path.join(get_worktrees_root(project_id), checkpoint_id)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with _repo_lock(repo_path):
+            _git(["worktree", "add", "--detach", path, sha], cwd=repo_path)
+    return {"checkpoint_id": checkpoint_id, "sha": sha, "path": path}
+
+
+def remove_worktree(project_id: str, repo_path: str, checkpoint_id: str) -> None:
+    path = os.path.join(get_worktrees_root(project_id), checkpoint_id)
+    if os.path.dirname(os.path.normpath(path)) != get_worktrees_root(project_id):
+        raise ValueError(f"Invalid checkpoint id: {checkpoint_id}")
+    with _repo_lock(repo_path):
+        try:
+            _git(["worktree", "remove", "--force", path], cwd=repo_path)
+        except subprocess.CalledProcessError:
+            shutil.rmtree(path, ignore_errors=True)
+            _git(["worktree", "prune"], cwd=repo_path)
@@ -9,7 +9,7 @@ import subprocess
 import uuid
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional, Callable, Dict, Any, AsyncGenerator, List
+from typing import Optional, Callable, Dict, Any, AsyncGenerator, List, Union
 from enum import Enum
 import tempfile
 import base64
@@ -40,6 +40,11 @@ from app.models.messages import Message
 from app.models.sessions import Session
 from app.core.websocket.manager import manager as ws_manager
 from app.core.terminal_ui import ui
+from app.services.code_search import notify_files_changed
+from app.services.message_payloads import attach_payload
+from app.services.usage import extract_result_usage, record_session_usage
+from app.services.tool_telemetry import MAX_OUTPUT_CHARS, ToolResult, ToolTelemetryRecorder
+from app.services.image_pipeline import image_pipeline
 
 # Claude Code SDK imports
 from claude_code_sdk import ClaudeSDKClient, ClaudeCodeOptions
@@ -140,8 +145,8 @@ class BaseCLI(ABC):
         images: Optional[List[Dict[str, Any]]] = None,
         model: Optional[str] = None,
         is_initial_prompt: bool = False
-    ) -> AsyncGenerator[Message, None]:
-        """Execute instruction and yield messages in real-time"""
+    ) -> AsyncGenerator[Union[Message, ToolResult], None]:
+        """Execute instruction and yield messages in real-time (plus ToolResults, which are only timed)"""
         pass
     
     @abstractmethod
@@ -165,8 +170,7 @@ class BaseCLI(ABC):
             content=self._extract_content(data),
             metadata_json={
                 **data,
-                "cli_type": self.cli_type.value,
-                "original_format": data
+                "cli_type": self.cli_type.value
             },
             session_id=session_id,
             created_at=datetime.utcnow()
@@ -526,7 +530,7 @@ class ClaudeCodeCLI(BaseCLI):
         images: Optional[List[Dict[str, Any]]] = None,
         model: Optional[str] = None,
         is_initial_prompt: bool = False
-    ) -> AsyncGenerator[Message, None]:
+    ) -> AsyncGenerator[Union[Message, ToolResult], None]:
         """Execute instruction using Claude Code Python SDK"""
         from app.core.terminal_ui import ui
         
@@ -752,9 +756,24 @@ node_modules/
                         # Handle UserMessage (tool results, etc.)
                         elif (isinstance(message_obj, UserMessage) or 
                               'UserMessage' in str(type(message_obj))):
-                            # UserMessage has content: str according to types.py
-                            # UserMessages are typically tool results - we don't need to show them
-                            pass
+                            # UserMessages are typically tool results - not stored, but
+                            # yielded as ToolResult so tool calls can be timed
+                            from claude_code_sdk.types import ToolResultBlock
+                            
+                            if isinstance(getattr(message_obj, 'content', None), list):
+                                for block in message_obj.content:
+                                    if not isinstance(block, ToolResultBlock):
+                                        continue
+                                    result_content = block.content
+                                    if isinstance(result_content, list):
+                                        result_content = "\n".join(
+                                            part.get("text", "") for part in result_content if isinstance(part, dict)
+                                        )
+                                    yield ToolResult(
+                                        block.tool_use_id,
+                                        bool(block.is_error),
+                                        (result_content or "")[:MAX_OUTPUT_CHARS]
+                                    )
                         
                         # Handle ResultMessage (final session completion)
                         elif (
@@ -778,6 +797,7 @@ node_modules/
                                     "duration_api_ms": getattr(message_obj, 'duration_api_ms', 0),
                                     "total_cost_usd": getattr(message_obj, 'total_cost_usd', 0),
                                     "num_turns": getattr(message_obj, 'num_turns', 0),
+                                    "usage": getattr(message_obj, 'usage', None),
                                     "is_error": getattr(message_obj, 'is_error', False),
                                     "subtype": getattr(message_obj, 'subtype', None),
                                     "session_id": getattr(message_obj, 'session_id', None),
@@ -955,6 +975,7 @@ class CursorAgentCLI(BaseCLI):
                         "event_type": "tool_call_started",
                         "tool_name": tool_name,
                         "tool_input": tool_input,
+                        "tool_id": event.get("call_id"),
                         "original_event": event
                     },
                     session_id=session_id,
@@ -979,6 +1000,8 @@ class CursorAgentCLI(BaseCLI):
                         "cli_type": self.cli_type.value,
                         "original_format": event,
                         "tool_name": tool_name,
+                        "tool_id": event.get("call_id"),
+                        "is_error": "error" in result,
                         "hidden_from_ui": True
                     },
                     session_id=session_id,
@@ -1386,10 +1409,19 @@ class UnifiedCLIManager:
         if model:
             ui.debug(f"Using model: {model}", "CLI")
         
+        if images:
+            # Attachments are files on disk: the CLI reads them with its own tools, downscaled first
+            images = await image_pipeline.prepare_all(images)
+            instruction = instruction + "\n\n" + "\n".join(
+                f"Image #{index} path: {image['path']}" for index, image in enumerate(images, 1)
+            )
+        
         messages_collected = []
         has_changes = False
         has_error = False  # Track if any error occurred
         result_success = None  # Track result event success status
+        result_usage = None  # Duration, cost, turns and tokens from the result event
+        tool_telemetry = ToolTelemetryRecorder(self.project_id, self.session_id, cli._normalize_tool_name)
         
         # Log callback
         async def log_callback(message: str):
@@ -1407,6 +1439,13 @@ class UnifiedCLIManager:
             model=model,
             is_initial_prompt=is_initial_prompt
         ):
+            if isinstance(message, ToolResult):
+                # Only timed: tool results are not stored or sent to the UI
+                tool_telemetry.observe_result(message)
+                if tool_telemetry.should_flush:
+                    tool_telemetry.flush(self.db)
+                continue
+            
             message_count += 1
             
             # Check for error messages or result status
@@ -1448,13 +1487,19 @@ class UnifiedCLIManager:
                             result_success = True
                             ui.success(f"Cursor result: assuming success (no error detected)", "CLI")
             
-            # Save message to database
+            result_usage = extract_result_usage(message.metadata_json) or result_usage
+            tool_telemetry.observe(message)
+            
+            # Save message to database; raw events and large tool inputs go to message_payloads
             message.project_id = self.project_id
             message.conversation_id = self.conversation_id
+            attach_payload(message)
             self.db.add(message)
             self.db.commit()
             
             messages_collected.append(message)
+            if tool_telemetry.should_flush:
+                tool_telemetry.flush(self.db)
             
             # Check if message should be hidden from UI
             should_hide = message.metadata_json and message.metadata_json.get("hidden_from_ui", False)
@@ -1484,6 +1529,15 @@ class UnifiedCLIManager:
             # Check if changes were made
             if message.metadata_json and "changes_made" in message.metadata_json:
                 has_changes = True
+            
+            # Mark files touched by file tools so the code search index picks them up
+            if message.metadata_json and message.metadata_json.get("tool_name"):
+                tool_name = cli._normalize_tool_name(message.metadata_json["tool_name"])
+                tool_input = message.metadata_json.get("tool_input") or {}
+                if tool_name in ("Write", "Edit", "MultiEdit", "Delete") and isinstance(tool_input, dict):
+                    file_path = tool_input.get("file_path") or tool_input.get("path") or tool_input.get("file")
+                    if file_path:
+                        notify_files_changed(self.project_id, [file_path])
         
         # Determine final success status
         # For Cursor: check result_success if available, otherwise check has_error
@@ -1497,6 +1551,16 @@ class UnifiedCLIManager:
             success = not has_error
             ui.info(f"Using has_error logic: not {has_error} = {success}", "CLI")
         
+        tool_telemetry.flush(self.db, final=True)
+        try:
+            record_session_usage(
+                self.db, self.session_id, cli.cli_type.value, model, result_usage,
+                messages=len(messages_collected), tools_used=tool_telemetry.started
+            )
+        except Exception as e:
+            self.db.rollback()
+            ui.warning(f"Failed to record session usage: {e}", "CLI")
+        
         if success:
             ui.success(f"Streaming completed successfully. Total messages: {len(messages_collected)}", "CLI")
         else:
@@ -108,26 +108,26 @@ class CLISessionManager:
         return True
     
     def get_session_stats(self, project_id: str) -> Dict[str, Any]:
-        """Get session statistics for a project"""
-        from app.models.sessions import Session as ChatSession
+        """Get session statistics for a project (read from the daily usage rollups)"""
+        from app.models.usage_rollups import UsageRollup
         from sqlalchemy import func
         
         # Get session counts by CLI type
         session_stats = self.db.query(
-            ChatSession.cli_type,
-            func.count(ChatSession.id).label('count'),
-            func.avg(ChatSession.duration_ms).label('avg_duration_ms'),
-            func.sum(ChatSession.total_messages).label('total_messages'),
-            func.max(ChatSession.started_at).label('last_used')
+            UsageRollup.cli_type,
+            func.sum(UsageRollup.sessions).label('count'),
+            func.sum(UsageRollup.duration_ms).label('duration_ms'),
+            func.sum(UsageRollup.messages).label('total_messages'),
+            func.max(UsageRollup.last_session_at).label('last_used')
         ).filter(
-            ChatSession.project_id == project_id
-        ).group_by(ChatSession.cli_type).all()
+            UsageRollup.project_id == project_id
+        ).group_by(UsageRollup.cli_type).all()
         
         stats = {}
         for stat in session_stats:
             stats[stat.cli_type] = {
-                "session_count": stat.count,
-                "avg_duration_ms": int(stat.avg_duration_ms) if stat.avg_duration_ms else 0,
+                "session_count": stat.count or 0,
+                "avg_duration_ms": int(stat.duration_ms / stat.count) if stat.count else 0,
                 "total_messages": stat.total_messages or 0,
                 "last_used": stat.last_used.isoformat() if stat.last_used else None,
                 "active_session_id": self.get_session_id(project_id, CLIType(stat.cli_type))
@@ -0,0 +1,347 @@
+"""
+Code Search Service
+Per-project trigram index over repository files, persisted under data/projects/{id}/data
+"""
+import json
+import os
+import subprocess
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.services.repo_files import is_binary_file
+
+
+INDEX_VERSION = 2
+
+# Files larger than this are not indexed (bundles, lockfiles, generated data)
+MAX_INDEXED_FILE_BYTES = 512 * 1024
+
+# Seconds before a search triggers another (background) stat scan of the working tree;
+# edits made through the agent's tools are picked up immediately via mark_dirty
+RESCAN_INTERVAL_SECONDS = 30.0
+
+# Directories skipped when the repo cannot be listed through git
+FALLBACK_IGNORED_DIRS = {".git", "node_modules", ".next", "dist", "build", ".turbo"}
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _list_repo_files(repo_path: str) -> List[str]:
+    """List tracked and untracked files, honouring .gitignore"""
+    try:
+        out = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=repo_path, check=True, capture_output=True
+        ).stdout.decode("utf-8", errors="replace")
+        return sorted({p for p in out.split("\0") if p})
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        files: List[str] = []
+        for root, dirs, names in os.walk(repo_path):
+            dirs[:] = [d for d in dirs if d not in FALLBACK_IGNORED_DIRS]
+            for name in names:
+                files.append(os.path.relpath(os.path.join(root, name), repo_path))
+        return sorted(files)
+
+
+class TrigramIndex:
+    """Trigram index for one project repository"""
+
+    def __init__(self, project_id: str, repo_path: str, index_path: str):
+        self.project_id = project_id
+        self.repo_path = repo_path
+        self.index_path = index_path
+        # path -> {"mtime_ns": int, "size": int, "indexed": bool, "trigrams": set}
+        # indexed is False for binaries and files over MAX_INDEXED_FILE_BYTES; search skips them
+        self.files: Dict[str, dict] = {}
+        self.postings: Dict[str, Set[str]] = {}
+        self._dirty_paths: Set[str] = set()
+        self._last_scan = 0.0
+        self._scanning = False
+        self._lock = threading.Lock()
+        self._load()
+
+    # Persistence
+
+    def _load(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return
+            for path, entry in data.get("files", {}).items():
+                self._add_entry(path, entry["mtime_ns"], entry["size"], entry["indexed"], set(entry["trigrams"]))
+        except (OSError, ValueError, KeyError):
+            self.files.clear()
+            self.postings.clear()
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        data = {
+            "version": INDEX_VERSION,
+            "files": {
+                path: {
+                    "mtime_ns": e["mtime_ns"],
+                    "size": e["size"],
+                    "indexed": e["indexed"],
+                    "trigrams": sorted(e["trigrams"])
+                }
+                for path, e in self.files.items()
+            }
+        }
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+    # Index maintenance
+
+    def _add_entry(self, path: str, mtime_ns: int, size: int, indexed: bool, trigrams: Set[str]) -> None:
+        self.files[path] = {"mtime_ns": mtime_ns, "size": size, "indexed": indexed, "trigrams": trigrams}
+        for tri in trigrams:
+            self.postings.setdefault(tri, set()).add(path)
+
+    def _remove_entry(self, path: str) -> None:
+        entry = self.files.pop(path, None)
+        if not entry:
+            return
+        for tri in entry["trigrams"]:
+            bucket = self.postings.get(tri)
+            if bucket is not None:
+                bucket.discard(path)
+                if not bucket:
+                    del self.postings[tri]
+
+    def _build_entry(self, path: str) -> Optional[tuple]:
+        """Stat and read one file; None when it no longer exists"""
+        full = os.path.join(self.repo_path, path)
+        try:
+            st = os.stat(full)
+            indexed = st.st_size <= MAX_INDEXED_FILE_BYTES and not is_binary_file(full)
+            trigrams: Set[str] = set()
+            if indexed:
+                with open(full, "r", encoding="utf-8", errors="replace") as f:
+                    trigrams = _trigrams(f.read().lower())
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, indexed, trigrams
+
+    def _is_current(self, path: str, mtime_ns: int, size: int) -> bool:
+        existing = self.files.get(path)
+        return existing is not None and existing["mtime_ns"] == mtime_ns and existing["size"] == size
+
+    def _apply(self, removed: Iterable[str], built: Dict[str, Optional[tuple]]) -> int:
+        """Apply scan results; caller holds the lock"""
+        changed = 0
+        for path in removed:
+            if path in self.files:
+                self._remove_entry(path)
+                changed += 1
+        for path, entry in built.items():
+            if entry is None:
+                if path in self.files:
+                    self._remove_entry(path)
+                    changed += 1
+                continue
+            self._remove_entry(path)
+            self._add_entry(path, *entry)
+            changed += 1
+        return changed
+
+    def mark_dirty(self, paths: Iterable[str]) -> None:
+        """Record changed paths (relative to the repo) for the next refresh"""
+        with self._lock:
+            self._dirty_paths.update(paths)
+
+    def _scan(self) -> int:
+        """
+        Full stat scan of the working tree
+
+        Listing, stat calls and file reads happen outside the lock so searches keep
+        answering from the current index while a scan runs.
+        """
+        stats: Dict[str, tuple] = {}
+        for path in _list_repo_files(self.repo_path):
+            try:
+                st = os.stat(os.path.join(self.repo_path, path))
+            except OSError:
+                continue
+            stats[path] = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            removed = [p for p in self.files if p not in stats]
+            stale = [p for p, (mtime_ns, size) in stats.items() if not self._is_current(p, mtime_ns, size)]
+
+        built = {path: self._build_entry(path) for path in stale}
+
+        with self._lock:
+            changed = self._apply(removed, built)
+            self._last_scan = time.monotonic()
+            if changed:
+                self._save()
+            return changed
+
+    def _background_scan(self) -> None:
+        try:
+            self._scan()
+        finally:
+            with self._lock:
+                self._scanning = False
+
+    def refresh(self, force_scan: bool = False) -> int:
+        """
+        Bring the index up to date
+
+        Dirty paths (reported by the agent's file tools) are always re-indexed. The
+        first refresh, or a forced one, scans the whole tree before returning; after
+        that a scan older than RESCAN_INTERVAL_SECONDS is redone in a background thread
+        and the caller is served from the current index. Returns the number of files
+        changed before returning.
+        """
+        with self._lock:
+            dirty, self._dirty_paths = self._dirty_paths, set()
+        built = {path: self._build_entry(path) for path in dirty}
+        with self._lock:
+            changed = self._apply((), built)
+            if changed:
+                self._save()
+            needs_scan = not self._scanning and (
+                force_scan or self._last_scan == 0.0 or time.monotonic() - self._last_scan >= RESCAN_INTERVAL_SECONDS
+            )
+            synchronous = force_scan or self._last_scan == 0.0
+            if needs_scan:
+                self._scanning = True
+
+        if needs_scan and synchronous:
+            try:
+                changed += self._scan()
+            finally:
+                with self._lock:
+                    self._scanning = False
+        elif needs_scan:
+            threading.Thread(target=self._background_scan, name=f"code-search-scan-{self.project_id}", daemon=True).start()
+        return changed
+
+    # Querying
+
+    def _candidates(self, query: str) -> List[str]:
+        """Indexed files that can contain the query; binaries and oversized files never match"""
+        needle = query.lower()
+        if len(needle) < 3:
+            return [path for path, entry in self.files.items() if entry["indexed"]]
+        buckets = [self.postings.get(tri, set()) for tri in _trigrams(needle)]
+        buckets.sort(key=len)
+        result = set(buckets[0])
+        for bucket in buckets[1:]:
+            result &= bucket
+            if not result:
+                break
+        return list(result)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        context_lines: int = 2,
+        max_matches_per_file: int = 5,
+        case_sensitive: bool = False
+    ) -> dict:
+        """
+        Return ranked files with matching lines and surrounding context
+
+        Returns:
+            dict with ``results`` and ``skipped_files``, the number of binary or
+            oversized files that were not searched
+        """
+        self.refresh()
+        with self._lock:
+            candidates = self._candidates(query)
+            skipped_files = sum(1 for entry in self.files.values() if not entry["indexed"])
+
+        needle = query if case_sensitive else query.lower()
+        results: List[dict] = []
+        for path in candidates:
+            full = os.path.join(self.repo_path, path)
+            try:
+                with open(full, "r", encoding="utf-8", errors="replace") as f:
+                    # Candidates are indexed files, so this is bounded by MAX_INDEXED_FILE_BYTES
+                    lines = f.read(MAX_INDEXED_FILE_BYTES + 1).splitlines()
+            except OSError:
+                continue
+
+            matches = []
+            match_count = 0
+            exact_count = 0
+            for i, line in enumerate(lines):
+                haystack = line if case_sensitive else line.lower()
+                if needle not in haystack:
+                    continue
+                match_count += 1
+                if query in line:
+                    exact_count += 1
+                if len(matches) < max_matches_per_file:
+                    matches.append({
+                        "line": i + 1,
+                        "column": haystack.index(needle) + 1,
+                        "text": line,
+                        "context_before": lines[max(0, i - context_lines):i],
+                        "context_after": lines[i + 1:i + 1 + context_lines]
+                    })
+            if not match_count:
+                continue
+
+            name = os.path.basename(path) if case_sensitive else os.path.basename(path).lower()
+            score = match_count + exact_count + (10 if needle in name else 0)
+            results.append({"path": path, "score": score, "match_count": match_count, "matches": matches})
+
+        results.sort(key=lambda r: (-r["score"], r["path"]))
+        return {"results": results[:limit], "skipped_files": skipped_files}
+
+
+_indexes: Dict[str, TrigramIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_project_index(project_id: str) -> TrigramIndex:
+    """Get (or lazily create) the trigram index for a project"""
+    with _indexes_lock:
+        index = _indexes.get(project_id)
+        if index is None:
+            project_root = os.path.join(settings.projects_root, project_id)
+            index = TrigramIndex(
+                project_id,
+                os.path.join(project_root, "repo"),
+                os.path.join(project_root, "data", "search_index.json")
+            )
+            _indexes[project_id] = index
+        return index
+
+
+def notify_files_changed(project_id: str, file_paths: Iterable[str]) -> None:
+    """Mark files as changed, e.g. from agent Write/Edit tool events; accepts absolute or repo-relative paths"""
+    repo_path = os.path.join(settings.projects_root, project_id, "repo")
+    rel_paths = []
+    for file_path in file_paths:
+        if not file_path:
+            continue
+        rel = os.path.relpath(file_path, repo_path) if os.path.isabs(file_path) else file_path
+        if not rel.startswith(".."):
+            rel_paths.append(os.path.normpath(rel))
+    if rel_paths:
+        get_project_index(project_id).mark_dirty(rel_paths)
+
+
+def drop_project_index(project_id: str) -> None:
+    """Forget the in-memory index of a project (files on disk are left untouched)"""
+    with _indexes_lock:
+        _indexes.pop(project_id, None)
+
+
+def search_project(project_id: str, query: str, **kwargs) -> dict:
+    """Search a project's repository; blocking, run it off the event loop"""
+    return get_project_index(project_id).search(query, **kwargs)
@@ -2,16 +2,66 @@
 Environment Variables Manager
 
 Handles synchronization between database and .env files in Next.js projects.
+
+Decrypted values are cached per project and revalidated against a cheap (row count,
+latest updated_at) query, so writes from other workers are picked up; the .env file is
+tracked by stat signature and content hash, so repeated reads, conflict checks and
+file -> DB syncs of an unchanged file do no decryption or parsing.
 """
 
+import hashlib
 import os
 import re
+import tempfile
+import uuid
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.models.env_vars import EnvVar
 from app.core.crypto import secret_box
 from app.core.config import settings
+from app.core.terminal_ui import ui
+
+
+ENV_LINE_RE = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*)$')
+
+ENV_FILE_HEADER = (
+    "# Environment Variables\n"
+    "# This file is automatically synchronized with Project Settings\n\n"
+)
+
+
+class EnvCacheEntry:
+    """What is known about one project's env vars without touching the DB or the file"""
+
+    def __init__(self):
+        self.values: Optional[Dict[str, str]] = None  # Decrypted DB values
+        self.unreadable: Set[str] = set()  # Keys whose stored value could not be decrypted
+        self.db_version: Optional[Tuple[int, Optional[datetime]]] = None  # What `values` was loaded at
+        self.file_signature: Optional[Tuple[int, int]] = None  # (mtime_ns, size) of .env
+        self.file_hash: Optional[str] = None
+        self.file_vars: Dict[str, str] = {}
+        self.synced_hash: Optional[str] = None  # File content last known to match the DB
+
+
+_env_cache: Dict[str, EnvCacheEntry] = {}
+
+
+def _cache_entry(project_id: str) -> EnvCacheEntry:
+    entry = _env_cache.get(project_id)
+    if entry is None:
+        entry = _env_cache[project_id] = EnvCacheEntry()
+    return entry
+
+
+def invalidate_env_cache(project_id: Optional[str] = None) -> None:
+    """Forget cached values and file state for one project (or all projects)"""
+    if project_id is None:
+        _env_cache.clear()
+    else:
+        _env_cache.pop(project_id, None)
 
 
 def get_project_env_path(project_id: str) -> Path:
@@ -19,157 +69,289 @@ def get_project_env_path(project_id: str) -> Path:
     return Path(settings.projects_root) / project_id / "repo" / ".env"
 
 
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+        return value[1:-1]
+    return value
+
+
+def parse_env_text(text: str) -> Dict[str, str]:
+    """Parse .env content and return key-value pairs"""
+    env_vars = {}
+    for line in text.splitlines():
+        line = line.strip()
+        
+        # Skip empty lines and comments
+        if not line or line.startswith('#'):
+            continue
+        
+        # Match KEY=VALUE pattern
+        match = ENV_LINE_RE.match(line)
+        if match:
+            key, value = match.groups()
+            env_vars[key] = _unquote(value)
+    return env_vars
+
+
 def parse_env_file(env_path: Path) -> Dict[str, str]:
     """Parse .env file and return key-value pairs"""
-    env_vars = {}
-    
     if not env_path.exists():
-        return env_vars
+        return {}
     
     try:
-        with open(env_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                
-                # Skip empty lines and comments
-                if not line or line.startswith('#'):
-                    continue
-                
-                # Match KEY=VALUE pattern
-                match = re.match(r'^([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*)$', line)
-                if match:
-                    key, value = match.groups()
-                    
-                    # Handle quoted values
-                    if value.startswith('"') and value.endswith('"'):
-                        value = value[1:-1]
-                    elif value.startswith("'") and value.endswith("'"):
-                        value = value[1:-1]
-                    
-                    env_vars[key] = value
-                
+        return parse_env_text(env_path.read_text(encoding='utf-8'))
     except Exception as e:
         print(f"Error parsing .env file {env_path}: {e}")
-    
-    return env_vars
+        return {}
+
+
+def _content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
 
 
-def write_env_file(env_path: Path, env_vars: Dict[str, str]) -> None:
-    """Write environment variables to .env file"""
+def _format_env_line(key: str, value: str) -> str:
+    # Quote values that contain spaces or special characters
+    if ' ' in value or any(c in value for c in ['#', '$', '`', '"', "'"]):
+        value = f'"{value}"'
+    return f"{key}={value}\n"
+
+
+def render_env_file(existing: Optional[str], env_vars: Dict[str, str]) -> str:
+    """
+    New .env content for env_vars, editing the existing content in place
+
+    Lines of unchanged keys, comments and blank lines are kept as they are; changed keys
+    are rewritten where they stand, removed keys dropped and new keys appended sorted.
+    """
+    if existing is None:
+        return ENV_FILE_HEADER + "".join(_format_env_line(key, env_vars[key]) for key in sorted(env_vars))
+
+    lines = []
+    written = set()
+    for line in existing.splitlines(keepends=True):
+        match = ENV_LINE_RE.match(line.strip())
+        if not match:
+            lines.append(line)
+            continue
+        key, value = match.groups()
+        if key not in env_vars or key in written:
+            continue
+        written.add(key)
+        if _unquote(value) == env_vars[key]:
+            lines.append(line if line.endswith("\n") else line + "\n")
+        else:
+            lines.append(_format_env_line(key, env_vars[key]))
+    lines.extend(_format_env_line(key, env_vars[key]) for key in sorted(set(env_vars) - written))
+    return "".join(lines)
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    """Replace the file in one step so readers never see a partial .env"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        if path.exists():
+            os.chmod(tmp_path, path.stat().st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_env_file(env_path: Path, env_vars: Dict[str, str]) -> str:
+    """Write environment variables to .env file; returns the file content"""
     try:
         # Ensure directory exists
         env_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Write .env file
-        with open(env_path, 'w', encoding='utf-8') as f:
-            f.write("# Environment Variables\n")
-            f.write("# This file is automatically synchronized with Project Settings\n\n")
-            
-            # Sort keys for consistent output
-            for key in sorted(env_vars.keys()):
-                value = env_vars[key]
-                
-                # Quote values that contain spaces or special characters
-                if ' ' in value or any(c in value for c in ['#', '$', '`', '"', "'"]):
-                    value = f'"{value}"'
-                
-                f.write(f"{key}={value}\n")
-                
-        from app.core.terminal_ui import ui
+        existing = env_path.read_text(encoding='utf-8') if env_path.exists() else None
+        content = render_env_file(existing, env_vars)
+        if content == existing:
+            return content
+        
+        _atomic_write(env_path, content)
         ui.success(f"Updated .env file: {env_path}", "EnvManager")
+        return content
         
     except Exception as e:
         ui.error(f"Error writing .env file {env_path}: {e}", "EnvManager")
         raise
 
 
-def load_env_vars_from_db(db: Session, project_id: str) -> Dict[str, str]:
-    """Load environment variables from database for a project"""
+def _read_env_file_state(project_id: str) -> Tuple[Optional[str], Dict[str, str]]:
+    """
+    Content hash and parsed variables of the project's .env file
+
+    An unchanged (mtime, size) signature returns the cached parse without reading the
+    file; a missing file has no hash and no variables.
+    """
+    entry = _cache_entry(project_id)
+    env_path = get_project_env_path(project_id)
+    try:
+        stat = env_path.stat()
+    except FileNotFoundError:
+        entry.file_signature = None
+        entry.file_hash, entry.file_vars = None, {}
+        return entry.file_hash, entry.file_vars
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if signature == entry.file_signature and entry.file_hash is not None:
+        return entry.file_hash, entry.file_vars
+
+    content = env_path.read_bytes()
+    file_hash = _content_hash(content)
+    if file_hash != entry.file_hash:
+        entry.file_hash = file_hash
+        entry.file_vars = parse_env_text(content.decode('utf-8', errors='replace'))
+    entry.file_signature = signature
+    return entry.file_hash, entry.file_vars
+
+
+def _remember_written_file(project_id: str, content: str) -> None:
+    entry = _cache_entry(project_id)
+    try:
+        stat = get_project_env_path(project_id).stat()
+        entry.file_signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        entry.file_signature = None
+    entry.file_hash = _content_hash(content.encode('utf-8'))
+    entry.file_vars = parse_env_text(content)
+    entry.synced_hash = entry.file_hash
+
+
+def _db_version(db: Session, project_id: str) -> Tuple[int, Optional[datetime]]:
+    """Changes whenever a row of the project is added, updated or deleted, by any worker"""
+    count, updated_at = db.query(func.count(EnvVar.id), func.max(EnvVar.updated_at)).filter(
+        EnvVar.project_id == project_id
+    ).one()
+    return count, updated_at
+
+
+def _load_db_state(db: Session, project_id: str) -> EnvCacheEntry:
+    """The project's cache entry with values that match the database, decrypting only when it changed"""
+    entry = _cache_entry(project_id)
+    version = _db_version(db, project_id)
+    if entry.values is not None and entry.db_version == version:
+        return entry
+    
     env_vars = {}
+    unreadable = set()
+    db_env_vars = db.query(EnvVar.key, EnvVar.value_encrypted).filter(
+        EnvVar.project_id == project_id
+    ).all()
     
+    for key, value_encrypted in db_env_vars:
+        try:
+            # Decrypt the value
+            env_vars[key] = secret_box.decrypt(value_encrypted)
+        except Exception as e:
+            ui.warning(f"Failed to decrypt env var {key}: {e}", "EnvManager")
+            unreadable.add(key)
+    entry.values, entry.unreadable, entry.db_version = env_vars, unreadable, version
+    return entry
+
+
+def load_env_vars_from_db(db: Session, project_id: str) -> Dict[str, str]:
+    """Load environment variables from database for a project (decrypted once, then cached)"""
     try:
-        db_env_vars = db.query(EnvVar).filter(
-            EnvVar.project_id == project_id
-        ).all()
-        
-        for env_var in db_env_vars:
-            try:
-                # Decrypt the value
-                decrypted_value = secret_box.decrypt(env_var.value_encrypted)
-                env_vars[env_var.key] = decrypted_value
-            except Exception as e:
-                print(f"⚠️  Failed to decrypt env var {env_var.key}: {e}")
-                
+        return dict(_load_db_state(db, project_id).values)
     except Exception as e:
-        from app.core.terminal_ui import ui
         ui.error(f"Error loading env vars from DB for project {project_id}: {e}", "EnvManager")
-    
-    return env_vars
+        return {}
 
 
-def sync_env_file_to_db(db: Session, project_id: str) -> int:
+def apply_env_file_changes(db: Session, project_id: str) -> Dict[str, List[str]]:
     """
-    Sync .env file contents to database (file -> DB)
-    Returns number of variables synced
+    Apply the .env file's differences to the database (file -> DB)
+    Returns the added, updated and removed keys
+
+    A file whose content hash matches the last sync is a no-op; otherwise only keys
+    whose values differ are encrypted and written. A missing file is a no-op too: a
+    deleted or not yet checked out .env must not remove every variable.
     """
-    env_path = get_project_env_path(project_id)
-    file_env_vars = parse_env_file(env_path)
+    entry = _cache_entry(project_id)
+    file_hash, file_env_vars = _read_env_file_state(project_id)
+    if file_hash is None:
+        return {"added": [], "updated": [], "removed": []}
+    if file_hash == entry.synced_hash and entry.values is not None:
+        return {"added": [], "updated": [], "removed": []}
     
-    synced_count = 0
+    db_state = _load_db_state(db, project_id)
+    db_values, unreadable = dict(db_state.values), set(db_state.unreadable)
+    # Undecryptable rows still exist: a file key overwrites them and a missing one removes them
+    db_keys = set(db_values) | unreadable
+    changed = {
+        key: value for key, value in file_env_vars.items()
+        if key in unreadable or db_values.get(key) != value
+    }
+    removed = db_keys - set(file_env_vars)
     
     try:
-        # Get existing env vars from DB
-        existing_vars = {
-            env_var.key: env_var 
-            for env_var in db.query(EnvVar).filter(EnvVar.project_id == project_id).all()
-        }
+        rows: Dict[str, List[EnvVar]] = {}
+        if changed or removed:
+            for env_var in db.query(EnvVar).filter(
+                EnvVar.project_id == project_id,
+                EnvVar.key.in_(list(changed) + list(removed))
+            ):
+                rows.setdefault(env_var.key, []).append(env_var)
         
         # Update or create env vars from file
-        for key, value in file_env_vars.items():
-            if key in existing_vars:
-                # Update existing
-                existing_var = existing_vars[key]
-                try:
-                    # Only update if value changed
-                    current_value = secret_box.decrypt(existing_var.value_encrypted)
-                    if current_value != value:
-                        existing_var.value_encrypted = secret_box.encrypt(value)
-                        synced_count += 1
-                except Exception as e:
-                    print(f"⚠️  Failed to decrypt existing value for {key}: {e}")
-                    existing_var.value_encrypted = secret_box.encrypt(value)
-                    synced_count += 1
+        for key, value in changed.items():
+            value_encrypted = secret_box.encrypt(value)
+            if key in rows:
+                for existing_var in rows[key]:
+                    existing_var.value_encrypted = value_encrypted
+                    existing_var.key_version = secret_box.primary_key_id
             else:
-                # Create new
-                import uuid
-                new_env_var = EnvVar(
+                db.add(EnvVar(
                     id=str(uuid.uuid4()),
                     project_id=project_id,
                     key=key,
-                    value_encrypted=secret_box.encrypt(value),
+                    value_encrypted=value_encrypted,
+                    key_version=secret_box.primary_key_id,
                     scope="runtime",
                     var_type="string",
                     is_secret=True
-                )
-                db.add(new_env_var)
-                synced_count += 1
+                ))
         
         # Remove env vars from DB that are not in file
-        file_keys = set(file_env_vars.keys())
-        for key, existing_var in existing_vars.items():
-            if key not in file_keys:
+        for key in removed:
+            for existing_var in rows.get(key, []):
                 db.delete(existing_var)
-                synced_count += 1
         
         db.commit()
-        from app.core.terminal_ui import ui
-        ui.success(f"Synced {synced_count} env vars from file to DB", "EnvManager")
+        entry.values, entry.unreadable = dict(file_env_vars), set()
+        if changed or removed:
+            # Another worker may have committed in between; the next read revalidates
+            entry.db_version = None
+        entry.synced_hash = file_hash
         
     except Exception as e:
         ui.error(f"Error syncing env file to DB: {e}", "EnvManager")
         db.rollback()
+        invalidate_env_cache(project_id)
         raise
     
+    return {
+        "added": sorted(key for key in changed if key not in db_keys),
+        "updated": sorted(key for key in changed if key in db_keys),
+        "removed": sorted(removed),
+    }
+
+
+def sync_env_file_to_db(db: Session, project_id: str) -> int:
+    """
+    Sync .env file contents to database (file -> DB)
+    Returns number of variables synced
+    """
+    changes = apply_env_file_changes(db, project_id)
+    synced_count = sum(len(keys) for keys in changes.values())
+    if synced_count:
+        ui.success(f"Synced {synced_count} env vars from file to DB", "EnvManager")
     return synced_count
 
 
@@ -184,9 +366,9 @@ def sync_db_to_env_file(db: Session, project_id: str) -> int:
         
         # Write to file
         env_path = get_project_env_path(project_id)
-        write_env_file(env_path, env_vars)
+        content = write_env_file(env_path, env_vars)
+        _remember_written_file(project_id, content)
         
-        print(f"✅ Synced {len(env_vars)} env vars from DB to file")
         return len(env_vars)
         
     except Exception as e:
@@ -202,8 +384,10 @@ def get_env_var_conflicts(db: Session, project_id: str) -> List[Dict]:
     conflicts = []
     
     try:
-        env_path = get_project_env_path(project_id)
-        file_env_vars = parse_env_file(env_path)
+        entry = _cache_entry(project_id)
+        file_hash, file_env_vars = _read_env_file_state(project_id)
+        if file_hash == entry.synced_hash and entry.values is not None:
+            return conflicts
         db_env_vars = load_env_vars_from_db(db, project_id)
         
         # Check for differences
@@ -231,18 +415,23 @@ def get_env_var_conflicts(db: Session, project_id: str) -> List[Dict]:
     return conflicts
 
 
+def _forget_db_values(project_id: str) -> None:
+    """After a committed change the cached values are reloaded on the next read; file state is kept"""
+    entry = _cache_entry(project_id)
+    entry.values, entry.unreadable, entry.db_version = None, set(), None
+
+
 def create_env_var(db: Session, project_id: str, key: str, value: str, 
                    scope: str = "runtime", var_type: str = "string", 
                    is_secret: bool = True, description: Optional[str] = None) -> EnvVar:
     """Create a new environment variable and sync to file"""
-    import uuid
-    
     # Create in database
     env_var = EnvVar(
         id=str(uuid.uuid4()),
         project_id=project_id,
         key=key,
         value_encrypted=secret_box.encrypt(value),
+        key_version=secret_box.primary_key_id,
         scope=scope,
         var_type=var_type,
         is_secret=is_secret,
@@ -251,6 +440,7 @@ def create_env_var(db: Session, project_id: str, key: str, value: str,
     
     db.add(env_var)
     db.commit()
+    _forget_db_values(project_id)
     
     # Sync to file
     sync_db_to_env_file(db, project_id)
@@ -268,9 +458,14 @@ def update_env_var(db: Session, project_id: str, key: str, value: str) -> bool:
     if not env_var:
         return False
     
+    if load_env_vars_from_db(db, project_id).get(key) == value:
+        return True
+    
     # Update in database
     env_var.value_encrypted = secret_box.encrypt(value)
+    env_var.key_version = secret_box.primary_key_id
     db.commit()
+    _forget_db_values(project_id)
     
     # Sync to file
     sync_db_to_env_file(db, project_id)
@@ -291,8 +486,9 @@ def delete_env_var(db: Session, project_id: str, key: str) -> bool:
     # Delete from database
     db.delete(env_var)
     db.commit()
+    _forget_db_values(project_id)
     
     # Sync to file
     sync_db_to_env_file(db, project_id)
     
-    return True
\ No newline at end of file
+    return True
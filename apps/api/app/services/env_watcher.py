@@ -0,0 +1,143 @@
+"""
+.env File Watcher
+Syncs edits to a project's repo/.env into env_vars while its UI is connected and
+pushes an env_updated event with the changed keys
+"""
+import asyncio
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.terminal_ui import ui
+from app.core.websocket.manager import manager
+from app.services.env_manager import apply_env_file_changes, get_project_env_path
+
+
+# Fallback stat interval when the optional watchfiles package is not installed
+POLL_INTERVAL_SECONDS = 1.0
+
+
+def watchfiles_available() -> bool:
+    """Native file events come from watchfiles (installed with uvicorn[standard])"""
+    try:
+        import watchfiles  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class EnvFileWatcher:
+    """One debounced watch task per project"""
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def watch(self, project_id: str) -> None:
+        task = self._tasks.get(project_id)
+        if task is not None and not task.done():
+            return
+        if not get_project_env_path(project_id).parent.is_dir():
+            return
+        self._tasks[project_id] = asyncio.create_task(self._run(project_id))
+
+    async def unwatch(self, project_id: str) -> None:
+        task = self._tasks.pop(project_id, None)
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def stop_all(self) -> None:
+        for project_id in list(self._tasks):
+            await self.unwatch(project_id)
+
+    async def _run(self, project_id: str) -> None:
+        # Pick up edits made while nobody was watching
+        await self._sync(project_id)
+        try:
+            if watchfiles_available():
+                await self._watch_events(project_id)
+            else:
+                await self._watch_polling(project_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            ui.warning(f"Stopped watching .env for project {project_id}: {e}", "EnvWatcher")
+
+    async def _watch_events(self, project_id: str) -> None:
+        from watchfiles import awatch
+
+        env_path = get_project_env_path(project_id).resolve()
+        quiet_ms = int(settings.env_watch_debounce_seconds * 1000)
+        # The repo directory is watched (not the file) so atomic replaces are seen too.
+        # awatch yields a burst once no event arrived for `step` ms, or after `debounce` ms at most
+        async for _ in awatch(
+            env_path.parent,
+            watch_filter=lambda change, path: path == str(env_path),
+            step=quiet_ms,
+            debounce=max(quiet_ms * 10, 1600),
+            recursive=False,
+        ):
+            await self._sync(project_id)
+
+    async def _watch_polling(self, project_id: str) -> None:
+        env_path = get_project_env_path(project_id)
+        last_signature = self._signature(env_path)
+        while True:
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+            signature = self._signature(env_path)
+            if signature == last_signature:
+                continue
+            # Debounce: wait until the file stops changing
+            while True:
+                await asyncio.sleep(settings.env_watch_debounce_seconds)
+                settled = self._signature(env_path)
+                if settled == signature:
+                    break
+                signature = settled
+            last_signature = signature
+            await self._sync(project_id)
+
+    @staticmethod
+    def _signature(env_path) -> Optional[tuple]:
+        try:
+            stat = env_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _apply_changes(project_id: str) -> Dict[str, List[str]]:
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            return apply_env_file_changes(db, project_id)
+        finally:
+            db.close()
+
+    async def _sync(self, project_id: str) -> None:
+        # Blocking DB queries and encryption run off the event loop
+        try:
+            changes = await asyncio.to_thread(self._apply_changes, project_id)
+        except Exception as e:
+            ui.warning(f"Failed to sync .env for project {project_id}: {e}", "EnvWatcher")
+            return
+
+        if not any(changes.values()):
+            return
+        ui.info(
+            f"Synced .env for project {project_id}: {len(changes['added'])} added, "
+            f"{len(changes['updated'])} updated, {len(changes['removed'])} removed",
+            "EnvWatcher"
+        )
+        # Keys only: values are secrets and the UI refetches what it shows
+        await manager.send_message(project_id, {
+            "type": "env_updated",
+            "data": {"source": "file", **changes}
+        })
+
+
+# Global .env watcher instance
+env_watcher = EnvFileWatcher()
@@ -0,0 +1,199 @@
+"""
+GitHub API Request Scheduler
+Conditional-request (ETag) cache, request coalescing and rate-limit pacing for GitHub REST calls
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.terminal_ui import ui
+
+
+class CachedResponse:
+    """The parts of an httpx.Response the GitHub service reads, replayable from the cache"""
+
+    def __init__(self, status_code: int, content: bytes, headers: Dict[str, str], from_cache: bool = False):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class RateLimitState:
+    """Core API budget for one token, as last reported by GitHub"""
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0  # epoch seconds
+        self.blocked_until = 0.0  # set by Retry-After on secondary limits
+        self.next_allowed_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def update(self, response: httpx.Response) -> None:
+        headers = response.headers
+        try:
+            if "x-ratelimit-remaining" in headers:
+                self.remaining = int(headers["x-ratelimit-remaining"])
+                self.limit = int(headers.get("x-ratelimit-limit", self.limit or 0)) or self.limit
+                self.reset_at = float(headers.get("x-ratelimit-reset", self.reset_at))
+            if response.status_code in (403, 429) and "retry-after" in headers:
+                self.blocked_until = time.time() + float(headers["retry-after"])
+        except ValueError:
+            pass
+
+    def delay(self) -> float:
+        """Seconds to wait before the next request so the budget lasts until the reset"""
+        now = time.time()
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.remaining is None or self.reset_at <= now:
+            return 0.0
+        if self.remaining <= 0:
+            return self.reset_at - now
+        if self.remaining > (self.limit or 5000) * settings.github_rate_limit_reserve:
+            return 0.0
+        # Inside the reserve: spread what is left evenly over the rest of the window
+        spacing = (self.reset_at - now) / self.remaining
+        return max(self.next_allowed_at + spacing - now, 0.0)
+
+
+class GitHubRequestScheduler:
+    """
+    Sends GitHub requests through one place
+
+    GETs are cached per URL and token and revalidated with If-None-Match (304s do not
+    count against the rate limit); identical GETs in flight are coalesced; every request
+    is paced once the remaining budget drops into the reserve.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._limits: Dict[str, RateLimitState] = {}
+
+    @staticmethod
+    def _token_key(headers: Dict[str, str]) -> str:
+        return hashlib.sha256(headers.get("Authorization", "").encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _cache_key(token_key: str, url: str, params: Optional[Dict[str, Any]]) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        return f"{token_key} {url}?{query}"
+
+    def rate_limit(self, headers: Dict[str, str]) -> RateLimitState:
+        return self._limits.setdefault(self._token_key(headers), RateLimitState())
+
+    def invalidate(self, url_prefix: str) -> None:
+        """Drop cached GETs whose URL starts with the prefix (after writes to that resource)"""
+        for key in [key for key in self._cache if key.split(" ", 1)[1].startswith(url_prefix)]:
+            del self._cache[key]
+
+    async def _wait_for_budget(self, state: RateLimitState) -> None:
+        async with state.lock:
+            delay = state.delay()
+            if delay > settings.github_rate_limit_max_wait_seconds:
+                raise httpx.HTTPError(f"GitHub rate limit exhausted; resets in {int(delay)}s")
+            if delay > 0:
+                ui.warning(f"GitHub rate limit low ({state.remaining} left), waiting {delay:.1f}s", "GitHub")
+                await asyncio.sleep(delay)
+            state.next_allowed_at = time.time()
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]] = None,
+        payload: Any = None
+    ) -> Any:
+        if method != "GET":
+            return await self._send(client, method, url, headers, params, payload)
+
+        key = self._cache_key(self._token_key(headers), url, params)
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            response = await self._get(client, key, url, headers, params)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def _get(
+        self,
+        client: httpx.AsyncClient,
+        key: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]]
+    ) -> CachedResponse:
+        cached = self._cache.get(key)
+        now = time.monotonic()
+        if cached and cached[1].status_code == 404 and now - cached[0] < settings.github_negative_cache_seconds:
+            return CachedResponse(404, cached[1].content, cached[1].headers, from_cache=True)
+
+        request_headers = dict(headers)
+        if cached and cached[1].headers.get("etag"):
+            request_headers["If-None-Match"] = cached[1].headers["etag"]
+        response = await self._send(client, "GET", url, request_headers, params)
+
+        if response.status_code == 304 and cached:
+            self._cache.move_to_end(key)
+            self._cache[key] = (now, cached[1])
+            return CachedResponse(cached[1].status_code, cached[1].content, cached[1].headers, from_cache=True)
+
+        result = CachedResponse(response.status_code, response.content, dict(response.headers))
+        if (response.status_code == 200 and "etag" in response.headers) or response.status_code == 404:
+            self._cache[key] = (now, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.pop(key, None)
+        return result
+
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]] = None,
+        payload: Any = None
+    ) -> httpx.Response:
+        state = self.rate_limit(headers)
+        await self._wait_for_budget(state)
+        response = await client.request(method, url, headers=headers, params=params, json=payload)
+        state.update(response)
+        return response
+
+
+# Global scheduler shared by all GitHubService instances
+github_requests = GitHubRequestScheduler()
@@ -0,0 +1,182 @@
+"""
+GitHub Push Queue
+Per-project background push workers that coalesce back-to-back publish requests
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.terminal_ui import ui
+from app.core.websocket.manager import manager
+from app.db.session import SessionLocal
+from app.models.project_services import ProjectServiceConnection
+from app.services.git_ops import commit_all, push_to_remote
+
+
+# Git subprocesses for all projects share this bounded pool
+_push_executor = ThreadPoolExecutor(max_workers=settings.github_push_workers, thread_name_prefix="git-push")
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _blocking_push(repo_path: str, branch: str) -> dict:
+    # Commit any pending changes (optional harmless)
+    commit_all(repo_path, "Publish from Lovable UI")
+    return push_to_remote(repo_path, "origin", branch)
+
+
+def _record_push_state(project_id: str, state: dict) -> None:
+    """Store push progress on the GitHub connection (and publish time on Vercel)"""
+    db = SessionLocal()
+    try:
+        connection = db.query(ProjectServiceConnection).filter(
+            ProjectServiceConnection.project_id == project_id,
+            ProjectServiceConnection.provider == "github"
+        ).first()
+        if not connection:
+            return
+
+        data = dict(connection.service_data or {})
+        data["push"] = state
+        if state["status"] == "succeeded":
+            data["last_push_at"] = state["finished_at"]
+            data["last_pushed_branch"] = state["branch"]
+
+            vercel_conn = db.query(ProjectServiceConnection).filter(
+                ProjectServiceConnection.project_id == project_id,
+                ProjectServiceConnection.provider == "vercel"
+            ).first()
+            if vercel_conn:
+                vercel_data = dict(vercel_conn.service_data or {})
+                # Don't set deployment_url until actual deployment happens
+                vercel_data["last_published_at"] = state["finished_at"]
+                vercel_conn.service_data = vercel_data
+        connection.service_data = data
+        db.commit()
+    except Exception as e:
+        ui.warning(f"Failed recording push state for {project_id}: {e}", "GitHub")
+        db.rollback()
+    finally:
+        db.close()
+
+
+class ProjectPushWorker:
+    """
+    Runs pushes for one project, one at a time
+
+    Requests that arrive while a push is running share a single follow-up push,
+    so a burst of N publishes costs at most two pushes.
+    """
+
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+        self.repo_path: Optional[str] = None
+        self.branch = "main"
+        self._next: Optional[asyncio.Future] = None
+        self._coalesced = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def busy(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def enqueue(self, repo_path: str, branch: str) -> asyncio.Future:
+        """Queue a push and return a future resolving to the push_to_remote result"""
+        self.repo_path = repo_path
+        self.branch = branch
+        if self._next is None:
+            self._next = asyncio.get_running_loop().create_future()
+            self._coalesced = 0
+        else:
+            self._coalesced += 1
+        future = self._next
+
+        if not self.busy:
+            self._task = asyncio.create_task(self._run())
+        return future
+
+    async def _publish(self, state: dict) -> None:
+        """Record and broadcast push progress; failures here never affect the push itself"""
+        try:
+            await asyncio.to_thread(_record_push_state, self.project_id, state)
+            await manager.broadcast_to_project(self.project_id, {
+                "type": "github_push",
+                "data": state,
+                "timestamp": _now()
+            })
+        except Exception as e:
+            ui.warning(f"Failed publishing push state for {self.project_id}: {e}", "GitHub")
+
+    async def _push_once(self, repo_path: str, branch: str, coalesced: int) -> dict:
+        state = {
+            "status": "pushing",
+            "branch": branch,
+            "coalesced_requests": coalesced + 1,
+            "started_at": _now(),
+        }
+        await self._publish(state)
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(_push_executor, _blocking_push, repo_path, branch)
+        except Exception as e:
+            result = {"success": False, "error": str(e), "remote": "origin", "branch": branch}
+
+        state = {
+            **state,
+            "status": "succeeded" if result.get("success") else "failed",
+            "finished_at": _now(),
+            "error": None if result.get("success") else result.get("error"),
+        }
+        if result.get("success"):
+            ui.success(f"Pushed {self.project_id} to origin/{branch}", "GitHub")
+        else:
+            ui.error(f"Push failed for {self.project_id}: {state['error']}", "GitHub")
+        await self._publish(state)
+        return result
+
+    async def _run(self) -> None:
+        try:
+            while self._next is not None:
+                future, self._next = self._next, None
+                try:
+                    result = await self._push_once(self.repo_path, self.branch, self._coalesced)
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as e:
+                    ui.error(f"Push worker error for {self.project_id}: {e}", "GitHub")
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            # Never leave a queued request waiting on a worker that is gone
+            if self._next is not None and not self._next.done():
+                self._next.cancel()
+                self._next = None
+
+
+class GitHubPushQueue:
+    """Registry of per-project push workers"""
+
+    def __init__(self):
+        self.workers: Dict[str, ProjectPushWorker] = {}
+
+    def enqueue(self, project_id: str, repo_path: str, branch: str) -> asyncio.Future:
+        worker = self.workers.get(project_id)
+        if worker is None:
+            worker = self.workers[project_id] = ProjectPushWorker(project_id)
+        return worker.enqueue(repo_path, branch)
+
+    def is_busy(self, project_id: str) -> bool:
+        worker = self.workers.get(project_id)
+        return bool(worker and worker.busy)
+
+
+# Global push queue instance
+github_push_queue = GitHubPushQueue()
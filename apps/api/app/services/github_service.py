@@ -1,12 +1,15 @@
 """
 GitHub API service for repository management
 """
-import httpx
 import json
 from typing import Dict, Any, Optional
 from urllib.parse import quote
 import logging
 
+from app.core.config import settings
+from app.services.github_api_cache import github_requests
+from app.services.http_clients import github_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,7 +24,7 @@ class GitHubAPIError(Exception):
 class GitHubService:
     """GitHub API service for repository operations"""
     
-    BASE_URL = "https://api.github.com"
+    BASE_URL = settings.github_api_base
     
     def __init__(self, token: str):
         self.token = token
@@ -33,9 +36,10 @@ class GitHubService:
     
     async def check_token_validity(self) -> Dict[str, Any]:
         """Check if the GitHub token is valid and get user info"""
-        async with httpx.AsyncClient() as client:
+        async with github_client() as client:
             try:
-                response = await client.get(
+                response = await github_requests.request(
+                    client, "GET",
                     f"{self.BASE_URL}/user",
                     headers=self.headers
                 )
@@ -60,9 +64,10 @@ class GitHubService:
     
     async def check_repository_exists(self, repo_name: str, username: str) -> bool:
         """Check if a repository exists for the authenticated user"""
-        async with httpx.AsyncClient() as client:
+        async with github_client() as client:
             try:
-                response = await client.get(
+                response = await github_requests.request(
+                    client, "GET",
                     f"{self.BASE_URL}/repos/{username}/{repo_name}",
                     headers=self.headers
                 )
@@ -93,7 +98,7 @@ class GitHubService:
         if await self.check_repository_exists(repo_name, username):
             raise GitHubAPIError(f"Repository '{repo_name}' already exists", 409)
         
-        async with httpx.AsyncClient() as client:
+        async with github_client() as client:
             try:
                 payload = {
                     "name": repo_name,
@@ -107,14 +112,17 @@ class GitHubService:
                     "has_downloads": True
                 }
                 
-                response = await client.post(
+                response = await github_requests.request(
+                    client, "POST",
                     f"{self.BASE_URL}/user/repos",
                     headers=self.headers,
-                    json=payload
+                    payload=payload
                 )
                 
                 if response.status_code == 201:
                     repo_data = response.json()
+                    github_requests.invalidate(f"{self.BASE_URL}/repos/{username}/{repo_name}")
+                    github_requests.invalidate(f"{self.BASE_URL}/user/repos")
                     return {
                         "success": True,
                         "repo_url": repo_data["html_url"],
@@ -150,9 +158,10 @@ class GitHubService:
     
     async def get_repository_info(self, username: str, repo_name: str) -> Optional[Dict[str, Any]]:
         """Get repository information including repository ID"""
-        async with httpx.AsyncClient() as client:
+        async with github_client() as client:
             try:
-                response = await client.get(
+                response = await github_requests.request(
+                    client, "GET",
                     f"{self.BASE_URL}/repos/{username}/{repo_name}",
                     headers=self.headers
                 )
@@ -179,9 +188,10 @@ class GitHubService:
     
     async def get_user_repositories(self, per_page: int = 30, page: int = 1) -> Dict[str, Any]:
         """Get user's repositories"""
-        async with httpx.AsyncClient() as client:
+        async with github_client() as client:
             try:
-                response = await client.get(
+                response = await github_requests.request(
+                    client, "GET",
                     f"{self.BASE_URL}/user/repos",
                     headers=self.headers,
                     params={
@@ -0,0 +1,100 @@
+"""
+Shared HTTP Clients
+App-lifetime keep-alive connection pools for the GitHub (httpx) and Vercel (aiohttp) APIs
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import aiohttp
+import httpx
+
+from app.core.config import settings
+from app.core.terminal_ui import ui
+
+
+_github_client: Optional[httpx.AsyncClient] = None
+_vercel_session: Optional[aiohttp.ClientSession] = None
+
+
+def http2_available() -> bool:
+    """httpx negotiates HTTP/2 only when the optional h2 package is installed"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_httpx_client(**overrides) -> httpx.AsyncClient:
+    options = {
+        "http2": http2_available(),
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_connections_per_host,
+            keepalive_expiry=settings.http_keepalive_seconds,
+        ),
+        "timeout": httpx.Timeout(settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds),
+    }
+    options.update(overrides)
+    return httpx.AsyncClient(**options)
+
+
+def create_aiohttp_session(**overrides) -> aiohttp.ClientSession:
+    # aiohttp speaks HTTP/1.1 only; reuse comes from the keep-alive pool
+    connector = aiohttp.TCPConnector(
+        limit=settings.http_max_connections,
+        limit_per_host=settings.http_max_connections_per_host,
+        keepalive_timeout=settings.http_keepalive_seconds,
+        ttl_dns_cache=300,
+    )
+    options = {
+        "connector": connector,
+        "timeout": aiohttp.ClientTimeout(
+            total=settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds
+        ),
+    }
+    options.update(overrides)
+    return aiohttp.ClientSession(**options)
+
+
+def get_github_client() -> httpx.AsyncClient:
+    global _github_client
+    if _github_client is None or _github_client.is_closed:
+        _github_client = create_httpx_client()
+    return _github_client
+
+
+def get_vercel_session() -> aiohttp.ClientSession:
+    """Must be called from the running event loop (the session binds to it)"""
+    global _vercel_session
+    if _vercel_session is None or _vercel_session.closed:
+        _vercel_session = create_aiohttp_session()
+    return _vercel_session
+
+
+@asynccontextmanager
+async def github_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Drop-in for `async with httpx.AsyncClient()` that leaves the shared pool open"""
+    yield get_github_client()
+
+
+@asynccontextmanager
+async def vercel_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """Drop-in for `async with aiohttp.ClientSession()` that leaves the shared pool open"""
+    yield get_vercel_session()
+
+
+async def start_http_clients() -> None:
+    get_github_client()
+    get_vercel_session()
+    ui.info(f"HTTP client pools ready (GitHub HTTP/2: {'on' if http2_available() else 'off'})", "HTTP")
+
+
+async def close_http_clients() -> None:
+    global _github_client, _vercel_session
+    if _github_client is not None:
+        await _github_client.aclose()
+        _github_client = None
+    if _vercel_session is not None:
+        await _vercel_session.close()
+        _vercel_session = None
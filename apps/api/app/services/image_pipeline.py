@@ -0,0 +1,127 @@
+"""
+Image Pipeline
+Downscales and re-encodes oversized image attachments in a process pool, so the CLI
+reads smaller files (fewer image tokens) and the event loop never decodes images
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.terminal_ui import ui
+
+
+def pillow_available() -> bool:
+    """Resizing needs the optional Pillow package; without it attachments pass through unchanged"""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def derived_path(source_path: str, sha256: str, ext: str) -> str:
+    return os.path.join(os.path.dirname(source_path), "derived", f"{sha256}-{settings.image_max_dimension}{ext}")
+
+
+def prepare_image(source_path: str, sha256: str, max_dimension: int, max_bytes: int) -> Optional[Dict[str, Any]]:
+    """
+    Runs in a worker process
+
+    Returns None when the original can be used as is, otherwise writes a downscaled copy
+    (PNG when the image has transparency, JPEG otherwise) and describes it.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as image:
+        fits = max(image.size) <= max_dimension and os.path.getsize(source_path) <= max_bytes
+        if fits and image.format in ("PNG", "JPEG", "WEBP", "GIF"):
+            return None
+
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension))
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        if has_alpha:
+            ext, mime_type, save_args = ".png", "image/png", {"format": "PNG", "optimize": True}
+            image = image.convert("RGBA")
+        else:
+            ext, mime_type, save_args = ".jpg", "image/jpeg", {"format": "JPEG", "quality": 85, "optimize": True}
+            image = image.convert("RGB")
+
+        target = os.path.join(os.path.dirname(source_path), "derived", f"{sha256}-{max_dimension}{ext}")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp_path = f"{target}.{os.getpid()}.tmp"
+        image.save(temp_path, **save_args)
+        os.replace(temp_path, target)
+        return {"path": target, "mime_type": mime_type, "size": os.path.getsize(target), "dimensions": image.size}
+
+
+class ImagePipeline:
+    """Process pool plus per-image memo of what the CLI should read"""
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._results: Dict[str, asyncio.Future] = {}
+        self._warned = False
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and DB pools is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=settings.image_pipeline_workers, mp_context=get_context("spawn")
+            )
+        return self._executor
+
+    async def _prepare(self, attachment: Dict[str, Any]) -> Dict[str, Any]:
+        for ext in (".jpg", ".png"):
+            cached = derived_path(attachment["path"], attachment["sha256"], ext)
+            if os.path.exists(cached):
+                return {**attachment, "path": cached, "mime_type": "image/png" if ext == ".png" else "image/jpeg"}
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), prepare_image, attachment["path"], attachment["sha256"],
+                settings.image_max_dimension, settings.image_max_bytes
+            )
+        except Exception as e:
+            ui.warning(f"Image {attachment.get('name') or attachment['sha256'][:12]} not resized: {e}", "Images")
+            return attachment
+        if result is None:
+            return attachment
+        ui.debug(
+            f"Resized {attachment.get('name') or attachment['sha256'][:12]} to "
+            f"{result['dimensions'][0]}x{result['dimensions'][1]} ({result['size']} bytes)", "Images"
+        )
+        return {**attachment, "path": result["path"], "mime_type": result["mime_type"]}
+
+    def prepare(self, attachment: Dict[str, Any]) -> "asyncio.Future[Dict[str, Any]]":
+        """Start (or join) preparation of one attachment: {name, path, mime_type, sha256}"""
+        if not pillow_available() or not attachment.get("sha256"):
+            if not self._warned and attachment.get("sha256"):
+                ui.warning("Pillow is not installed; image attachments are passed through unresized", "Images")
+                self._warned = True
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(attachment)
+            return future
+        key = f"{attachment['path']}:{settings.image_max_dimension}"
+        future = self._results.get(key)
+        if future is None or (future.done() and (future.cancelled() or future.exception())):
+            future = self._results[key] = asyncio.ensure_future(self._prepare(attachment))
+        return future
+
+    async def prepare_all(self, attachments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        prepared = await asyncio.gather(*(self.prepare(attachment) for attachment in attachments))
+        # The memo only needs to bridge upload -> run; keep it from growing without bound
+        if len(self._results) > 1024:
+            self._results = {key: future for key, future in self._results.items() if not future.done()}
+        return list(prepared)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global image pipeline instance
+image_pipeline = ImagePipeline()
@@ -0,0 +1,200 @@
+"""
+Encryption Key Rotation
+Re-encrypts env_vars under the current key in small checkpointed batches, so a
+rotation neither holds one long transaction nor blocks requests, and resumes after
+a restart
+"""
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from cryptography.fernet import InvalidToken
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.crypto import secret_box
+from app.core.terminal_ui import ui
+from app.models.env_vars import EnvVar
+from app.models.key_rotations import KeyRotation
+
+
+# Rows re-encrypted per transaction
+BATCH_SIZE = 200
+
+# Pause between batches so request traffic gets the database in between
+BATCH_PAUSE_SECONDS = 0.05
+
+
+def _needs_rotation():
+    return or_(EnvVar.key_version.is_(None), EnvVar.key_version != secret_box.primary_key_id)
+
+
+def count_pending(db: Session) -> int:
+    """Env vars not yet encrypted under the current key"""
+    return db.execute(select(func.count()).select_from(EnvVar).where(_needs_rotation())).scalar_one()
+
+
+def get_rotation(db: Session, job_id: Optional[str] = None) -> Optional[KeyRotation]:
+    """A job by id, or the most recent one"""
+    if job_id:
+        return db.get(KeyRotation, job_id)
+    return db.execute(select(KeyRotation).order_by(KeyRotation.started_at.desc()).limit(1)).scalar_one_or_none()
+
+
+def start_rotation(db: Session) -> KeyRotation:
+    """Create a job for the current key, or return the one already running for it"""
+    running = db.execute(select(KeyRotation).where(KeyRotation.status == "running")).scalars().all()
+    for job in running:
+        if job.target_key_id == secret_box.primary_key_id:
+            return job
+        # The key changed again since this job started; a new pass covers its rows too
+        job.status = "cancelled"
+        job.finished_at = datetime.utcnow()
+
+    job = KeyRotation(
+        id=str(uuid.uuid4()),
+        target_key_id=secret_box.primary_key_id,
+        status="running",
+        total=count_pending(db)
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def rotate_batch(job_id: str) -> bool:
+    """Re-encrypt the next batch after the job's checkpoint; returns True once the job is finished"""
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        job = db.get(KeyRotation, job_id)
+        if job is None or job.status != "running":
+            return True
+        if job.target_key_id != secret_box.primary_key_id:
+            job.status = "cancelled"
+            job.error = "Encryption key changed during rotation"
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            return True
+
+        query = select(EnvVar.id, EnvVar.value_encrypted).where(_needs_rotation())
+        if job.last_id is not None:
+            query = query.where(EnvVar.id > job.last_id)
+        rows = db.execute(query.order_by(EnvVar.id).limit(BATCH_SIZE)).all()
+
+        for row_id, value_encrypted in rows:
+            try:
+                rotated = secret_box.rotate(value_encrypted)
+            except InvalidToken:
+                job.failed += 1
+                continue
+            # Skip rows rewritten since they were read; the writer already used the current key
+            result = db.execute(
+                update(EnvVar)
+                .where(EnvVar.id == row_id, EnvVar.value_encrypted == value_encrypted)
+                .values(value_encrypted=rotated, key_version=job.target_key_id)
+            )
+            job.rotated += result.rowcount
+
+        job.processed += len(rows)
+        job.updated_at = datetime.utcnow()
+        if rows:
+            job.last_id = rows[-1][0]
+        if len(rows) < BATCH_SIZE:
+            job.status = "completed"
+            job.finished_at = job.updated_at
+        db.commit()
+        return job.status != "running"
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class KeyRotationRunner:
+    """Drives one rotation job at a time in the background"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.job_id: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def run(self, job_id: str) -> None:
+        if self.running and self.job_id == job_id:
+            return
+        if self.running:
+            self._task.cancel()
+        self.job_id = job_id
+        self._task = asyncio.create_task(self._run(job_id))
+
+    async def _run(self, job_id: str) -> None:
+        ui.info(f"Re-encrypting env vars under key {secret_box.primary_key_id}", "Crypto")
+        try:
+            while not await asyncio.to_thread(rotate_batch, job_id):
+                await asyncio.sleep(BATCH_PAUSE_SECONDS)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The checkpoint is committed per batch; resume() picks the job up again
+            ui.error(f"Key rotation {job_id} stopped: {e}", "Crypto")
+            return
+
+        def summary():
+            from app.db.session import SessionLocal
+            with SessionLocal() as db:
+                job = db.get(KeyRotation, job_id)
+                return (job.status, job.rotated, job.failed) if job else (None, 0, 0)
+
+        status, rotated, failed = await asyncio.to_thread(summary)
+        if status == "completed":
+            ui.success(f"Key rotation finished: {rotated} re-encrypted, {failed} unreadable", "Crypto")
+
+    async def resume(self) -> Optional[str]:
+        """
+        Continue an interrupted job, or start one when rows are not under the current key
+
+        Each key gets one automatic pass; rows no configured key can decrypt are left as
+        they are and counted as failed.
+        """
+        from app.db.session import SessionLocal
+
+        def pick_job() -> Optional[str]:
+            with SessionLocal() as db:
+                running = db.execute(
+                    select(KeyRotation).where(
+                        KeyRotation.status == "running",
+                        KeyRotation.target_key_id == secret_box.primary_key_id
+                    )
+                ).scalars().first()
+                if running:
+                    return running.id
+                attempted = db.execute(
+                    select(KeyRotation.id).where(KeyRotation.target_key_id == secret_box.primary_key_id).limit(1)
+                ).first()
+                if attempted or not db.execute(select(EnvVar.id).where(_needs_rotation()).limit(1)).first():
+                    return None
+                return start_rotation(db).id
+
+        job_id = await asyncio.to_thread(pick_job)
+        if job_id:
+            self.run(job_id)
+        return job_id
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global key rotation runner instance
+key_rotation_runner = KeyRotationRunner()
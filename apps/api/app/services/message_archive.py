@@ -0,0 +1,474 @@
+"""
+Message Archive
+Moves old conversations out of the database into per-project compressed JSONL segments
+
+Layout under data/projects/{id}/data/archive:
+    index.json                  segment list with per-frame byte offsets and key ranges
+    000001-<hex>.jsonl.zst      independently compressed frames of up to FRAME_MESSAGES rows
+    000001-<hex>.jsonl.zst.ids  "<message id>\t<frame number>" per archived row, for id lookups
+
+Frames are keyed by (created_at, id), the same order used by message pagination,
+so a page read only decompresses the frames that overlap it.
+"""
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.terminal_ui import ui
+from app.models.messages import Message
+from app.models.user_requests import UserRequest
+from app.services.message_payloads import load_payloads
+from app.services.message_search import rebuild_message_fts
+from app.services.project_summaries import refresh_project_summary
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency; gzip frames are used instead
+    zstandard = None
+
+
+INDEX_VERSION = 1
+
+# Messages per compressed frame (the unit of decompression on read)
+FRAME_MESSAGES = 256
+
+# Messages moved per segment file
+SEGMENT_MESSAGES = 5000
+
+# Decoded frames kept in memory, mostly so scrolling back reuses the previous page's frames
+FRAME_CACHE_SIZE = 16
+
+Key = Tuple[str, str]  # (created_at ISO string, message id)
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+_frame_cache: "OrderedDict[Tuple[str, int], List[dict]]" = OrderedDict()
+_frame_cache_lock = threading.Lock()
+# Parsed index.json and id -> (segment file, frame number) maps, keyed by index.json's stat signature
+_index_cache: Dict[str, Tuple[tuple, dict]] = {}
+_id_maps: Dict[str, Tuple[tuple, Dict[str, Tuple[str, int]]]] = {}
+
+
+def _project_lock(project_id: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(project_id, threading.Lock())
+
+
+def get_archive_dir(project_id: str) -> str:
+    return os.path.join(settings.projects_root, project_id, "data", "archive")
+
+
+def _index_path(project_id: str) -> str:
+    return os.path.join(get_archive_dir(project_id), "index.json")
+
+
+def format_key_time(value: datetime) -> str:
+    return value.isoformat(timespec="microseconds")
+
+
+def message_key(record: dict) -> Key:
+    return record["created_at"], record["id"]
+
+
+# Codec
+
+def _codec() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this message archive")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+# Index
+
+def _index_signature(project_id: str) -> Optional[tuple]:
+    try:
+        st = os.stat(_index_path(project_id))
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _load_index(project_id: str) -> dict:
+    """Parsed index.json; reused until the file changes, callers must not mutate it in place"""
+    signature = _index_signature(project_id)
+    cached = _index_cache.get(project_id)
+    if signature is not None and cached and cached[0] == signature:
+        return cached[1]
+    try:
+        with open(_index_path(project_id), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION:
+            _index_cache[project_id] = (signature, index)
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "segments": [], "deleted_conversations": []}
+
+
+def _save_index(project_id: str, index: dict) -> None:
+    path = _index_path(project_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def has_archive(project_id: str) -> bool:
+    return os.path.exists(_index_path(project_id))
+
+
+# Writing
+
+def _to_record(message: Message, payload: Optional[dict]) -> dict:
+    return {
+        "id": message.id,
+        "project_id": message.project_id,
+        "role": message.role,
+        "message_type": message.message_type,
+        "content": message.content,
+        "metadata_json": message.metadata_json,
+        "hidden": bool(message.hidden),
+        "parent_message_id": message.parent_message_id,
+        "session_id": message.session_id,
+        "conversation_id": message.conversation_id,
+        "duration_ms": message.duration_ms,
+        "token_count": message.token_count,
+        "cost_usd": float(message.cost_usd) if message.cost_usd is not None else None,
+        "commit_sha": message.commit_sha,
+        "cli_source": message.cli_source,
+        "created_at": format_key_time(message.created_at),
+        "payload": payload,
+    }
+
+
+def _write_ids_file(path: str, ids: Iterable[Tuple[str, int]]) -> None:
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        f.writelines(f"{message_id}\t{frame_no}\n" for message_id, frame_no in ids)
+    os.replace(f"{path}.tmp", path)
+
+
+def _write_segment(project_id: str, index: dict, records: List[dict]) -> dict:
+    codec = _codec()
+    archive_dir = get_archive_dir(project_id)
+    os.makedirs(archive_dir, exist_ok=True)
+    name = f"{len(index['segments']) + 1:06d}-{uuid.uuid4().hex[:8]}.jsonl.{'zst' if codec == 'zstd' else 'gz'}"
+    path = os.path.join(archive_dir, name)
+
+    frames = []
+    offset = 0
+    with open(f"{path}.tmp", "wb") as f:
+        for i in range(0, len(records), FRAME_MESSAGES):
+            chunk = records[i:i + FRAME_MESSAGES]
+            raw = "\n".join(json.dumps(r, separators=(",", ":"), default=str) for r in chunk).encode("utf-8")
+            blob = _compress(raw, codec)
+            f.write(blob)
+            frames.append({
+                "offset": offset,
+                "length": len(blob),
+                "count": len(chunk),
+                "first": list(message_key(chunk[0])),
+                "last": list(message_key(chunk[-1])),
+                "conversation_ids": sorted({r["conversation_id"] or "" for r in chunk}),
+            })
+            offset += len(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+    _write_ids_file(f"{path}.ids", ((r["id"], i // FRAME_MESSAGES) for i, r in enumerate(records)))
+
+    return {
+        "file": name,
+        "codec": codec,
+        "count": len(records),
+        "first": frames[0]["first"],
+        "last": frames[-1]["last"],
+        "frames": frames,
+        "created_at": format_key_time(datetime.utcnow()),
+    }
+
+
+def archive_project_messages(db: Session, project_id: str, older_than_days: int) -> int:
+    """
+    Move conversations whose newest message is older than the threshold to the archive
+
+    Messages referenced by user requests stay in the database. Returns the number archived.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    stale_conversations = (
+        select(Message.conversation_id)
+        .where(Message.project_id == project_id, Message.conversation_id.isnot(None))
+        .group_by(Message.conversation_id)
+        .having(func.max(Message.created_at) < cutoff)
+    )
+    referenced = select(UserRequest.user_message_id).where(UserRequest.project_id == project_id)
+
+    archived = 0
+    with _project_lock(project_id):
+        while True:
+            batch = (
+                db.query(Message)
+                .filter(
+                    Message.project_id == project_id,
+                    Message.created_at < cutoff,
+                    Message.id.notin_(referenced),
+                    (Message.conversation_id.is_(None)) | (Message.conversation_id.in_(stale_conversations)),
+                )
+                .order_by(Message.created_at.asc(), Message.id.asc())
+                .limit(SEGMENT_MESSAGES)
+                .all()
+            )
+            if not batch:
+                break
+
+            index = dict(_load_index(project_id))
+            payloads = load_payloads(db, [m.id for m in batch])
+            segment = _write_segment(project_id, index, [_to_record(m, payloads.get(m.id)) for m in batch])
+            index["segments"] = [*index["segments"], segment]
+            _save_index(project_id, index)
+
+            # Rows are deleted only after the segment and index are durable. The bulk delete
+            # skips ORM events, so the project summary is recomputed explicitly.
+            db.query(Message).filter(Message.id.in_([m.id for m in batch])).delete(synchronize_session=False)
+            refresh_project_summary(db.connection(), project_id)
+            db.commit()
+            db.expunge_all()
+            archived += len(batch)
+
+    if archived:
+        ui.info(f"Archived {archived} messages for project {project_id}", "Archive")
+    return archived
+
+
+def clear_archive(project_id: str, conversation_id: Optional[str] = None) -> None:
+    """Drop a project's archive, or hide one conversation in it"""
+    with _project_lock(project_id):
+        if conversation_id is None:
+            shutil.rmtree(get_archive_dir(project_id), ignore_errors=True)
+        elif has_archive(project_id):
+            index = dict(_load_index(project_id))
+            deleted = set(index.get("deleted_conversations", []))
+            deleted.add(conversation_id)
+            index["deleted_conversations"] = sorted(deleted)
+            _save_index(project_id, index)
+    _evict_project_frames(project_id)
+    _index_cache.pop(project_id, None)
+    _id_maps.pop(project_id, None)
+
+
+# Reading
+
+def _evict_project_frames(project_id: str) -> None:
+    prefix = get_archive_dir(project_id)
+    with _frame_cache_lock:
+        for key in [k for k in _frame_cache if k[0].startswith(prefix)]:
+            del _frame_cache[key]
+
+
+def _read_frame(project_id: str, segment: dict, frame: dict) -> List[dict]:
+    path = os.path.join(get_archive_dir(project_id), segment["file"])
+    cache_key = (path, frame["offset"])
+    with _frame_cache_lock:
+        if cache_key in _frame_cache:
+            _frame_cache.move_to_end(cache_key)
+            return _frame_cache[cache_key]
+
+    with open(path, "rb") as f:
+        f.seek(frame["offset"])
+        blob = f.read(frame["length"])
+    records = [json.loads(line) for line in _decompress(blob, segment["codec"]).decode("utf-8").splitlines()]
+
+    with _frame_cache_lock:
+        _frame_cache[cache_key] = records
+        while len(_frame_cache) > FRAME_CACHE_SIZE:
+            _frame_cache.popitem(last=False)
+    return records
+
+
+def _iter_frames(index: dict, newest_first: bool) -> Iterable[Tuple[dict, dict]]:
+    pairs = [(segment, frame) for segment in index["segments"] for frame in segment["frames"]]
+    pairs.sort(key=lambda p: tuple(p[1]["last"] if newest_first else p[1]["first"]), reverse=newest_first)
+    return pairs
+
+
+def read_archived_messages(
+    project_id: str,
+    limit: int,
+    before: Optional[Key] = None,
+    after: Optional[Key] = None,
+    conversation_id: Optional[str] = None,
+    cli_source: Optional[str] = None,
+    include_hidden: bool = False,
+    bound: Optional[Key] = None,
+) -> List[dict]:
+    """
+    Return up to `limit` archived records next to a cursor
+
+    Without `after`, the newest records before `before` (or overall) are returned newest
+    first; with `after`, the oldest records after it, oldest first — matching the hot query.
+    `bound` is the far edge of a page the caller already filled from the database: records
+    at or beyond it in reading order cannot make the page, so frames past it are not read.
+    """
+    if not has_archive(project_id):
+        return []
+    index = _load_index(project_id)
+    deleted = set(index.get("deleted_conversations", []))
+    newest_first = after is None
+    collected: List[dict] = []
+
+    for segment, frame in _iter_frames(index, newest_first):
+        first, last = tuple(frame["first"]), tuple(frame["last"])
+        if before and first >= before:
+            continue
+        if after and last <= after:
+            continue
+        if bound and ((newest_first and last <= bound) or (not newest_first and first >= bound)):
+            continue
+        if conversation_id and conversation_id not in frame.get("conversation_ids", [conversation_id]):
+            continue
+        # Frames are visited by their near edge; once enough rows are collected, a frame
+        # that lies entirely beyond the current page boundary cannot contribute
+        if len(collected) >= limit:
+            boundary = message_key(collected[limit - 1])
+            if (newest_first and last < boundary) or (not newest_first and first > boundary):
+                break
+
+        for record in _read_frame(project_id, segment, frame):
+            key = message_key(record)
+            if before and key >= before:
+                continue
+            if after and key <= after:
+                continue
+            if bound and ((newest_first and key <= bound) or (not newest_first and key >= bound)):
+                continue
+            if record.get("conversation_id") in deleted:
+                continue
+            if not include_hidden and record.get("hidden"):
+                continue
+            if conversation_id and record.get("conversation_id") != conversation_id:
+                continue
+            if cli_source and record.get("cli_source") != cli_source:
+                continue
+            collected.append(record)
+        collected.sort(key=message_key, reverse=newest_first)
+        del collected[limit:]
+
+    return collected
+
+
+def _segment_ids(project_id: str, segment: dict) -> Iterable[Tuple[str, int]]:
+    """(id, frame number) pairs of a segment; written on first use for segments that predate .ids files"""
+    path = os.path.join(get_archive_dir(project_id), segment["file"]) + ".ids"
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            pairs = [line.rstrip("\n").split("\t") for line in f if line.strip()]
+        return [(message_id, int(frame_no)) for message_id, frame_no in pairs]
+    except FileNotFoundError:
+        pass
+    pairs = [
+        (record["id"], frame_no)
+        for frame_no, frame in enumerate(segment["frames"])
+        for record in _read_frame(project_id, segment, frame)
+    ]
+    _write_ids_file(path, pairs)
+    return pairs
+
+
+def _id_map(project_id: str) -> Dict[str, Tuple[str, int]]:
+    signature = _index_signature(project_id)
+    cached = _id_maps.get(project_id)
+    if cached and cached[0] == signature:
+        return cached[1]
+    ids: Dict[str, Tuple[str, int]] = {}
+    for segment in _load_index(project_id)["segments"]:
+        for message_id, frame_no in _segment_ids(project_id, segment):
+            ids[message_id] = (segment["file"], frame_no)
+    _id_maps[project_id] = (signature, ids)
+    return ids
+
+
+def find_archived_message(project_id: str, message_id: str) -> Optional[dict]:
+    """Look up one archived record by id; only the frame holding it is decompressed"""
+    if not has_archive(project_id):
+        return None
+    location = _id_map(project_id).get(message_id)
+    if location is None:
+        return None
+    file_name, frame_no = location
+    for segment in _load_index(project_id)["segments"]:
+        if segment["file"] == file_name:
+            for record in _read_frame(project_id, segment, segment["frames"][frame_no]):
+                if record["id"] == message_id:
+                    return record
+    return None
+
+
+# Scheduling
+
+def _vacuum_if_fragmented(db: Session) -> None:
+    """Reclaim space after large deletes so the database file stays small (SQLite only)"""
+    if not settings.database_url.startswith("sqlite"):
+        return
+    page_count = db.execute(text("PRAGMA page_count")).scalar() or 0
+    free_pages = db.execute(text("PRAGMA freelist_count")).scalar() or 0
+    if page_count and free_pages / page_count > 0.25:
+        db.commit()
+        db.connection().exec_driver_sql("VACUUM")
+        # VACUUM may renumber rowids, which the external-content FTS index is keyed on
+        rebuild_message_fts(db)
+        ui.info(f"Vacuumed database ({free_pages} free pages)", "Archive")
+
+
+def archive_all_projects(older_than_days: int) -> int:
+    from app.db.session import SessionLocal
+    from app.models.projects import Project
+
+    db = SessionLocal()
+    try:
+        total = 0
+        for (project_id,) in db.query(Project.id).all():
+            try:
+                total += archive_project_messages(db, project_id, older_than_days)
+            except Exception as e:
+                db.rollback()
+                ui.error(f"Archiving messages for {project_id} failed: {e}", "Archive")
+        if total:
+            _vacuum_if_fragmented(db)
+        return total
+    finally:
+        db.close()
+
+
+async def run_archive_scheduler() -> None:
+    """Periodically archive old conversations; disabled when MESSAGE_ARCHIVE_AFTER_DAYS is 0"""
+    if settings.message_archive_after_days <= 0:
+        return
+    while True:
+        try:
+            await asyncio.to_thread(archive_all_projects, settings.message_archive_after_days)
+        except Exception as e:
+            ui.error(f"Message archive job failed: {e}", "Archive")
+        await asyncio.sleep(settings.message_archive_interval_hours * 3600)
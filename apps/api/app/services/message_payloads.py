@@ -0,0 +1,79 @@
+"""
+Message Payload Storage
+Splits bulky fields out of message metadata into the compressed message_payloads table
+"""
+import json
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.message_payloads import MessagePayload
+
+
+# Raw CLI events are only needed for debugging and are always moved out of the row
+RAW_PAYLOAD_KEYS = ("original_format", "original_event", "raw_output")
+
+# Values kept inline in a compacted tool_input (paths, commands, patterns)
+TOOL_INPUT_INLINE_VALUE_BYTES = 256
+
+
+def _json_size(value) -> int:
+    return len(json.dumps(value, default=str, separators=(",", ":")).encode("utf-8"))
+
+
+def split_metadata(metadata: Optional[dict]) -> Tuple[Optional[dict], Optional[dict]]:
+    """
+    Split message metadata into (compact metadata, payload)
+
+    The payload is None when nothing needed to move. Large tool inputs keep their
+    short fields inline (e.g. file_path) so summaries and file tracking still work.
+    """
+    if not metadata:
+        return metadata, None
+
+    compact = dict(metadata)
+    payload = {}
+    for key in RAW_PAYLOAD_KEYS:
+        if key in compact:
+            payload[key] = compact.pop(key)
+
+    tool_input = compact.get("tool_input")
+    if isinstance(tool_input, dict) and _json_size(tool_input) > settings.message_inline_payload_bytes:
+        payload["tool_input"] = tool_input
+        compact["tool_input"] = {
+            k: v for k, v in tool_input.items() if _json_size(v) <= TOOL_INPUT_INLINE_VALUE_BYTES
+        }
+
+    if not payload:
+        return metadata, None
+    compact["payload_keys"] = sorted(payload)
+    return compact, payload
+
+
+def attach_payload(message) -> None:
+    """Compact a new Message's metadata in place, attaching the moved fields as its payload"""
+    compact, payload = split_metadata(message.metadata_json)
+    if payload is None:
+        return
+    raw = json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+    message.metadata_json = compact
+    message.payload = MessagePayload(data=zlib.compress(raw, 6), raw_size=len(raw), encoding="zlib+json")
+
+
+def load_payload(db: Session, message_id: str) -> Optional[dict]:
+    row = db.get(MessagePayload, message_id)
+    if not row:
+        return None
+    return json.loads(zlib.decompress(row.data))
+
+
+def load_payloads(db: Session, message_ids: List[str]) -> Dict[str, dict]:
+    """Payloads of several messages in one query, keyed by message id (messages without one are absent)"""
+    if not message_ids:
+        return {}
+    rows = db.query(MessagePayload.message_id, MessagePayload.data).filter(
+        MessagePayload.message_id.in_(message_ids)
+    )
+    return {message_id: json.loads(zlib.decompress(data)) for message_id, data in rows}
@@ -0,0 +1,184 @@
+"""
+Message Search
+Full-text search over chat history backed by an SQLite FTS5 index on messages.content
+"""
+import html
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.terminal_ui import ui
+from app.models.messages import Message
+
+
+# External-content FTS5 table: the text lives only in `messages`, the index follows its rowid
+FTS_SETUP_STATEMENTS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+        INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content);
+    END
+    """,
+]
+
+SNIPPET_TOKENS = 16
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+# Private-use characters FTS5 puts around matches; the snippet is HTML-escaped before they
+# become <mark> tags, so message content can never inject markup
+_MATCH_START = "\ue000"
+_MATCH_END = "\ue001"
+
+_fts_available: Optional[bool] = None
+
+
+def setup_message_fts(connection: Connection) -> bool:
+    """Create the FTS table and sync triggers (SQLite only); run once by the schema migrations"""
+    if connection.dialect.name != "sqlite":
+        return False
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'")
+    ).first()
+    if not exists:
+        try:
+            connection.execute(text(
+                "CREATE VIRTUAL TABLE messages_fts USING fts5("
+                "content, content='messages', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')"
+            ))
+        except OperationalError as e:
+            ui.warning(f"SQLite FTS5 unavailable, message search will use LIKE: {e}", "Search")
+            return False
+    for statement in FTS_SETUP_STATEMENTS:
+        connection.execute(text(statement))
+    if not exists:
+        connection.execute(text("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')"))
+        ui.info("Built full-text index for messages", "Search")
+    return True
+
+
+def fts_available(db: Session) -> bool:
+    """Whether the FTS table exists (checked once per process)"""
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = db.get_bind().dialect.name == "sqlite" and db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'")
+        ).first() is not None
+    return _fts_available
+
+
+def rebuild_message_fts(db: Session) -> None:
+    """Re-sync the index with messages, e.g. after VACUUM renumbered rowids"""
+    if fts_available(db):
+        db.execute(text("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')"))
+        db.commit()
+
+
+def build_match_query(query: str) -> str:
+    """Turn user input into an FTS5 query: every term must match, the last one as a prefix"""
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_messages(
+    db: Session,
+    project_id: str,
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+    conversation_id: Optional[str] = None
+) -> List[dict]:
+    """Return visible messages matching `query`, best match first, with highlighted snippets"""
+    match = build_match_query(query)
+    if not match:
+        return []
+
+    if not fts_available(db):
+        return _search_messages_like(db, project_id, query, limit, offset, conversation_id)
+
+    sql = """
+        SELECT m.id, m.role, m.message_type, m.conversation_id, m.session_id, m.created_at,
+               snippet(messages_fts, 0, :hl_start, :hl_end, '…', :tokens) AS snippet
+        FROM messages_fts
+        JOIN messages m ON m.rowid = messages_fts.rowid
+        WHERE messages_fts MATCH :match
+          AND m.project_id = :project_id
+          AND m.hidden = 0
+    """
+    params = {
+        "match": match,
+        "project_id": project_id,
+        "hl_start": _MATCH_START,
+        "hl_end": _MATCH_END,
+        "tokens": SNIPPET_TOKENS,
+        "limit": limit,
+        "offset": offset,
+    }
+    if conversation_id:
+        sql += " AND m.conversation_id = :conversation_id"
+        params["conversation_id"] = conversation_id
+    sql += " ORDER BY bm25(messages_fts), m.created_at DESC LIMIT :limit OFFSET :offset"
+
+    return [
+        {**row._mapping, "snippet": _highlight(row.snippet)}
+        for row in db.execute(text(sql), params)
+    ]
+
+
+def _highlight(snippet: str) -> str:
+    return html.escape(snippet or "").replace(_MATCH_START, HIGHLIGHT_START).replace(_MATCH_END, HIGHLIGHT_END)
+
+
+def _search_messages_like(
+    db: Session,
+    project_id: str,
+    query: str,
+    limit: int,
+    offset: int,
+    conversation_id: Optional[str]
+) -> List[dict]:
+    """Substring search used when FTS5 is not available (non-SQLite databases)"""
+    q = db.query(Message).filter(Message.project_id == project_id, Message.hidden.is_(False))
+    for term in query.split():
+        q = q.filter(Message.content.ilike(f"%{term}%"))
+    if conversation_id:
+        q = q.filter(Message.conversation_id == conversation_id)
+
+    results = []
+    first_term = query.split()[0].lower()
+    for msg in q.order_by(Message.created_at.desc()).offset(offset).limit(limit).all():
+        pos = msg.content.lower().find(first_term)
+        start = max(pos - 60, 0)
+        end = pos + len(first_term)
+        if pos >= 0:
+            snippet = (
+                html.escape(msg.content[start:pos]) + HIGHLIGHT_START + html.escape(msg.content[pos:end])
+                + HIGHLIGHT_END + html.escape(msg.content[end:end + 60])
+            )
+        else:
+            snippet = html.escape(msg.content[:120])
+        results.append({
+            "id": msg.id,
+            "role": msg.role,
+            "message_type": msg.message_type,
+            "conversation_id": msg.conversation_id,
+            "session_id": msg.session_id,
+            "created_at": msg.created_at,
+            "snippet": ("…" if start else "") + snippet,
+        })
+    return results
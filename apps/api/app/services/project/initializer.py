@@ -73,26 +73,31 @@ async def cleanup_project(project_id: str) -> bool:
     """
     Clean up project files and directories
     
+    The directory is renamed into the trash right away; running previews and monitors
+    are stopped and the files removed in the background by the project reaper.
+    
     Args:
         project_id: Project identifier to clean up
     
     Returns:
-        bool: True if cleanup was successful
+        bool: True if removal was scheduled
     """
+    from app.services.project.trash import move_to_trash, project_reaper
     
+    project_root = os.path.join(settings.projects_root, project_id)
     try:
-        project_root = os.path.join(settings.projects_root, project_id)
-        
-        if os.path.exists(project_root):
-            import shutil
-            shutil.rmtree(project_root)
-            return True
-        
-        return False
+        trash_path = move_to_trash(project_id)
+    except OSError as e:
+        # e.g. files held open by a running preview on Windows: stop it first, then remove in place
+        print(f"Could not move project {project_id} to trash ({e}); removing in place")
+        trash_path = project_root
     
-    except Exception as e:
-        print(f"Error cleaning up project {project_id}: {e}")
+    if trash_path is None:
+        project_reaper.schedule(project_id, project_root)
         return False
+    
+    project_reaper.schedule(project_id, trash_path)
+    return True
 
 
 async def get_project_path(project_id: str) -> Optional[str]:
@@ -0,0 +1,120 @@
+"""
+Project Trash
+Deleting a project renames its directory into a trash area (a single atomic rename on
+the same filesystem) and returns; a background reaper stops whatever still runs in the
+project and removes the files at idle I/O priority
+"""
+import asyncio
+import os
+import shutil
+import sys
+import uuid
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.core.terminal_ui import ui
+
+
+def get_trash_dir() -> str:
+    # Inside projects_root so the rename never crosses a filesystem
+    return os.path.join(settings.projects_root, ".trash")
+
+
+def move_to_trash(project_id: str) -> Optional[str]:
+    """Rename the project directory into the trash; returns the new path, or None if there was nothing to move"""
+    project_root = os.path.join(settings.projects_root, project_id)
+    if not os.path.exists(project_root):
+        return None
+    trash_path = os.path.join(get_trash_dir(), f"{project_id}.{uuid.uuid4().hex[:8]}")
+    os.makedirs(get_trash_dir(), exist_ok=True)
+    os.rename(project_root, trash_path)
+    return trash_path
+
+
+async def stop_project_activity(project_id: str) -> None:
+    """Stop the preview, deployment monitor, type-check daemon and .env watcher, and drop in-memory state"""
+    from app.services.code_search import drop_project_index
+    from app.services.env_manager import invalidate_env_cache
+    from app.services.env_watcher import env_watcher
+    from app.services.local_runtime import stop_preview_process
+    from app.services.type_check_daemon import type_check_daemons
+    from app.services.vercel_service import stop_deployment_monitoring
+
+    stop_deployment_monitoring(project_id)
+    await env_watcher.unwatch(project_id)
+    await type_check_daemons.stop(project_id)
+    # Waits for the dev server's process group to exit
+    await asyncio.to_thread(stop_preview_process, project_id)
+    invalidate_env_cache(project_id)
+    drop_project_index(project_id)
+
+
+async def remove_tree(path: str) -> None:
+    """rm -rf under idle I/O class and lowest CPU priority where available, else rmtree in a thread"""
+    if sys.platform.startswith("linux") and shutil.which("ionice") and shutil.which("nice"):
+        process = await asyncio.create_subprocess_exec(
+            "ionice", "-c", "3", "nice", "-n", "19", "rm", "-rf", "--", path,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        if process.returncode == 0:
+            return
+        ui.debug(f"rm -rf {path} exited {process.returncode}: {stderr.decode(errors='replace').strip()}", "Trash")
+    await asyncio.to_thread(shutil.rmtree, path, True)
+
+
+class ProjectReaper:
+    """Removes trashed project directories one at a time in the background"""
+
+    def __init__(self):
+        self._queue: "asyncio.Queue[Tuple[Optional[str], str]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def schedule(self, project_id: Optional[str], path: str) -> None:
+        """Queue a directory for removal; project_id set means its activity is stopped first"""
+        self._queue.put_nowait((project_id, path))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._queue.empty():
+            project_id, path = self._queue.get_nowait()
+            try:
+                if project_id:
+                    await stop_project_activity(project_id)
+                if not os.path.exists(path):
+                    continue
+                await remove_tree(path)
+                if os.path.exists(path):
+                    ui.warning(f"Could not fully remove {path}", "Trash")
+                else:
+                    ui.debug(f"Removed {path}", "Trash")
+            except Exception as e:
+                ui.error(f"Failed to reap {path}: {e}", "Trash")
+
+    async def resume(self) -> int:
+        """Queue whatever a previous run left in the trash"""
+        trash_dir = get_trash_dir()
+        if not os.path.isdir(trash_dir):
+            return 0
+        leftovers = [os.path.join(trash_dir, name) for name in os.listdir(trash_dir)]
+        for path in leftovers:
+            self.schedule(None, path)
+        if leftovers:
+            ui.info(f"Removing {len(leftovers)} trashed project directories", "Trash")
+        return len(leftovers)
+
+    async def stop(self) -> None:
+        # Whatever is left stays in the trash and is picked up by resume() on the next start
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global project reaper instance
+project_reaper = ProjectReaper()
@@ -0,0 +1,117 @@
+"""
+Project Summaries
+Keeps project_summaries in step with messages and service connections via ORM events
+"""
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import case, event, func, insert, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.messages import Message
+from app.models.projects import Project
+from app.models.project_services import ProjectServiceConnection
+from app.models.project_summaries import ProjectSummary
+
+
+SERVICE_PROVIDERS = ("github", "supabase", "vercel")
+
+_summaries = ProjectSummary.__table__
+_connections = ProjectServiceConnection.__table__
+
+
+def default_services() -> dict:
+    return {provider: {"connected": False, "status": "disconnected"} for provider in SERVICE_PROVIDERS}
+
+
+def _load_services(connection: Connection, project_id: str) -> dict:
+    services = default_services()
+    rows = connection.execute(
+        select(_connections.c.provider, _connections.c.status).where(_connections.c.project_id == project_id)
+    )
+    for provider, status in rows:
+        services[provider] = {"connected": True, "status": status}
+    return services
+
+
+def _upsert(connection: Connection, project_id: str, values: dict) -> None:
+    values = {**values, "updated_at": datetime.utcnow()}
+    result = connection.execute(update(_summaries).where(_summaries.c.project_id == project_id).values(**values))
+    if result.rowcount == 0:
+        full = {"message_count": 0, "last_message_at": None, "services": default_services(), **values}
+        connection.execute(insert(_summaries).values(project_id=project_id, **full))
+
+
+def refresh_project_summary(connection: Connection, project_id: str) -> None:
+    """Recompute a project's summary from scratch"""
+    count, last_message_at = connection.execute(
+        select(func.count(Message.id), func.max(Message.created_at)).where(Message.project_id == project_id)
+    ).one()
+    _upsert(connection, project_id, {
+        "message_count": count,
+        "last_message_at": last_message_at,
+        "services": _load_services(connection, project_id),
+    })
+
+
+def backfill_project_summaries(connection: Connection) -> int:
+    """Create summaries for projects that do not have one yet (e.g. after upgrading)"""
+    missing = connection.execute(
+        select(Project.id).outerjoin(ProjectSummary, ProjectSummary.project_id == Project.id)
+        .where(ProjectSummary.project_id.is_(None))
+    ).scalars().all()
+    for project_id in missing:
+        refresh_project_summary(connection, project_id)
+    return len(missing)
+
+
+def compute_projects_etag(db: Session) -> str:
+    """Cheap validator for the project list: changes whenever a project or summary row changes"""
+    project_count, project_updated = db.execute(
+        select(func.count(Project.id), func.max(Project.updated_at))
+    ).one()
+    summary_count, summary_updated = db.execute(
+        select(func.count(ProjectSummary.project_id), func.max(ProjectSummary.updated_at))
+    ).one()
+    raw = f"{project_count}:{project_updated}:{summary_count}:{summary_updated}"
+    return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+
+# Incremental maintenance
+
+@event.listens_for(Project, "after_insert")
+def _project_inserted(mapper, connection: Connection, target: Project) -> None:
+    _upsert(connection, target.id, {})
+
+
+@event.listens_for(Message, "after_insert")
+def _message_inserted(mapper, connection: Connection, target: Message) -> None:
+    result = connection.execute(
+        update(_summaries)
+        .where(_summaries.c.project_id == target.project_id)
+        .values(
+            message_count=_summaries.c.message_count + 1,
+            last_message_at=case(
+                (or_(_summaries.c.last_message_at.is_(None), _summaries.c.last_message_at < target.created_at),
+                 target.created_at),
+                else_=_summaries.c.last_message_at
+            ),
+            updated_at=datetime.utcnow()
+        )
+    )
+    if result.rowcount == 0:
+        refresh_project_summary(connection, target.project_id)
+
+
+@event.listens_for(Message, "after_delete")
+def _message_deleted(mapper, connection: Connection, target: Message) -> None:
+    refresh_project_summary(connection, target.project_id)
+
+
+def _connection_changed(mapper, connection: Connection, target: ProjectServiceConnection) -> None:
+    _upsert(connection, target.project_id, {"services": _load_services(connection, target.project_id)})
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(ProjectServiceConnection, _event_name, _connection_changed)
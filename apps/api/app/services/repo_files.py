@@ -0,0 +1,156 @@
+"""
+Repository file access helpers
+Binary detection, HTTP range parsing and bounded reads for the repo file API
+"""
+import mimetypes
+from typing import Iterator, List, Optional, Tuple
+
+
+# Number of leading bytes inspected when sniffing for binary content
+BINARY_SNIFF_BYTES = 8192
+
+# Chunk size used when streaming file bodies
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def guess_mime_type(path: str) -> str:
+    """Guess a content type from the file name"""
+    mime_type, _ = mimetypes.guess_type(path)
+    return mime_type or "application/octet-stream"
+
+
+def is_binary_file(path: str) -> bool:
+    """Heuristically decide whether a file is binary by sniffing its head"""
+    with open(path, "rb") as f:
+        head = f.read(BINARY_SNIFF_BYTES)
+    if not head:
+        return False
+    if b"\x00" in head:
+        return True
+    try:
+        head.decode("utf-8")
+        return False
+    except UnicodeDecodeError as e:
+        # A multi-byte sequence cut at the sniff boundary is still text
+        return e.start < len(head) - 3
+
+
+def parse_range_header(range_header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range: bytes=...`` header
+
+    Returns:
+        Inclusive (start, end) byte offsets, or None when the header is absent
+        or uses an unsupported form (multiple ranges, other units).
+
+    Raises:
+        ValueError: If the range cannot be satisfied for this file size
+    """
+    if not range_header:
+        return None
+
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start_str, _, end_str = spec.strip().partition("-")
+    try:
+        if start_str == "":
+            # Suffix range: last N bytes
+            suffix = int(end_str)
+            if suffix <= 0:
+                raise ValueError("Empty suffix range")
+            start = max(file_size - suffix, 0)
+            end = file_size - 1
+        else:
+            start = int(start_str)
+            end = int(end_str) if end_str else file_size - 1
+    except ValueError:
+        raise ValueError(f"Malformed range: {range_header}")
+
+    end = min(end, file_size - 1)
+    if start < 0 or start > end:
+        raise ValueError(f"Unsatisfiable range: {range_header}")
+    return start, end
+
+
+def iter_file_range(path: str, start: int, end: int, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """Yield the inclusive byte range [start, end] of a file in chunks"""
+    remaining = end - start + 1
+    with open(path, "rb") as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def read_text_file(path: str) -> str:
+    """Read a whole (small) text file, replacing undecodable bytes"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _skip_line(f) -> bool:
+    """Consume one line in bounded chunks; returns False at end of file"""
+    consumed = False
+    while True:
+        chunk = f.readline(STREAM_CHUNK_BYTES)
+        if not chunk:
+            return consumed
+        consumed = True
+        if chunk.endswith(b"\n"):
+            return True
+
+
+def read_line_window(path: str, start_line: int, max_lines: int, max_bytes: int) -> dict:
+    """
+    Read a window of lines from a text file without loading the whole file
+
+    No single line is read past max_bytes, so a minified bundle or a one-line log
+    costs at most max_bytes of memory; such a line is cut and flagged ``truncated``.
+
+    Args:
+        path: File to read
+        start_line: 1-based first line of the window
+        max_lines: Maximum number of lines to return
+        max_bytes: Maximum number of bytes to return; the window stops early once reached
+
+    Returns:
+        dict with ``content``, ``start_line``, ``end_line``, ``has_more`` and ``truncated``
+    """
+    start_line = max(start_line, 1)
+    max_bytes = max(max_bytes, 1)
+    lines: List[bytes] = []
+    used_bytes = 0
+    has_more = False
+    truncated = False
+
+    with open(path, "rb") as f:
+        for _ in range(start_line - 1):
+            if not _skip_line(f):
+                break
+        while True:
+            line = f.readline(max_bytes)
+            if not line:
+                break
+            if len(lines) >= max_lines or (lines and used_bytes + len(line) > max_bytes):
+                has_more = True
+                break
+            lines.append(line)
+            used_bytes += len(line)
+            if not line.endswith(b"\n") and len(line) == max_bytes and f.read(1) not in (b"", b"\n"):
+                # The line goes on past the byte budget
+                truncated = True
+                has_more = True
+                break
+
+    return {
+        "content": b"".join(lines).decode("utf-8", errors="replace"),
+        "start_line": start_line,
+        "end_line": start_line + len(lines) - 1 if lines else start_line - 1,
+        "has_more": has_more,
+        "truncated": truncated,
+    }
@@ -0,0 +1,226 @@
+"""
+Tool Telemetry
+Pairs tool_use and tool_result messages by tool id, times them, writes them to
+tools_usage in batches and aggregates per-tool latency histograms
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.terminal_ui import ui
+from app.models.messages import Message
+from app.models.tools import ToolUsage
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+# Completed tool calls are written once this many are pending
+FLUSH_BATCH_SIZE = 50
+
+# Tool outputs and errors are stored truncated
+MAX_OUTPUT_CHARS = 2000
+
+# tool_input values longer than this are left out of input_data (the message payload keeps them)
+MAX_INPUT_VALUE_CHARS = 256
+
+
+def _line_count(text: Any) -> int:
+    return len(text.splitlines()) if isinstance(text, str) and text else 0
+
+
+def file_changes(tool_name: str, tool_input: Any) -> Dict[str, Any]:
+    """Files touched and lines added/removed, derived from a file tool's input"""
+    if not isinstance(tool_input, dict):
+        return {}
+    path = tool_input.get("file_path") or tool_input.get("path") or tool_input.get("file")
+    if tool_name == "Write":
+        added, removed = _line_count(tool_input.get("content") or tool_input.get("contents")), 0
+    elif tool_name == "Edit":
+        added = _line_count(tool_input.get("new_string"))
+        removed = _line_count(tool_input.get("old_string"))
+    elif tool_name == "MultiEdit":
+        edits = tool_input.get("edits") or []
+        added = sum(_line_count(edit.get("new_string")) for edit in edits if isinstance(edit, dict))
+        removed = sum(_line_count(edit.get("old_string")) for edit in edits if isinstance(edit, dict))
+    elif tool_name == "Delete":
+        added, removed = 0, None
+    else:
+        return {}
+    return {"files_affected": [path] if path else None, "lines_added": added, "lines_removed": removed}
+
+
+class ToolResult:
+    """A tool result seen in a CLI stream; it is only used for timing and never stored as a message"""
+
+    def __init__(self, tool_id: str, is_error: bool = False, content: str = "", created_at: Optional[datetime] = None):
+        self.tool_id = tool_id
+        self.is_error = is_error
+        self.content = content
+        self.created_at = created_at or datetime.utcnow()
+
+
+def compact_input(tool_input: Any) -> Optional[Dict[str, Any]]:
+    """Short scalar fields of a tool input (paths, commands, patterns); bulky values are left to the message"""
+    if not isinstance(tool_input, dict):
+        return None
+    return {
+        key: value for key, value in tool_input.items()
+        if value is None or isinstance(value, (bool, int, float))
+        or (isinstance(value, str) and len(value) <= MAX_INPUT_VALUE_CHARS)
+    }
+
+
+class ToolTelemetryRecorder:
+    """
+    Collects tool calls for one CLI run
+
+    Feed every streamed message to `observe` and every ToolResult to `observe_result`;
+    call `flush` when the run ends so calls still waiting for a result are written too
+    (as `incomplete`).
+    """
+
+    def __init__(self, project_id: str, session_id: str, normalize: Callable[[str], str] = lambda name: name):
+        self.project_id = project_id
+        self.session_id = session_id
+        self.normalize = normalize
+        self.started = 0
+        self._open: Dict[str, Dict[str, Any]] = {}
+        self._done: List[Dict[str, Any]] = []
+
+    def observe_result(self, result: ToolResult) -> None:
+        call = self._open.pop(result.tool_id, None)
+        if call is None:
+            return
+        content = (result.content or "")[:MAX_OUTPUT_CHARS]
+        call.update(
+            tool_action="error" if result.is_error else "complete",
+            duration_ms=max(int((result.created_at - call["created_at"]).total_seconds() * 1000), 0),
+            is_error=result.is_error,
+            error_message=content if result.is_error else None,
+            output_data={"content": content},
+        )
+        self._done.append(call)
+
+    def observe(self, message: Message) -> None:
+        metadata = message.metadata_json or {}
+        tool_id = metadata.get("tool_id")
+        if not tool_id:
+            return
+        at = message.created_at or datetime.utcnow()
+
+        if message.message_type == "tool_result":
+            # Cursor streams its results as stored messages
+            self.observe_result(ToolResult(tool_id, bool(metadata.get("is_error")), message.content or "", at))
+        elif metadata.get("tool_name") and tool_id not in self._open:
+            tool_name = self.normalize(metadata["tool_name"])
+            tool_input = metadata.get("tool_input")
+            self.started += 1
+            self._open[tool_id] = {
+                "id": str(uuid.uuid4()),
+                "session_id": self.session_id,
+                "project_id": self.project_id,
+                "message_id": message.id,
+                "tool_name": tool_name[:64],
+                "tool_action": "start",
+                "input_data": compact_input(tool_input),
+                "output_data": None,
+                "files_affected": None,
+                "lines_added": None,
+                "lines_removed": None,
+                "duration_ms": None,
+                "is_error": False,
+                "error_message": None,
+                "created_at": at,
+                **file_changes(tool_name, tool_input),
+            }
+
+    @property
+    def should_flush(self) -> bool:
+        return len(self._done) >= FLUSH_BATCH_SIZE
+
+    def flush(self, db: Session, final: bool = False) -> int:
+        """Write completed calls (and, if final, unanswered ones) in one multi-row insert"""
+        if final:
+            for call in self._open.values():
+                call["tool_action"] = "incomplete"
+                self._done.append(call)
+            self._open = {}
+        rows, self._done = self._done, []
+        if not rows:
+            return 0
+        try:
+            db.execute(insert(ToolUsage), rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            ui.warning(f"Failed to write {len(rows)} tool usage rows: {e}", "Telemetry")
+            return 0
+        return len(rows)
+
+
+def _percentile(counts: List[int], total: int, fraction: float) -> Optional[int]:
+    """Upper bound of the bucket holding the given percentile (None for the open-ended bucket)"""
+    if not total:
+        return None
+    threshold = total * fraction
+    running = 0
+    for bound, count in zip(LATENCY_BUCKETS_MS, counts):
+        running += count
+        if running >= threshold:
+            return bound
+    return None
+
+
+def get_tool_stats(db: Session, project_id: Optional[str] = None, days: int = 30) -> List[Dict[str, Any]]:
+    """Per-tool call counts, error rates, total time and latency histograms, slowest tools first"""
+    duration = ToolUsage.duration_ms
+    bucket_columns = []
+    lower = None
+    for i, bound in enumerate(LATENCY_BUCKETS_MS + [None]):
+        condition = duration.is_not(None)
+        if lower is not None:
+            condition = condition & (duration > lower)
+        if bound is not None:
+            condition = condition & (duration <= bound)
+        bucket_columns.append(func.sum(case((condition, 1), else_=0)).label(f"bucket_{i}"))
+        lower = bound
+
+    query = select(
+        ToolUsage.tool_name,
+        func.count().label("calls"),
+        func.sum(case((ToolUsage.is_error.is_(True), 1), else_=0)).label("errors"),
+        func.sum(case((duration.is_(None), 1), else_=0)).label("incomplete"),
+        func.coalesce(func.sum(duration), 0).label("total_duration_ms"),
+        func.max(duration).label("max_duration_ms"),
+        *bucket_columns
+    ).where(ToolUsage.created_at >= datetime.utcnow() - timedelta(days=days))
+    if project_id:
+        query = query.where(ToolUsage.project_id == project_id)
+    query = query.group_by(ToolUsage.tool_name)
+
+    stats = []
+    for row in db.execute(query):
+        counts = [getattr(row, f"bucket_{i}") or 0 for i in range(len(LATENCY_BUCKETS_MS) + 1)]
+        timed = sum(counts)
+        stats.append({
+            "tool_name": row.tool_name,
+            "calls": row.calls,
+            "errors": row.errors or 0,
+            "error_rate": round((row.errors or 0) / row.calls, 4) if row.calls else 0.0,
+            "incomplete": row.incomplete or 0,
+            "total_duration_ms": int(row.total_duration_ms),
+            "avg_duration_ms": int(row.total_duration_ms / timed) if timed else 0,
+            "p50_ms": _percentile(counts, timed, 0.5),
+            "p95_ms": _percentile(counts, timed, 0.95),
+            "max_duration_ms": row.max_duration_ms,
+            "histogram": [
+                {"le_ms": bound, "count": count}
+                for bound, count in zip(LATENCY_BUCKETS_MS + [None], counts)
+            ],
+        })
+    stats.sort(key=lambda item: item["total_duration_ms"], reverse=True)
+    return stats
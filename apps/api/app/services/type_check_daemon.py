@@ -0,0 +1,273 @@
+"""
+TypeScript Type-Check Daemon
+Keeps one incremental `tsc --watch` per project and answers the Claude edit hook over a local socket
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.terminal_ui import ui
+
+
+# How long a check waits for tsc to start compiling a just-written file; past it the
+# hook gets no verdict and runs a full tsc
+CHANGE_DETECT_GRACE_SECONDS = 1.5
+
+# Upper bound for waiting on one incremental compilation
+COMPILE_TIMEOUT_SECONDS = 120.0
+
+# Daemons without checks for this long are stopped by the reaper
+IDLE_TIMEOUT_SECONDS = 15 * 60
+
+CYCLE_START_RE = re.compile(r"(Starting compilation in watch mode|File change detected\. Starting incremental compilation)")
+CYCLE_END_RE = re.compile(r"Found \d+ errors?")
+DIAGNOSTIC_RE = re.compile(r"^(?P<file>[^\s(][^(]*)\((?P<line>\d+),(?P<col>\d+)\): error (?P<code>TS\d+): (?P<message>.*)$")
+
+
+def get_port_file(project_id: str) -> str:
+    """Port file read by the hook script (kept outside the repo so it is never committed)"""
+    return os.path.join(settings.projects_root, project_id, "data", "typecheck.port")
+
+
+class TypeCheckDaemon:
+    """Long-lived `tsc --watch --incremental` process plus a localhost check server"""
+
+    def __init__(self, project_id: str, repo_path: str):
+        self.project_id = project_id
+        self.repo_path = repo_path
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.port: Optional[int] = None
+        self.last_used = time.monotonic()
+
+        # Compilation state, updated by the output reader
+        self.compiling = False
+        self.cycle = 0
+        self.cycle_started_at = 0.0  # Wall clock, comparable with file mtimes
+        self.verdict_started_at = 0.0  # Start of the cycle `diagnostics` came from
+        self.diagnostics: Dict[str, List[str]] = {}
+        self.previous_diagnostics: Dict[str, List[str]] = {}
+        self._pending: Dict[str, List[str]] = {}
+        self._last_file: Optional[str] = None
+        self._cycle_done = asyncio.Condition()
+        self._reader_task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            "npx", "--no-install", "tsc", "--noEmit", "--watch", "--incremental",
+            "--preserveWatchOutput", "--pretty", "false",
+            cwd=self.repo_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
+        )
+        self._reader_task = asyncio.create_task(self._read_output())
+        self.server = await asyncio.start_server(self._handle_client, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+        port_file = get_port_file(self.project_id)
+        os.makedirs(os.path.dirname(port_file), exist_ok=True)
+        with open(port_file, "w") as f:
+            f.write(str(self.port))
+        ui.info(f"Type-check daemon for {self.project_id} listening on port {self.port}", "TypeCheck")
+
+    async def stop(self) -> None:
+        try:
+            os.remove(get_port_file(self.project_id))
+        except OSError:
+            pass
+        if self.server:
+            self.server.close()
+        if self.running:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                self.process.kill()
+        if self._reader_task:
+            self._reader_task.cancel()
+
+    async def _read_output(self) -> None:
+        async for raw in self.process.stdout:
+            line = raw.decode(errors="replace").rstrip("\n")
+            if CYCLE_START_RE.search(line):
+                self.compiling = True
+                self.cycle_started_at = time.time()
+                self._pending = {}
+                self._last_file = None
+            elif CYCLE_END_RE.search(line):
+                async with self._cycle_done:
+                    self.previous_diagnostics = self.diagnostics
+                    self.diagnostics = self._pending
+                    self.compiling = False
+                    self.verdict_started_at = self.cycle_started_at
+                    self.cycle += 1
+                    self._cycle_done.notify_all()
+            else:
+                match = DIAGNOSTIC_RE.match(line)
+                if match:
+                    self._last_file = os.path.normpath(match.group("file"))
+                    self._pending.setdefault(self._last_file, []).append(line)
+                elif line.startswith(" ") and self._last_file:
+                    # Continuation of the previous diagnostic
+                    self._pending[self._last_file][-1] += "\n" + line
+
+        # Process exited: wake waiters so checks fall back instead of hanging
+        async with self._cycle_done:
+            self.compiling = False
+            self._cycle_done.notify_all()
+        try:
+            os.remove(get_port_file(self.project_id))
+        except OSError:
+            pass
+        ui.warning(f"Type-check daemon for {self.project_id} exited", "TypeCheck")
+
+    def _changed_at(self, edited_file: Optional[str], requested_at: float) -> float:
+        """When the edit landed: the file's mtime, or the request time if it cannot be stat'ed"""
+        if edited_file:
+            path = edited_file if os.path.isabs(edited_file) else os.path.join(self.repo_path, edited_file)
+            try:
+                return os.stat(path).st_mtime
+            except OSError:
+                pass
+        return requested_at
+
+    async def check(self, edited_file: Optional[str] = None) -> Tuple[Optional[bool], str]:
+        """
+        Wait for the compilation covering the latest edit and return (ok, diagnostics)
+
+        Only a cycle that started after the edited file was written counts, so results
+        from before the edit are never reported. Only diagnostics in the edited file and
+        newly erroring files are reported, so pre-existing errors elsewhere do not fail
+        every edit. ok is None when no verdict is available (tsc not running or exited,
+        the edit not picked up within the grace period, compile timed out); the hook
+        then runs a full tsc itself.
+        """
+        self.last_used = time.monotonic()
+        changed_at = self._changed_at(edited_file, time.time())
+
+        # Give the watcher a moment to pick up the write that triggered the hook
+        deadline = time.monotonic() + CHANGE_DETECT_GRACE_SECONDS
+        while self.running and self.cycle_started_at < changed_at:
+            if time.monotonic() >= deadline:
+                return None, ""
+            await asyncio.sleep(0.05)
+
+        async with self._cycle_done:
+            try:
+                await asyncio.wait_for(
+                    self._cycle_done.wait_for(
+                        lambda: (self.verdict_started_at >= changed_at and not self.compiling) or not self.running
+                    ),
+                    timeout=COMPILE_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                return None, ""
+            if not self.running:
+                return None, ""
+            current = dict(self.diagnostics)
+            previous = self.previous_diagnostics
+
+        affected = {path for path, diags in current.items() if diags != previous.get(path)}
+        if edited_file:
+            rel = os.path.relpath(edited_file, self.repo_path) if os.path.isabs(edited_file) else edited_file
+            rel = os.path.normpath(rel)
+            if rel in current:
+                affected.add(rel)
+
+        lines = [diag for path in sorted(affected) for diag in current[path]]
+        return not lines, "\n".join(lines)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Protocol: request is '<byte length>\\n<hook payload>', reply is 'OK', 'FAIL' then
+        diagnostics, or 'UNAVAILABLE' when the daemon cannot vouch for the result
+        """
+        try:
+            length = int((await reader.readline()).strip() or 0)
+            payload = await reader.readexactly(length) if length else b""
+            edited_file = None
+            try:
+                tool_input = json.loads(payload or b"{}").get("tool_input") or {}
+                edited_file = tool_input.get("file_path") or tool_input.get("path")
+            except (ValueError, AttributeError):
+                pass
+
+            ok, output = await self.check(edited_file)
+            if ok is None:
+                writer.write(b"UNAVAILABLE\n")
+            else:
+                writer.write(b"OK\n" if ok else b"FAIL\n")
+            if output:
+                writer.write(output.encode() + b"\n")
+            await writer.drain()
+        except Exception as e:
+            ui.error(f"Type-check request failed for {self.project_id}: {e}", "TypeCheck")
+            writer.write(b"UNAVAILABLE\n")
+        finally:
+            writer.close()
+
+
+class TypeCheckDaemonManager:
+    """Registry of per-project type-check daemons"""
+
+    def __init__(self):
+        self.daemons: Dict[str, TypeCheckDaemon] = {}
+        self._lock = asyncio.Lock()
+        self._reaper_task: Optional[asyncio.Task] = None
+
+    async def ensure_started(self, project_id: str, repo_path: str) -> Optional[TypeCheckDaemon]:
+        """Start the daemon for a project if needed; returns None if tsc is unavailable"""
+        if not repo_path or not os.path.exists(os.path.join(repo_path, "tsconfig.json")):
+            return None
+
+        async with self._lock:
+            daemon = self.daemons.get(project_id)
+            if daemon and daemon.running:
+                daemon.last_used = time.monotonic()
+                return daemon
+
+            if daemon:
+                await daemon.stop()
+            daemon = TypeCheckDaemon(project_id, repo_path)
+            try:
+                await daemon.start()
+            except (OSError, FileNotFoundError) as e:
+                ui.warning(f"Could not start type-check daemon for {project_id}: {e}", "TypeCheck")
+                return None
+            self.daemons[project_id] = daemon
+
+            if self._reaper_task is None or self._reaper_task.done():
+                self._reaper_task = asyncio.create_task(self._reap_idle())
+            return daemon
+
+    async def stop(self, project_id: str) -> None:
+        async with self._lock:
+            daemon = self.daemons.pop(project_id, None)
+        if daemon:
+            await daemon.stop()
+
+    async def stop_all(self) -> None:
+        for project_id in list(self.daemons):
+            await self.stop(project_id)
+        if self._reaper_task:
+            self._reaper_task.cancel()
+
+    async def _reap_idle(self) -> None:
+        while self.daemons:
+            await asyncio.sleep(60)
+            now = time.monotonic()
+            for project_id, daemon in list(self.daemons.items()):
+                if not daemon.running or now - daemon.last_used > IDLE_TIMEOUT_SECONDS:
+                    await self.stop(project_id)
+
+
+# Global daemon manager instance
+type_check_daemons = TypeCheckDaemonManager()
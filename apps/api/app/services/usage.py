@@ -0,0 +1,190 @@
+"""
+Usage Tracking
+Writes CLI result events into sessions and keeps the daily usage_rollups table current,
+so usage dashboards never scan raw sessions
+"""
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.models.messages import Message
+from app.models.sessions import Session as ChatSession
+from app.models.usage_rollups import UsageRollup
+
+
+TOKEN_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+GROUP_COLUMNS = {
+    "day": UsageRollup.day,
+    "cli_type": UsageRollup.cli_type,
+    "model": UsageRollup.model,
+}
+
+_rollups = UsageRollup.__table__
+
+
+def count_tokens(usage: Optional[dict]) -> int:
+    """Total tokens in a CLI usage block (input, output and prompt cache)"""
+    if not isinstance(usage, dict):
+        return 0
+    return sum(int(usage.get(field) or 0) for field in TOKEN_FIELDS)
+
+
+def extract_result_usage(metadata: Optional[dict]) -> Optional[dict]:
+    """Usage figures from a Claude SDK ResultMessage or Cursor result event; None for other messages"""
+    if not metadata:
+        return None
+    event = metadata.get("original_event") or {}
+    if metadata.get("event_type") != "result" and event.get("type") != "result" and "num_turns" not in metadata:
+        return None
+    return {
+        "duration_ms": int(metadata.get("duration_ms") or event.get("duration_ms") or 0),
+        "total_cost_usd": float(metadata.get("total_cost_usd") or event.get("total_cost_usd") or 0),
+        "num_turns": int(metadata.get("num_turns") or event.get("num_turns") or 0),
+        "total_tokens": count_tokens(metadata.get("usage") or event.get("usage")),
+    }
+
+
+def _add_to_rollup(connection: Connection, key: dict, amounts: dict, at: datetime) -> None:
+    # One atomic statement: two runs finishing together must not both miss the row and insert
+    insert = postgresql_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    statement = insert(_rollups).values(**key, **amounts, last_session_at=at, updated_at=at)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=list(key),
+        set_={
+            **{name: _rollups.c[name] + statement.excluded[name] for name in amounts},
+            "last_session_at": statement.excluded.last_session_at,
+            "updated_at": statement.excluded.updated_at,
+        }
+    ))
+
+
+def record_session_usage(
+    db: Session,
+    session_id: str,
+    cli_type: str,
+    model: Optional[str],
+    result: Optional[dict],
+    messages: int = 0,
+    tools_used: int = 0
+) -> None:
+    """
+    Add one CLI run to its session and to the day's rollup
+
+    A session can span several runs (e.g. a fallback CLI), so figures accumulate;
+    it counts towards `sessions` in the rollup only on its first run.
+    """
+    session = db.get(ChatSession, session_id)
+    if not session:
+        return
+    result = result or {}
+    now = datetime.utcnow()
+    duration_ms = result.get("duration_ms") or int((now - session.started_at).total_seconds() * 1000)
+    first_run = session.duration_ms is None
+
+    session.total_messages = (session.total_messages or 0) + messages
+    session.total_tools_used = (session.total_tools_used or 0) + tools_used
+    session.total_tokens = (session.total_tokens or 0) + result.get("total_tokens", 0)
+    session.total_cost_usd = float(session.total_cost_usd or 0) + result.get("total_cost_usd", 0)
+    session.duration_ms = (session.duration_ms or 0) + duration_ms
+    session.model = session.model or model
+
+    _add_to_rollup(
+        db.connection(),
+        {"project_id": session.project_id, "day": session.started_at.date(), "cli_type": cli_type, "model": model or ""},
+        {
+            "sessions": 1 if first_run else 0,
+            "turns": result.get("num_turns", 0),
+            "messages": messages,
+            "tools_used": tools_used,
+            "total_tokens": result.get("total_tokens", 0),
+            "total_cost_usd": result.get("total_cost_usd", 0),
+            "duration_ms": duration_ms,
+        },
+        now
+    )
+    db.commit()
+
+
+def backfill_usage_rollups(connection: Connection) -> int:
+    """
+    Build rollups for sessions recorded before usage tracking (used once by the schema migrations)
+
+    Older sessions carry no metrics, so they are counted from what they do have: start and
+    completion times and their messages. They get a duration_ms so later runs don't count
+    them again.
+    """
+    sessions = ChatSession.__table__
+    message_counts = dict(connection.execute(
+        select(Message.session_id, func.count()).where(Message.session_id.is_not(None)).group_by(Message.session_id)
+    ).all())
+    rows = connection.execute(
+        select(sessions.c.id, sessions.c.project_id, sessions.c.cli_type, sessions.c.model,
+               sessions.c.started_at, sessions.c.completed_at)
+        .where(sessions.c.duration_ms.is_(None), sessions.c.completed_at.is_not(None))
+        .order_by(sessions.c.completed_at)
+    ).all()
+    for row in rows:
+        duration_ms = max(int((row.completed_at - row.started_at).total_seconds() * 1000), 0)
+        connection.execute(update(sessions).where(sessions.c.id == row.id).values(duration_ms=duration_ms))
+        _add_to_rollup(
+            connection,
+            {"project_id": row.project_id, "day": row.started_at.date(), "cli_type": row.cli_type, "model": row.model or ""},
+            {"sessions": 1, "messages": message_counts.get(row.id, 0), "duration_ms": duration_ms},
+            row.completed_at
+        )
+    return len(rows)
+
+
+def _totals_columns() -> list:
+    return [
+        func.coalesce(func.sum(UsageRollup.sessions), 0).label("sessions"),
+        func.coalesce(func.sum(UsageRollup.turns), 0).label("turns"),
+        func.coalesce(func.sum(UsageRollup.messages), 0).label("messages"),
+        func.coalesce(func.sum(UsageRollup.tools_used), 0).label("tools_used"),
+        func.coalesce(func.sum(UsageRollup.total_tokens), 0).label("total_tokens"),
+        func.coalesce(func.sum(UsageRollup.total_cost_usd), 0).label("total_cost_usd"),
+        func.coalesce(func.sum(UsageRollup.duration_ms), 0).label("duration_ms"),
+        func.max(UsageRollup.last_session_at).label("last_session_at"),
+    ]
+
+
+def _row_to_dict(row: Any) -> Dict[str, Any]:
+    data = dict(row._mapping)
+    data["total_cost_usd"] = float(data["total_cost_usd"] or 0)
+    data["avg_duration_ms"] = int(data["duration_ms"] / data["sessions"]) if data["sessions"] else 0
+    return data
+
+
+def get_project_usage(
+    db: Session,
+    project_id: str,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    group_by: List[str] = ("day",)
+) -> Dict[str, Any]:
+    """Totals and grouped rows for a project, read from the rollups only"""
+    until = until or datetime.utcnow().date()
+    since = since or until - timedelta(days=29)
+    filters = [UsageRollup.project_id == project_id, UsageRollup.day >= since, UsageRollup.day <= until]
+
+    group_columns = [GROUP_COLUMNS[name] for name in group_by]
+    rows = db.execute(
+        select(*group_columns, *_totals_columns()).where(*filters)
+        .group_by(*group_columns).order_by(*group_columns)
+    ).all() if group_columns else []
+    totals = db.execute(select(*_totals_columns()).where(*filters)).one()
+
+    return {
+        "project_id": project_id,
+        "since": since,
+        "until": until,
+        "group_by": list(group_by),
+        "totals": _row_to_dict(totals),
+        "rows": [_row_to_dict(row) for row in rows],
+    }
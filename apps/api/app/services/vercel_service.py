@@ -4,12 +4,16 @@ Vercel integration service for creating projects and deployments
 import aiohttp
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+from app.core.config import settings
+from app.services.http_clients import vercel_session
+
 logger = logging.getLogger(__name__)
 
-VERCEL_API_BASE = "https://api.vercel.com"
+VERCEL_API_BASE = settings.vercel_api_base
 
 
 class VercelAPIError(Exception):
@@ -33,7 +37,7 @@ class VercelService:
     async def check_token_validity(self) -> Dict[str, Any]:
         """Check if the Vercel token is valid and get user info"""
         try:
-            async with aiohttp.ClientSession() as session:
+            async with vercel_session() as session:
                 async with session.get(
                     f"{VERCEL_API_BASE}/v2/user",
                     headers=self.headers
@@ -81,7 +85,7 @@ class VercelService:
             if team_id:
                 url += f"?teamId={team_id}"
             
-            async with aiohttp.ClientSession() as session:
+            async with vercel_session() as session:
                 async with session.post(
                     url,
                     headers=self.headers,
@@ -116,7 +120,7 @@ class VercelService:
     async def get_project(self, project_id: str) -> Dict[str, Any]:
         """Get project information by ID"""
         try:
-            async with aiohttp.ClientSession() as session:
+            async with vercel_session() as session:
                 async with session.get(
                     f"{VERCEL_API_BASE}/v9/projects/{project_id}",
                     headers=self.headers
@@ -159,7 +163,7 @@ class VercelService:
             }
             
             
-            async with aiohttp.ClientSession() as session:
+            async with vercel_session() as session:
                 async with session.post(
                     f"{VERCEL_API_BASE}/v13/deployments",
                     headers=self.headers,
@@ -203,7 +207,7 @@ class VercelService:
     async def get_deployment_status(self, deployment_id: str) -> Dict[str, Any]:
         """Get deployment status by ID"""
         try:
-            async with aiohttp.ClientSession() as session:
+            async with vercel_session() as session:
                 async with session.get(
                     f"{VERCEL_API_BASE}/v13/deployments/{deployment_id}",
                     headers=self.headers
@@ -242,7 +246,7 @@ async def check_project_availability(access_token: str, project_name: str) -> Di
     
     try:
         # Get list of projects and check if name exists
-        async with aiohttp.ClientSession() as session:
+        async with vercel_session() as session:
             async with session.get(
                 f"{VERCEL_API_BASE}/v10/projects",
                 headers=service.headers
@@ -275,175 +279,266 @@ async def check_project_availability(access_token: str, project_name: str) -> Di
         return {"available": False, "error": str(e)}
 
 
-# 활성 배포 모니터링 태스크들을 추적하는 딕셔너리
-active_monitoring_tasks: Dict[str, asyncio.Task] = {}
+# Deployment status polling: one scheduler for every in-flight deployment
 
+# Checks start at the minimum interval and back off while the state stays the same
+POLL_MIN_INTERVAL_SECONDS = 2.0
+POLL_MAX_INTERVAL_SECONDS = 30.0
+POLL_BACKOFF_FACTOR = 1.5
 
-async def start_deployment_monitoring(
-    project_id: str, 
-    deployment_id: str, 
-    vercel_token: str,
-    db_session_factory
-) -> None:
-    """배포 모니터링 백그라운드 태스크 시작"""
-    
-    # 기존 모니터링이 있으면 취소
-    if project_id in active_monitoring_tasks:
-        active_monitoring_tasks[project_id].cancel()
-    
-    # 새 모니터링 태스크 시작
-    task = asyncio.create_task(
-        monitor_deployment_status(project_id, deployment_id, vercel_token, db_session_factory)
-    )
-    active_monitoring_tasks[project_id] = task
-    
-    logger.info(f"🚀 Started deployment monitoring for project {project_id}, deployment {deployment_id}")
+# API errors back off exponentially up to this interval
+POLL_MAX_ERROR_INTERVAL_SECONDS = 120.0
 
+# Status requests issued concurrently per scheduler tick
+POLL_BATCH_SIZE = 10
 
-async def monitor_deployment_status(
-    project_id: str, 
-    deployment_id: str, 
-    vercel_token: str,
-    db_session_factory
-) -> None:
-    """3초마다 Vercel API 호출해서 배포 상태 모니터링"""
-    
-    vercel_service = VercelService(vercel_token)
-    start_time = datetime.utcnow()
-    max_duration_minutes = 15  # 15분 제한
-    
+# Deployments still building after this long are no longer tracked
+MAX_MONITOR_MINUTES = 15
+
+
+def _iso_now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
     try:
-        while True:
-            try:
-                # 시간 제한 체크 (15분)
-                elapsed = (datetime.utcnow() - start_time).total_seconds() / 60
-                if elapsed > max_duration_minutes:
-                    logger.warning(f"⏰ Deployment {deployment_id} monitoring timed out after {max_duration_minutes} minutes")
-                    break
-                
-                # Vercel API에서 최신 상태 가져오기
-                status_data = await vercel_service.get_deployment_status(deployment_id)
-                
-                # 상태 변경 시에만 또는 READY/ERROR 시에만 로그
-                if status_data["status"] in ["READY", "ERROR"] or elapsed < 0.1:  # 처음 또는 완료 시에만
-                    logger.info(f"🔍 Checking deployment {deployment_id} status... (elapsed: {elapsed:.1f}min)")
-                    logger.info(f"🔍 Got status: {status_data['status']} for deployment {deployment_id}")
-                
-                # READY 상태일 때만 URL 정보 로그
-                if status_data["status"] == "READY":
-                    raw_response = status_data.get("raw_response", {})
-                    logger.info(f"🎉 READY response - aliasFinal: {raw_response.get('aliasFinal')}, alias: {raw_response.get('alias', [])[:2]}, url: {raw_response.get('url')}")
-                    logger.info(f"🎉 Final URL selected: {status_data['url']}")
-                
-                # DB 업데이트
-                await update_deployment_status_in_db(project_id, status_data, db_session_factory)
-                
-                # 완료 상태 체크 - ready 필드도 확인
-                is_ready = (status_data["status"] == "READY" or 
-                           status_data.get("ready") == True or
-                           status_data.get("readyState") == "READY")
-                is_error = status_data["status"] == "ERROR"
-                
-                if is_ready or is_error:
-                    logger.info(f"✅ Deployment {deployment_id} finished with status: {status_data['status']}")
-                    break
-                
-                # 3초 대기
-                await asyncio.sleep(3)
-                
-            except Exception as e:
-                logger.error(f"❌ Error monitoring deployment {deployment_id}: {e}")
-                import traceback
-                logger.error(f"❌ Full traceback: {traceback.format_exc()}")
-                # 에러 시 10초 대기 후 재시도
-                await asyncio.sleep(10)
-                
-    except asyncio.CancelledError:
-        logger.info(f"Deployment monitoring cancelled for project {project_id}")
+        return datetime.fromisoformat(value.rstrip("Z")) if value else None
+    except ValueError:
+        return None
+
+
+class TrackedDeployment:
+    """Polling state for one project's in-flight deployment"""
+
+    def __init__(
+        self,
+        project_id: str,
+        deployment_id: str,
+        vercel_token: str,
+        status: Optional[str] = None,
+        url: Optional[str] = None,
+        started_at: Optional[datetime] = None
+    ):
+        self.project_id = project_id
+        self.deployment_id = deployment_id
+        self.vercel_token = vercel_token
+        self.status = status
+        self.url = url
+        self.started_at = started_at or datetime.utcnow()
+        self.last_checked_at: Optional[str] = None
+        self.interval = POLL_MIN_INTERVAL_SECONDS
+        self.errors = 0
+        self.next_check_at = time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return (datetime.utcnow() - self.started_at).total_seconds() > MAX_MONITOR_MINUTES * 60
+
+
+def _write_status_changes(changes: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """Store changed deployment states for several projects in one transaction"""
+    from app.db.session import SessionLocal
+    from app.models.project_services import ProjectServiceConnection
+
+    by_project = dict(changes)
+    db = SessionLocal()
+    try:
+        connections = db.query(ProjectServiceConnection).filter(
+            ProjectServiceConnection.project_id.in_(list(by_project)),
+            ProjectServiceConnection.provider == "vercel"
+        ).all()
+        for connection in connections:
+            status_data = by_project[connection.project_id]
+            service_data = dict(connection.service_data) if connection.service_data else {}
+            current = service_data.get("current_deployment") or {}
+            if current.get("deployment_id") not in (None, status_data["id"]):
+                continue  # A newer deployment replaced this one
+
+            service_data["current_deployment"] = {
+                **current,
+                "deployment_id": status_data["id"],
+                "status": status_data["status"],
+                "deployment_url": status_data["url"],
+                "last_checked_at": _iso_now()
+            }
+            # Finished deployments update the canonical URL and clear current_deployment
+            if status_data["status"] == "READY" or status_data.get("ready") is True:
+                url = str(status_data["url"])
+                service_data["deployment_url"] = url if url.startswith("http") else f"https://{url}"
+                service_data["last_deployment_at"] = _iso_now()
+                service_data["current_deployment"] = None
+            elif status_data["status"] == "ERROR":
+                service_data["current_deployment"] = None
+
+            connection.service_data = service_data
+        db.commit()
     except Exception as e:
-        logger.error(f"Unexpected error in deployment monitoring: {e}")
+        db.rollback()
+        logger.error(f"Failed to store deployment status changes: {e}")
     finally:
-        # 모니터링 완료 시 태스크 목록에서 제거
-        if project_id in active_monitoring_tasks:
-            del active_monitoring_tasks[project_id]
+        db.close()
 
 
-async def update_deployment_status_in_db(
-    project_id: str, 
-    status_data: Dict[str, Any],
-    db_session_factory
-) -> None:
-    """DB의 배포 상태 업데이트"""
-    
+def _load_in_flight_deployments() -> List[TrackedDeployment]:
+    """Deployments recorded in service_data.current_deployment, e.g. before a restart"""
+    from app.db.session import SessionLocal
+    from app.models.project_services import ProjectServiceConnection
+    from app.services.token_service import get_token
+
+    db = SessionLocal()
     try:
-        # DB 세션 생성 (비동기 환경에서 새 세션 필요)
-        from sqlalchemy.orm import sessionmaker
-        from app.models.project_services import ProjectServiceConnection
-        
-        Session = db_session_factory
-        db = Session()
-        
+        connections = db.query(ProjectServiceConnection).filter(
+            ProjectServiceConnection.provider == "vercel"
+        ).all()
+        in_flight = [
+            (connection.project_id, (connection.service_data or {}).get("current_deployment"))
+            for connection in connections
+        ]
+        in_flight = [(project_id, current) for project_id, current in in_flight if current and current.get("deployment_id")]
+        if not in_flight:
+            return []
+        vercel_token = get_token(db, "vercel")
+        if not vercel_token:
+            return []
+        return [
+            TrackedDeployment(
+                project_id,
+                current["deployment_id"],
+                vercel_token,
+                status=current.get("status"),
+                url=current.get("deployment_url"),
+                started_at=_parse_iso(current.get("started_at"))
+            )
+            for project_id, current in in_flight
+        ]
+    finally:
+        db.close()
+
+
+class DeploymentPoller:
+    """
+    Polls all in-flight deployments from a single task
+
+    Each deployment has its own adaptive interval; due deployments are checked in
+    concurrent batches and only state changes are written to the database.
+    """
+
+    def __init__(self):
+        self.deployments: Dict[str, TrackedDeployment] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def track(self, deployment: TrackedDeployment) -> None:
+        self.deployments[deployment.project_id] = deployment
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    def untrack(self, project_id: str) -> bool:
+        return self.deployments.pop(project_id, None) is not None
+
+    def last_checked_at(self, project_id: str) -> Optional[str]:
+        deployment = self.deployments.get(project_id)
+        return deployment.last_checked_at if deployment else None
+
+    async def resume(self) -> int:
+        """Pick up deployments that were in flight when the server last stopped"""
+        resumed = 0
+        for deployment in await asyncio.to_thread(_load_in_flight_deployments):
+            if deployment.expired:
+                continue
+            self.track(deployment)
+            resumed += 1
+        if resumed:
+            logger.info(f"Resumed monitoring of {resumed} in-flight deployments")
+        return resumed
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while self.deployments:
+            now = time.monotonic()
+            due = sorted(
+                (d for d in self.deployments.values() if d.next_check_at <= now),
+                key=lambda d: d.next_check_at
+            )
+            if not due:
+                self._wakeup.clear()
+                delay = min(d.next_check_at for d in self.deployments.values()) - now
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, 0))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._poll_batch(due[:POLL_BATCH_SIZE])
+            except Exception as e:
+                logger.error(f"Deployment poller tick failed: {e}")
+                await asyncio.sleep(POLL_MIN_INTERVAL_SECONDS)
+
+    async def _check(self, deployment: TrackedDeployment) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Poll one deployment; returns (status data if it changed, whether it is finished)"""
         try:
-            # Vercel 연결 찾기
-            connection = db.query(ProjectServiceConnection).filter(
-                ProjectServiceConnection.project_id == project_id,
-                ProjectServiceConnection.provider == "vercel"
-            ).first()
-            
-            if connection:
-                service_data = dict(connection.service_data) if connection.service_data else {}
-                
-                # current_deployment 정보 업데이트
-                service_data["current_deployment"] = {
-                    "deployment_id": status_data["id"],
-                    "status": status_data["status"],
-                    "deployment_url": status_data["url"],
-                    "last_checked_at": datetime.utcnow().isoformat() + "Z"
-                }
-                
-                # 배포 완료 시 deployment_url 메인에도 업데이트
-                if status_data["status"] == "READY":
-                    service_data["deployment_url"] = f"https://{status_data['url']}" if not str(status_data["url"]).startswith("http") else status_data["url"]
-                    service_data["last_deployment_at"] = datetime.utcnow().isoformat() + "Z"
-                    # 모니터링 완료 시 current_deployment 제거
-                    service_data["current_deployment"] = None
-                elif status_data["status"] == "ERROR":
-                    # 에러 시에도 current_deployment 제거
-                    service_data["current_deployment"] = None
-                
-                # 명시적으로 새 dict 할당
-                connection.service_data = service_data
-                db.commit()
-                db.refresh(connection)
-                
-                # 검증: 실제로 저장되었는지 확인
-                updated_data = connection.service_data or {}
-                if "current_deployment" in updated_data:
-                    if status_data["status"] == "READY":
-                        logger.info(f"✅ Successfully saved READY deployment to DB for project {project_id}")
-                        logger.info(f"📝 Final service_data keys: {list(updated_data.keys())}")
-                else:
-                    logger.error(f"❌ DB update verification failed for project {project_id}")
-            else:
-                logger.error(f"❌ No Vercel connection found for project {project_id}")
-                
-        finally:
-            db.close()
-            
-    except Exception as e:
-        logger.error(f"❌ Failed to update deployment status in DB: {e}")
-        import traceback
-        logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+            status_data = await VercelService(deployment.vercel_token).get_deployment_status(deployment.deployment_id)
+        except VercelAPIError as e:
+            deployment.errors += 1
+            deployment.interval = min(POLL_MIN_INTERVAL_SECONDS * 2 ** deployment.errors, POLL_MAX_ERROR_INTERVAL_SECONDS)
+            deployment.next_check_at = time.monotonic() + deployment.interval
+            logger.warning(f"Deployment {deployment.deployment_id} status check failed ({deployment.errors}x): {e}")
+            return None, deployment.expired
+
+        deployment.errors = 0
+        deployment.last_checked_at = _iso_now()
+        changed = (status_data["status"], status_data["url"]) != (deployment.status, deployment.url)
+        deployment.status, deployment.url = status_data["status"], status_data["url"]
+        finished = status_data["status"] in ("READY", "ERROR") or status_data.get("ready") is True
+
+        if changed:
+            deployment.interval = POLL_MIN_INTERVAL_SECONDS
+            logger.info(f"Deployment {deployment.deployment_id} is now {status_data['status']}")
+        else:
+            deployment.interval = min(deployment.interval * POLL_BACKOFF_FACTOR, POLL_MAX_INTERVAL_SECONDS)
+        deployment.next_check_at = time.monotonic() + deployment.interval
+
+        if deployment.expired and not finished:
+            logger.warning(f"Deployment {deployment.deployment_id} monitoring timed out after {MAX_MONITOR_MINUTES} minutes")
+        return (status_data if changed or finished else None), finished or deployment.expired
+
+    async def _poll_batch(self, due: List[TrackedDeployment]) -> None:
+        results = await asyncio.gather(*(self._check(deployment) for deployment in due))
+        changes = []
+        for deployment, (status_data, done) in zip(due, results):
+            if status_data:
+                changes.append((deployment.project_id, status_data))
+            if done and self.deployments.get(deployment.project_id) is deployment:
+                del self.deployments[deployment.project_id]
+        if changes:
+            await asyncio.to_thread(_write_status_changes, changes)
+
+
+# Global deployment poller instance
+deployment_poller = DeploymentPoller()
+
+
+async def start_deployment_monitoring(project_id: str, deployment_id: str, vercel_token: str) -> None:
+    """Track a new deployment, replacing any deployment already tracked for the project"""
+    deployment_poller.track(TrackedDeployment(project_id, deployment_id, vercel_token))
+    logger.info(f"🚀 Started deployment monitoring for project {project_id}, deployment {deployment_id}")
 
 
 def stop_deployment_monitoring(project_id: str) -> None:
-    """특정 프로젝트의 배포 모니터링 중단"""
-    if project_id in active_monitoring_tasks:
-        active_monitoring_tasks[project_id].cancel()
-        del active_monitoring_tasks[project_id]
+    """Stop monitoring a project's deployment"""
+    if deployment_poller.untrack(project_id):
         logger.info(f"Stopped deployment monitoring for project {project_id}")
 
 
 def get_active_monitoring_projects() -> list:
-    """현재 모니터링 중인 프로젝트 목록 반환"""
-    return list(active_monitoring_tasks.keys())
\ No newline at end of file
+    """Projects with a deployment currently being monitored"""
+    return list(deployment_poller.deployments.keys())
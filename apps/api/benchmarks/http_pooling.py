@@ -0,0 +1,146 @@
+"""
+HTTP client pooling benchmark
+
+Compares a new client per API call (what the GitHub and Vercel services used to do)
+with the shared keep-alive pools from app.services.http_clients. Requests go to a
+local mock of the deployment-status endpoint, over TLS with a throwaway self-signed
+certificate by default so the per-call handshake is part of the measurement.
+
+    cd apps/api && python -m benchmarks.http_pooling --requests 500 --concurrency 8
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import ssl
+import statistics
+import tempfile
+import time
+
+import aiohttp
+import httpx
+from aiohttp import web
+
+from app.services.http_clients import create_aiohttp_session, create_httpx_client
+
+
+def make_tls_context(directory: str) -> ssl.SSLContext:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+async def start_mock_server(tls: bool) -> tuple:
+    connections = set()
+
+    async def deployment(request: web.Request) -> web.Response:
+        connections.add(request.transport.get_extra_info("peername"))
+        return web.json_response({
+            "id": request.match_info["deployment_id"],
+            "readyState": "BUILDING",
+            "url": "bench.vercel.app",
+            "alias": [],
+        })
+
+    app = web.Application()
+    app.router.add_get("/v13/deployments/{deployment_id}", deployment)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    context = make_tls_context(tempfile.mkdtemp(prefix="http-bench-")) if tls else None
+    site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=context)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"{'https' if tls else 'http'}://127.0.0.1:{port}", connections
+
+
+async def run_mode(mode: str, base_url: str, total: int, concurrency: int) -> list:
+    """Issue `total` status requests from `concurrency` pollers; returns per-request latencies"""
+    latencies: list = []
+    shared_httpx = create_httpx_client(verify=False) if mode == "httpx-pooled" else None
+    shared_aiohttp = create_aiohttp_session() if mode == "aiohttp-pooled" else None
+
+    async def one(i: int) -> None:
+        url = f"{base_url}/v13/deployments/dpl_{i}"
+        started = time.perf_counter()
+        if mode == "httpx-per-call":
+            async with httpx.AsyncClient(verify=False) as client:
+                (await client.get(url)).json()
+        elif mode == "httpx-pooled":
+            (await shared_httpx.get(url)).json()
+        elif mode == "aiohttp-per-call":
+            async with aiohttp.ClientSession() as session:
+                async with session.get(url, ssl=False) as response:
+                    await response.json()
+        else:
+            async with shared_aiohttp.get(url, ssl=False) as response:
+                await response.json()
+        latencies.append(time.perf_counter() - started)
+
+    async def poller(worker: int) -> None:
+        for i in range(worker, total, concurrency):
+            await one(i)
+
+    await asyncio.gather(*(poller(w) for w in range(concurrency)))
+    if shared_httpx:
+        await shared_httpx.aclose()
+    if shared_aiohttp:
+        await shared_aiohttp.close()
+    return latencies
+
+
+async def run(args: argparse.Namespace) -> None:
+    runner, base_url, connections = await start_mock_server(not args.no_tls)
+    header = f"{'mode':<18}{'secs':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'conns':>7}"
+    print(f"mock server: {base_url}")
+    print(header)
+    print("-" * len(header))
+    try:
+        for mode in args.modes:
+            connections.clear()
+            started = time.perf_counter()
+            latencies = sorted(await run_mode(mode, base_url, args.requests, args.concurrency))
+            elapsed = time.perf_counter() - started
+            print(
+                f"{mode:<18}{elapsed:>8.2f}{len(latencies) / elapsed:>9.0f}"
+                f"{statistics.median(latencies) * 1000:>9.2f}"
+                f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>9.2f}{len(connections):>7}"
+            )
+    finally:
+        await runner.cleanup()
+
+
+MODES = ["httpx-per-call", "httpx-pooled", "aiohttp-per-call", "aiohttp-pooled"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8, help="simultaneous pollers")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--no-tls", action="store_true", help="plain HTTP mock server")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
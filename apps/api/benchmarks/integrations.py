@@ -0,0 +1,174 @@
+"""
+GitHub/Vercel integration benchmark
+
+Drives the real connect and deploy endpoints (in-process, through the ASGI app) against
+the fake providers in benchmarks.mock_servers, then waits for the deployment poller to
+see every deployment through to READY. Reports throughput, latency percentiles and
+errors per phase, and how many status polls each deployment cost.
+
+    cd apps/api && python -m benchmarks.integrations --projects 20 --concurrency 5 --latency-ms 80
+    cd apps/api && python -m benchmarks.integrations --failure-rate 0.05 --build-seconds 10
+
+Everything runs against a throwaway database and projects directory.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.mock_servers import MockOptions, add_mock_arguments, create_github_app, create_vercel_app, start_app
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(int(len(ordered) * fraction) - 1, 0)]
+
+
+def print_row(name: str, elapsed: float, latencies: List[float], errors: int) -> None:
+    if latencies:
+        print(
+            f"{name:<10}{len(latencies):>6}{errors:>8}{elapsed:>8.2f}{len(latencies) / elapsed:>9.1f}"
+            f"{statistics.median(latencies) * 1000:>9.1f}{percentile(latencies, 0.95) * 1000:>9.1f}"
+        )
+    else:
+        print(f"{name:<10}{0:>6}{errors:>8}{elapsed:>8.2f}{'-':>9}{'-':>9}{'-':>9}")
+
+
+def make_project_repo(root: str, project_id: str) -> str:
+    repo_path = os.path.join(root, project_id, "repo")
+    os.makedirs(repo_path)
+    with open(os.path.join(repo_path, "README.md"), "w") as f:
+        f.write(f"# {project_id}\n")
+    subprocess.run(["git", "init", "-q", repo_path], check=True)
+    return repo_path
+
+
+async def run_phase(client: httpx.AsyncClient, requests: Dict[str, tuple], concurrency: int) -> tuple:
+    """POST each project's (path, body); returns (ok project ids, latencies, errors, elapsed)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    ok: List[str] = []
+    errors: Dict[str, int] = {}
+
+    async def one(project_id: str, path: str, body: dict) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(path, json=body)
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - started)
+                ok.append(project_id)
+            else:
+                key = f"{response.status_code} {response.json().get('detail', '')[:60]}"
+                errors[key] = errors.get(key, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(project_id, path, body) for project_id, (path, body) in requests.items()))
+    return ok, latencies, errors, time.perf_counter() - started
+
+
+async def run(args: argparse.Namespace) -> None:
+    options = MockOptions(
+        args.latency_ms, args.jitter_ms, args.failure_rate, args.queued_seconds, args.build_seconds, seed=args.seed
+    )
+    github_app, vercel_app = create_github_app(options), create_vercel_app(options)
+    github_runner, github_url = await start_app(github_app)
+    vercel_runner, vercel_url = await start_app(vercel_app)
+
+    # Settings are read at import time, so point the app at the mocks before importing it
+    work_dir = tempfile.mkdtemp(prefix="integrations-bench-")
+    os.environ["GITHUB_API_BASE"] = github_url
+    os.environ["VERCEL_API_BASE"] = vercel_url
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+    os.environ["PROJECTS_ROOT"] = os.path.join(work_dir, "projects")
+
+    from app.db.migrations import run_migrations
+    from app.db.session import SessionLocal, engine
+    from app.main import app
+    from app.models.projects import Project
+    from app.services.http_clients import close_http_clients, start_http_clients
+    from app.services.token_service import save_service_token
+    from app.services.vercel_service import deployment_poller
+
+    if not args.verbose:
+        # Failures are summarised after the table instead
+        logging.disable(logging.ERROR)
+    run_migrations(engine)
+    await start_http_clients()
+    project_ids = [f"bench-{i:04d}" for i in range(args.projects)]
+    with SessionLocal() as db:
+        save_service_token(db, "github", "ghp_benchmarktoken", "benchmark")
+        save_service_token(db, "vercel", "vercel_benchmarktoken", "benchmark")
+        for project_id in project_ids:
+            repo_path = make_project_repo(os.environ["PROJECTS_ROOT"], project_id)
+            db.add(Project(id=project_id, name=project_id, repo_path=repo_path))
+        db.commit()
+
+    header = f"{'phase':<10}{'ok':>6}{'errors':>8}{'secs':>8}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+    print(f"mock GitHub: {github_url}  mock Vercel: {vercel_url}")
+    print(header)
+    print("-" * len(header))
+    all_errors: Dict[str, int] = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            phases = [
+                ("github", "/api/projects/{}/github/connect", lambda p: {"repo_name": p}),
+                ("vercel", "/api/projects/{}/vercel/connect", lambda p: {"project_name": p}),
+                ("deploy", "/api/projects/{}/vercel/deploy", lambda p: {"branch": "main"}),
+            ]
+            remaining = project_ids
+            for name, path, body in phases:
+                remaining, latencies, errors, elapsed = await run_phase(
+                    client, {p: (path.format(p), body(p)) for p in remaining}, args.concurrency
+                )
+                print_row(name, elapsed, latencies, sum(errors.values()))
+                for key, count in errors.items():
+                    all_errors[f"{name}: {key}"] = count
+            deployed_at = {project_id: time.perf_counter() for project_id in remaining}
+
+            # Monitor: wait for the poller to drop each deployment (READY, ERROR or expired)
+            ready_after: List[float] = []
+            started = time.perf_counter()
+            while deployed_at and time.perf_counter() - started < args.monitor_timeout:
+                for project_id in [p for p in deployed_at if p not in deployment_poller.deployments]:
+                    ready_after.append(time.perf_counter() - deployed_at.pop(project_id))
+                await asyncio.sleep(0.05)
+            print_row("monitor", time.perf_counter() - started, ready_after, len(deployed_at))
+            if deployed_at:
+                all_errors["monitor: still in flight at timeout"] = len(deployed_at)
+    finally:
+        await deployment_poller.stop()
+        await close_http_clients()
+        await github_runner.cleanup()
+        await vercel_runner.cleanup()
+
+    status_polls = vercel_app["stats"]["GET /v13/deployments/{deployment_id}"]
+    deployments = len(vercel_app["deployments"])
+    print()
+    print(f"status polls per deployment: {status_polls / deployments if deployments else 0:.1f}")
+    print(f"GitHub 304 revalidations: {github_app['stats']['not_modified']}")
+    print(f"injected failures: {github_app['stats']['injected_failures'] + vercel_app['stats']['injected_failures']}")
+    for key, count in sorted(all_errors.items()):
+        print(f"  {count:>4}x {key}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5, help="simultaneous connect/deploy requests")
+    parser.add_argument("--monitor-timeout", type=float, default=120.0, help="seconds to wait for READY")
+    parser.add_argument("--seed", type=int, default=1, help="failure injection seed")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's request, status and error logs")
+    add_mock_arguments(parser)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
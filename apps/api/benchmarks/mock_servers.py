@@ -0,0 +1,250 @@
+"""
+Fake GitHub and Vercel API servers
+
+Serve the endpoints used by app.services.github_service and app.services.vercel_service
+from recorded fixtures (benchmarks/fixtures), with configurable latency and failure
+injection. Deployments move QUEUED -> BUILDING -> READY on a timer.
+
+Run standalone and point a dev API server at it:
+
+    cd apps/api && python -m benchmarks.mock_servers --github-port 9101 --vercel-port 9102 --latency-ms 80
+    GITHUB_API_BASE=http://127.0.0.1:9101 VERCEL_API_BASE=http://127.0.0.1:9102 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+RATE_LIMIT = 5000
+
+
+class MockOptions:
+    """Behaviour shared by both fake providers"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        failure_rate: float = 0.0,
+        queued_seconds: float = 1.0,
+        build_seconds: float = 3.0,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.queued_seconds = queued_seconds
+        self.build_seconds = build_seconds
+        self.random = random.Random(seed)
+
+
+def load_fixture(provider: str, fixture: str, **values: str) -> dict:
+    """Read a recorded response, filling {placeholders} with the given values"""
+    with open(os.path.join(FIXTURES_DIR, provider, f"{fixture}.json")) as f:
+        raw = f.read()
+    for key, value in values.items():
+        raw = raw.replace("{" + key + "}", str(value))
+    return json.loads(raw)
+
+
+def _inject(options: MockOptions, stats: Counter):
+    """Middleware adding latency, random 5xx failures and per-route request counts"""
+
+    @web.middleware
+    async def middleware(request: web.Request, handler):
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        stats[f"{request.method} {route}"] += 1
+        delay = options.latency_ms + options.random.uniform(-options.jitter_ms, options.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if options.failure_rate and options.random.random() < options.failure_rate:
+            stats["injected_failures"] += 1
+            return web.json_response({"message": "Injected failure", "error": {"message": "Injected failure"}}, status=502)
+        return await handler(request)
+
+    return middleware
+
+
+def create_github_app(options: MockOptions) -> web.Application:
+    stats: Counter = Counter()
+    repos: Dict[Tuple[str, str], dict] = {}
+    budget = {"remaining": RATE_LIMIT, "reset": int(time.time()) + 3600}
+    user = load_fixture("github", "user")
+    owner = user["login"]
+
+    def rate_headers(extra: Optional[dict] = None, counted: bool = True) -> dict:
+        if counted:
+            budget["remaining"] = max(budget["remaining"] - 1, 0)
+        return {
+            "X-RateLimit-Limit": str(RATE_LIMIT),
+            "X-RateLimit-Remaining": str(budget["remaining"]),
+            "X-RateLimit-Reset": str(budget["reset"]),
+            **(extra or {}),
+        }
+
+    def etag_response(request: web.Request, body) -> web.Response:
+        etag = '"' + str(abs(hash(json.dumps(body, sort_keys=True)))) + '"'
+        if request.headers.get("If-None-Match") == etag:
+            stats["not_modified"] += 1
+            return web.Response(status=304, headers=rate_headers({"ETag": etag}, counted=False))
+        return web.json_response(body, headers=rate_headers({"ETag": etag}))
+
+    async def get_user(request: web.Request) -> web.Response:
+        return etag_response(request, user)
+
+    async def get_repo(request: web.Request) -> web.Response:
+        repo = repos.get((request.match_info["owner"], request.match_info["repo"]))
+        if repo is None:
+            return web.json_response({"message": "Not Found"}, status=404, headers=rate_headers())
+        return etag_response(request, repo)
+
+    async def create_repo(request: web.Request) -> web.Response:
+        payload = await request.json()
+        name = payload.get("name", "")
+        if (owner, name) in repos:
+            return web.json_response({
+                "message": "Repository creation failed.",
+                "errors": [{"resource": "Repository", "code": "custom", "field": "name",
+                            "message": "name already exists on this account"}]
+            }, status=422, headers=rate_headers())
+        repo = load_fixture("github", "repository", owner=owner, name=name)
+        repo["id"] = 1296269 + len(repos)
+        repo["private"] = bool(payload.get("private"))
+        repos[(owner, name)] = repo
+        return web.json_response(repo, status=201, headers=rate_headers())
+
+    async def list_repos(request: web.Request) -> web.Response:
+        per_page = int(request.query.get("per_page", 30))
+        page = int(request.query.get("page", 1))
+        items = list(repos.values())[::-1][(page - 1) * per_page:page * per_page]
+        return etag_response(request, items)
+
+    app = web.Application(middlewares=[_inject(options, stats)])
+    app["stats"] = stats
+    app["repos"] = repos
+    app.router.add_get("/user", get_user)
+    app.router.add_get("/user/repos", list_repos)
+    app.router.add_post("/user/repos", create_repo)
+    app.router.add_get("/repos/{owner}/{repo}", get_repo)
+    return app
+
+
+def create_vercel_app(options: MockOptions) -> web.Application:
+    stats: Counter = Counter()
+    projects: Dict[str, dict] = {}
+    deployments: Dict[str, Tuple[float, dict]] = {}
+
+    def deployment_state(created: float) -> str:
+        elapsed = time.monotonic() - created
+        if elapsed < options.queued_seconds:
+            return "QUEUED"
+        if elapsed < options.queued_seconds + options.build_seconds:
+            return "BUILDING"
+        return "READY"
+
+    async def get_user(request: web.Request) -> web.Response:
+        return web.json_response(load_fixture("vercel", "user"))
+
+    async def create_project(request: web.Request) -> web.Response:
+        payload = await request.json()
+        name = payload.get("name", "")
+        if any(project["name"] == name for project in projects.values()):
+            return web.json_response({"error": {"code": "conflict", "message": "Project already exists"}}, status=409)
+        repo = (payload.get("gitRepository") or {}).get("repo", "")
+        project = load_fixture("vercel", "project", id=uuid.uuid4().hex[:12], name=name, repo=repo,
+                               owner=repo.split("/")[0])
+        projects[project["id"]] = project
+        return web.json_response(project, status=201)
+
+    async def get_project(request: web.Request) -> web.Response:
+        project = projects.get(request.match_info["project_id"])
+        if project is None:
+            return web.json_response({"error": {"code": "not_found", "message": "Project not found"}}, status=404)
+        return web.json_response(project)
+
+    async def list_projects(request: web.Request) -> web.Response:
+        return web.json_response({"projects": list(projects.values()), "pagination": {"count": len(projects)}})
+
+    async def create_deployment(request: web.Request) -> web.Response:
+        payload = await request.json()
+        name = payload.get("name", "")
+        deployment_id = uuid.uuid4().hex[:16]
+        project = next((p for p in projects.values() if p["name"] == name), None)
+        body = load_fixture("vercel", "deployment", id=deployment_id, name=name, state="QUEUED",
+                           project=project["id"][4:] if project else "unknown")
+        deployments[body["id"]] = (time.monotonic(), body)
+        return web.json_response(body, status=200)
+
+    async def get_deployment(request: web.Request) -> web.Response:
+        entry = deployments.get(request.match_info["deployment_id"])
+        if entry is None:
+            return web.json_response({"error": {"code": "not_found", "message": "Deployment not found"}}, status=404)
+        created, body = entry
+        state = deployment_state(created)
+        return web.json_response({**body, "readyState": state, "ready": state == "READY" or None})
+
+    app = web.Application(middlewares=[_inject(options, stats)])
+    app["stats"] = stats
+    app["deployments"] = deployments
+    app.router.add_get("/v2/user", get_user)
+    app.router.add_post("/v11/projects", create_project)
+    app.router.add_get("/v9/projects/{project_id}", get_project)
+    app.router.add_get("/v10/projects", list_projects)
+    app.router.add_post("/v13/deployments", create_deployment)
+    app.router.add_get("/v13/deployments/{deployment_id}", get_deployment)
+    return app
+
+
+async def start_app(app: web.Application, port: int = 0) -> Tuple[web.AppRunner, str]:
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    bound = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{bound}"
+
+
+async def serve(args: argparse.Namespace) -> None:
+    options = MockOptions(args.latency_ms, args.jitter_ms, args.failure_rate, args.queued_seconds, args.build_seconds)
+    github_runner, github_url = await start_app(create_github_app(options), args.github_port)
+    vercel_runner, vercel_url = await start_app(create_vercel_app(options), args.vercel_port)
+    print(f"GITHUB_API_BASE={github_url}")
+    print(f"VERCEL_API_BASE={vercel_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await github_runner.cleanup()
+        await vercel_runner.cleanup()
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform +/- jitter on the latency")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of requests answered with 502")
+    parser.add_argument("--queued-seconds", type=float, default=1.0, help="time a deployment stays QUEUED")
+    parser.add_argument("--build-seconds", type=float, default=3.0, help="time a deployment stays BUILDING")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--github-port", type=int, default=9101)
+    parser.add_argument("--vercel-port", type=int, default=9102)
+    add_mock_arguments(parser)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
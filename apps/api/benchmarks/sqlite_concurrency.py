@@ -0,0 +1,165 @@
+"""
+SQLite concurrency benchmark
+
+Runs concurrent streaming-style writers (one small transaction per message) against
+readers paging through chat history, for the original and the tuned SQLite profiles.
+
+    cd apps/api && python -m benchmarks.sqlite_concurrency --writers 4 --readers 4 --messages 500
+
+Pass --database-url to run the same workload against a server database instead, e.g. a
+local PostgreSQL container: --database-url postgresql+psycopg://cc:cc@localhost:5432/cc_bench
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+
+# Keep the app's default database untouched
+_tmp_dir = tempfile.mkdtemp(prefix="sqlite-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp_dir, 'unused.db')}")
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.core.config import normalize_database_url  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import sqlite_pragmas  # noqa: E402
+from app.db.writer import install_write_gate  # noqa: E402
+from app.models.messages import Message  # noqa: E402
+from app.models.projects import Project  # noqa: E402
+
+
+PROFILES = {
+    # What session.py did before: rollback journal, FULL sync, driver default timeout
+    "baseline": {"pragmas": ["PRAGMA foreign_keys=ON"], "single_writer": False},
+    "tuned": {"pragmas": sqlite_pragmas(), "single_writer": False},
+    "tuned+single-writer": {"pragmas": sqlite_pragmas(), "single_writer": True},
+}
+
+
+def make_session_factory(url: str, profile: dict):
+    if url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+
+        @event.listens_for(engine, "connect")
+        def _pragmas(dbapi_conn, connection_record):
+            cursor = dbapi_conn.cursor()
+            for statement in profile["pragmas"]:
+                cursor.execute(statement)
+            cursor.close()
+    else:
+        engine = create_engine(normalize_database_url(url), pool_size=16, max_overflow=16, pool_pre_ping=True)
+
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    if profile["single_writer"]:
+        install_write_gate(factory)
+    return engine, factory
+
+
+def run_profile(name: str, writers: int, readers: int, messages: int, database_url: str | None = None) -> dict:
+    url = database_url or f"sqlite:///{os.path.join(_tmp_dir, f'{name}.db')}"
+    engine, factory = make_session_factory(url, PROFILES.get(name, {"pragmas": [], "single_writer": False}))
+    with factory() as db:
+        # Cascades to the messages of a previous run on a shared server database
+        db.query(Project).filter(Project.id == "bench").delete()
+        db.add(Project(id="bench", name="bench"))
+        db.commit()
+
+    write_latencies: list[float] = []
+    errors = {"write": 0, "read": 0}
+    reads = [0]
+    lock = threading.Lock()
+    writers_done = threading.Event()
+
+    def writer(worker: int) -> None:
+        with factory() as db:
+            for i in range(messages):
+                started = time.perf_counter()
+                try:
+                    db.add(Message(
+                        id=str(uuid.uuid4()), project_id="bench", role="assistant", message_type="chat",
+                        content=f"worker {worker} message {i} " + "lorem ipsum " * 20,
+                        metadata_json={"cli_type": "claude"}, conversation_id=f"conv-{worker}"
+                    ))
+                    db.commit()
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        errors["write"] += 1
+                    continue
+                with lock:
+                    write_latencies.append(time.perf_counter() - started)
+
+    def reader() -> None:
+        with factory() as db:
+            while not writers_done.is_set():
+                try:
+                    db.query(Message).filter(Message.project_id == "bench", Message.hidden.is_(False)) \
+                        .order_by(Message.created_at.desc(), Message.id.desc()).limit(100).all()
+                    db.rollback()
+                    with lock:
+                        reads[0] += 1
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        errors["read"] += 1
+
+    writer_threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    started = time.perf_counter()
+    for t in reader_threads + writer_threads:
+        t.start()
+    for t in writer_threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    writers_done.set()
+    for t in reader_threads:
+        t.join()
+    if database_url:
+        with factory() as db:
+            db.query(Project).filter(Project.id == "bench").delete()
+            db.commit()
+    engine.dispose()
+
+    latencies = sorted(write_latencies)
+    return {
+        "profile": name,
+        "seconds": elapsed,
+        "writes_per_s": len(latencies) / elapsed,
+        "reads_per_s": reads[0] / elapsed,
+        "write_p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "write_p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+        "write_errors": errors["write"],
+        "read_errors": errors["read"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=300, help="messages per writer")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--database-url", help="benchmark this database instead of temporary SQLite files")
+    args = parser.parse_args()
+    profiles = ["server"] if args.database_url else args.profiles
+
+    header = f"{'profile':<22}{'secs':>8}{'writes/s':>10}{'reads/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'w err':>7}{'r err':>7}"
+    print(header)
+    print("-" * len(header))
+    for name in profiles:
+        r = run_profile(name, args.writers, args.readers, args.messages, args.database_url)
+        print(
+            f"{r['profile']:<22}{r['seconds']:>8.2f}{r['writes_per_s']:>10.0f}{r['reads_per_s']:>10.0f}"
+            f"{r['write_p50_ms']:>9.2f}{r['write_p95_ms']:>9.2f}{r['write_errors']:>7}{r['read_errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
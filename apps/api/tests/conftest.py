@@ -0,0 +1,55 @@
+"""
+Shared fixtures
+
+Settings are read at import time, so the environment points the app at a throwaway
+database, projects directory and encryption key before anything under app/ is imported.
+"""
+import os
+import tempfile
+import uuid
+from types import SimpleNamespace
+
+from cryptography.fernet import Fernet
+
+_TEST_ROOT = tempfile.mkdtemp(prefix="claudable-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_ROOT, 'test.db')}"
+os.environ["PROJECTS_ROOT"] = os.path.join(_TEST_ROOT, "projects")
+os.environ["ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+os.environ.pop("ENCRYPTION_KEYS", None)
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def engine():
+    from app.db.migrations import run_migrations
+    from app.db.session import engine
+
+    run_migrations(engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def project(db):
+    """A fresh project row with an empty repo directory"""
+    from app.core.config import settings
+    from app.models.projects import Project
+
+    project_id = f"test-{uuid.uuid4().hex[:12]}"
+    repo_path = os.path.join(settings.projects_root, project_id, "repo")
+    os.makedirs(repo_path)
+    db.add(Project(id=project_id, name=project_id, repo_path=repo_path))
+    db.commit()
+    # Plain attributes: some code under test expunges the session
+    return SimpleNamespace(id=project_id, repo_path=repo_path)
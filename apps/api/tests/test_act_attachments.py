@@ -0,0 +1,109 @@
+import asyncio
+import base64
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.chat import act
+from app.api.chat.act import ActRequest, AssetRef, ImageAttachment, resolve_attachments
+from app.services.assets import store_base64
+from app.services.cli import unified_manager
+from app.services.cli.unified_manager import CLIType, UnifiedCLIManager
+
+
+def encode(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+@pytest.fixture
+def prepared(monkeypatch):
+    """Attachments handed to the image pipeline, with the thread each was handed over on"""
+    calls = []
+    monkeypatch.setattr(
+        act.image_pipeline, "prepare", lambda attachment: calls.append((attachment, threading.get_ident()))
+    )
+    return calls
+
+
+def resolve(db, project, **fields):
+    return asyncio.run(resolve_attachments(db, project.id, ActRequest(instruction="go", **fields)))
+
+
+def test_asset_refs_resolve_by_hash_and_by_path(db, project, prepared):
+    asset, _ = store_base64(db, project.id, encode(b"\x89PNG pixels"), "shot.png", "image/png")
+
+    attachments = resolve(db, project, assets=[
+        AssetRef(sha256=asset.sha256.upper()),
+        AssetRef(path=f"assets/{asset.filename}", name="renamed.png"),
+    ])
+
+    assert [a["sha256"] for a in attachments] == [asset.sha256, asset.sha256]
+    assert [a["name"] for a in attachments] == ["shot.png", "renamed.png"]
+    assert attachments[0]["path"] == attachments[1]["path"]
+    # Lookups run in the threadpool; the pipeline is started from the loop's thread
+    assert [call[0] for call in prepared] == attachments
+    assert {call[1] for call in prepared} == {threading.get_ident()}
+
+
+def test_inline_images_are_stored_as_assets(db, project, prepared):
+    asset, _ = store_base64(db, project.id, encode(b"\x89PNG inline"), "first.png", "image/png")
+
+    attachments = resolve(db, project, images=[ImageAttachment(name="again.png", base64_data=encode(b"\x89PNG inline"))])
+
+    assert attachments == [{**attachments[0], "name": "again.png", "sha256": asset.sha256}]
+
+
+@pytest.mark.parametrize("ref", [AssetRef(sha256="0" * 64), AssetRef(path="assets/missing.png")])
+def test_unknown_asset_ref_is_rejected(db, project, prepared, ref):
+    with pytest.raises(HTTPException) as error:
+        resolve(db, project, assets=[ref])
+
+    assert error.value.status_code == 400
+    assert error.value.detail == f"Unknown asset: {ref.sha256 or ref.path}"
+    assert prepared == []
+
+
+class RecordingCLI:
+    cli_type = CLIType.CLAUDE
+
+    def __init__(self):
+        self.calls = []
+
+    @staticmethod
+    def _normalize_tool_name(name):
+        return name
+
+    async def execute_with_streaming(self, **kwargs):
+        self.calls.append(kwargs)
+        return
+        yield
+
+
+def test_manager_appends_prepared_image_paths_to_instruction(db, project, monkeypatch):
+    async def prepare_all(images):
+        return [{**image, "path": image["path"] + ".small.jpg"} for image in images]
+
+    monkeypatch.setattr(unified_manager.image_pipeline, "prepare_all", prepare_all)
+    manager = UnifiedCLIManager(project.id, project.repo_path, "session-1", "conversation-1", db)
+    cli = RecordingCLI()
+    images = [{"name": "a.png", "path": "/assets/a.png"}, {"name": "b.png", "path": "/assets/b.png"}]
+
+    result = asyncio.run(manager._execute_with_cli(cli, "Fix the header", images))
+
+    assert result["success"] is True
+    assert cli.calls[0]["instruction"] == (
+        "Fix the header\n\n"
+        "Image #1 path: /assets/a.png.small.jpg\n"
+        "Image #2 path: /assets/b.png.small.jpg"
+    )
+    assert [image["path"] for image in cli.calls[0]["images"]] == ["/assets/a.png.small.jpg", "/assets/b.png.small.jpg"]
+
+
+def test_manager_leaves_instruction_alone_without_images(db, project):
+    manager = UnifiedCLIManager(project.id, project.repo_path, "session-1", "conversation-1", db)
+    cli = RecordingCLI()
+
+    asyncio.run(manager._execute_with_cli(cli, "Fix the header", []))
+
+    assert cli.calls[0]["instruction"] == "Fix the header"
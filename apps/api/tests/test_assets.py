@@ -0,0 +1,88 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.api import assets as assets_api
+from app.core.config import settings
+from app.models.assets import Asset
+from app.services.assets import AssetTooLargeError, get_assets_dir, normalize_mime_type
+
+LIMIT = 4096
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "asset_max_upload_bytes", LIMIT)
+    monkeypatch.setattr(assets_api.image_pipeline, "prepare", lambda attachment: None)
+    app = FastAPI()
+    app.include_router(assets_api.router)
+    return TestClient(app)
+
+
+def upload(client, project, data, content_type="image/png"):
+    return client.post(f"/api/assets/{project.id}/upload", files={"file": ("pic.png", data, content_type)})
+
+
+def stored_files(project):
+    assets_dir = get_assets_dir(project.id)
+    return sorted(os.listdir(assets_dir)) if os.path.isdir(assets_dir) else []
+
+
+def test_identical_uploads_are_stored_once(client, db, project):
+    first = upload(client, project, b"\x89PNG same bytes")
+    second = upload(client, project, b"\x89PNG same bytes")
+
+    assert first.status_code == second.status_code == 200
+    assert (first.json()["deduplicated"], second.json()["deduplicated"]) == (False, True)
+    assert first.json()["sha256"] == second.json()["sha256"]
+    [asset] = db.query(Asset).filter(Asset.project_id == project.id).all()
+    assert asset.upload_count == 2
+    assert stored_files(project) == [asset.filename]
+
+
+def test_file_over_the_limit_is_rejected(client, project):
+    response = upload(client, project, b"x" * (LIMIT + 1))
+
+    assert response.status_code == 413
+    assert stored_files(project) == []
+
+
+def test_oversized_body_is_rejected_from_content_length(client, project):
+    response = upload(client, project, b"x" * (LIMIT + assets_api.MULTIPART_OVERHEAD_BYTES))
+
+    assert response.status_code == 413
+    assert stored_files(project) == []
+
+
+def test_body_without_content_length_is_cut_off(monkeypatch):
+    monkeypatch.setattr(settings, "asset_max_upload_bytes", LIMIT)
+    preamble = (
+        b'--xyz\r\nContent-Disposition: form-data; name="file"; filename="big.png"\r\n'
+        b"Content-Type: image/png\r\n\r\n"
+    )
+    chunks = [preamble] + [b"x" * 8192] * 100
+    received = []
+
+    async def receive():
+        received.append(1)
+        return {"type": "http.request", "body": chunks[len(received) - 1], "more_body": len(received) < len(chunks)}
+
+    request = Request({
+        "type": "http", "method": "POST", "path": "/",
+        "headers": [(b"content-type", b"multipart/form-data; boundary=xyz")],
+    }, receive)
+
+    with pytest.raises(AssetTooLargeError):
+        asyncio.run(assets_api._receive_upload(request))
+    # Stopped reading within one chunk of the limit
+    assert (len(received) - 1) * 8192 <= LIMIT + assets_api.MULTIPART_OVERHEAD_BYTES + 8192
+
+
+def test_mime_type_is_normalized_to_fit_the_column():
+    assert normalize_mime_type("Image/PNG; charset=binary") == "image/png"
+    assert normalize_mime_type("image/" + "x" * 80, "photo.jpg") == "image/jpeg"
+    assert normalize_mime_type("<script>", "blob") is None
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import subprocess
+
+import pytest
+
+from app.api import commits
+from app.services.checkpoints import create_checkpoint, list_checkpoints, restore_checkpoint
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "Test", "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "Test", "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
+@pytest.fixture
+def repo(project, monkeypatch):
+    for key, value in GIT_ENV.items():
+        monkeypatch.setenv(key, value)
+    path = project.repo_path
+
+    def commit(text: str) -> str:
+        with open(os.path.join(path, "page.tsx"), "w") as f:
+            f.write(text)
+        subprocess.run(["git", "add", "-A"], cwd=path, check=True)
+        subprocess.run(["git", "commit", "-qm", text], cwd=path, check=True)
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=path, check=True, capture_output=True, text=True).stdout.strip()
+
+    subprocess.run(["git", "init", "-q", path], check=True)
+    return path, commit
+
+
+def read(path: str) -> str:
+    with open(os.path.join(path, "page.tsx")) as f:
+        return f.read()
+
+
+def test_checkpoint_round_trip(repo):
+    path, commit = repo
+    commit("v1")
+    with open(os.path.join(path, "page.tsx"), "w") as f:
+        f.write("uncommitted")
+
+    checkpoint = create_checkpoint(path, "before experiment")
+    with open(os.path.join(path, "page.tsx"), "w") as f:
+        f.write("broken")
+    restore_checkpoint(path, checkpoint["id"])
+
+    assert read(path) == "uncommitted"
+    assert checkpoint["id"] in [c["id"] for c in list_checkpoints(path)]
+
+
+def test_revert_survives_checkpoint_failure(repo, project, db, monkeypatch):
+    path, commit = repo
+    first = commit("v1")
+    commit("v2")
+
+    def failing_checkpoint(*args, **kwargs):
+        raise subprocess.CalledProcessError(128, ["git", "commit-tree"], stderr="Please tell me who you are")
+
+    monkeypatch.setattr(commits, "create_checkpoint", failing_checkpoint)
+    result = asyncio.run(commits.revert_to(project.id, first, db))
+
+    assert result == {"ok": True, "checkpoint_id": None}
+    assert read(path) == "v1"
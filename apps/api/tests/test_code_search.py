@@ -0,0 +1,84 @@
+import os
+import time
+
+from app.services import code_search
+from app.services.code_search import TrigramIndex
+
+
+def make_index(tmp_path, files):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    for name, data in files.items():
+        path = repo / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data if isinstance(data, bytes) else data.encode())
+    return TrigramIndex("test", str(repo), str(tmp_path / "data" / "search_index.json"))
+
+
+def paths(found):
+    return [r["path"] for r in found["results"]]
+
+
+def test_finds_matches_with_context(tmp_path):
+    index = make_index(tmp_path, {
+        "src/app.ts": "import x\nconst handleSubmit = () => {}\nexport default x\n",
+        "src/other.ts": "nothing here\n",
+    })
+
+    found = index.search("handleSubmit", context_lines=1)
+
+    assert paths(found) == ["src/app.ts"]
+    match = found["results"][0]["matches"][0]
+    assert match["line"] == 2
+    assert match["context_before"] == ["import x"]
+    assert match["context_after"] == ["export default x"]
+
+
+def test_binary_and_large_files_are_skipped_for_all_query_lengths(tmp_path, monkeypatch):
+    monkeypatch.setattr(code_search, "MAX_INDEXED_FILE_BYTES", 1024)
+    index = make_index(tmp_path, {
+        "small.txt": "ab needle\n",
+        "big.txt": "ab needle\n" * 500,
+        "image.bin": b"\x00\x01ab needle",
+    })
+
+    for query in ("needle", "ab"):
+        found = index.search(query)
+        assert paths(found) == ["small.txt"]
+        assert found["skipped_files"] == 2
+
+
+def test_dirty_paths_are_reindexed_without_a_scan(tmp_path):
+    index = make_index(tmp_path, {"a.txt": "old text\n"})
+    assert paths(index.search("fresh")) == []
+
+    (tmp_path / "repo" / "a.txt").write_text("fresh text\n")
+    index.mark_dirty(["a.txt"])
+
+    assert paths(index.search("fresh")) == ["a.txt"]
+
+
+def test_stale_scan_runs_in_background(tmp_path, monkeypatch):
+    index = make_index(tmp_path, {"a.txt": "alpha\n"})
+    index.search("alpha")
+    (tmp_path / "repo" / "b.txt").write_text("alpha again\n")
+
+    # Within the interval: no scan, the new file is not seen yet
+    assert paths(index.search("alpha")) == ["a.txt"]
+
+    monkeypatch.setattr(code_search, "RESCAN_INTERVAL_SECONDS", 0.0)
+    index.search("alpha")
+    deadline = time.monotonic() + 5
+    while index._scanning and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert sorted(paths(index.search("alpha"))) == ["a.txt", "b.txt"]
+
+
+def test_index_persists_and_drops_deleted_files(tmp_path):
+    index = make_index(tmp_path, {"a.txt": "persisted\n", "b.txt": "persisted too\n"})
+    index.search("persisted")
+    os.remove(tmp_path / "repo" / "b.txt")
+
+    reloaded = TrigramIndex("test", index.repo_path, index.index_path)
+    assert set(reloaded.files) == {"a.txt", "b.txt"}
+    assert paths(reloaded.search("persisted")) == ["a.txt"]
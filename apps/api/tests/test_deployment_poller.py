@@ -0,0 +1,130 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from app.models.project_services import ProjectServiceConnection
+from app.models.projects import Project
+from app.services import vercel_service
+from app.services.token_service import save_service_token
+from app.services.vercel_service import (
+    POLL_MAX_ERROR_INTERVAL_SECONDS, POLL_MAX_INTERVAL_SECONDS, POLL_MIN_INTERVAL_SECONDS,
+    DeploymentPoller, TrackedDeployment, VercelAPIError, _write_status_changes
+)
+
+
+class FakeVercel:
+    """Replaces VercelService.get_deployment_status with scripted answers"""
+
+    def __init__(self, monkeypatch):
+        self.answers = []
+        self.calls = 0
+        fake = self
+
+        async def get_deployment_status(service, deployment_id):
+            fake.calls += 1
+            answer = fake.answers[0] if len(fake.answers) == 1 else fake.answers.pop(0)
+            if isinstance(answer, Exception):
+                raise answer
+            return {"id": deployment_id, "url": "app.vercel.app", "ready": answer == "READY", "status": answer}
+
+        monkeypatch.setattr(vercel_service.VercelService, "get_deployment_status", get_deployment_status)
+
+
+def vercel_project(db, current_deployment):
+    project_id = f"test-{uuid.uuid4().hex[:12]}"
+    db.add(Project(id=project_id, name=project_id))
+    db.add(ProjectServiceConnection(
+        id=str(uuid.uuid4()), project_id=project_id, provider="vercel",
+        service_data={"project_id": "prj", "current_deployment": current_deployment}
+    ))
+    db.commit()
+    return project_id
+
+
+def service_data(db, project_id):
+    db.expire_all()
+    return db.query(ProjectServiceConnection).filter(ProjectServiceConnection.project_id == project_id).one().service_data
+
+
+def test_interval_backs_off_while_unchanged_and_resets_on_change(monkeypatch):
+    vercel = FakeVercel(monkeypatch)
+    vercel.answers = ["BUILDING"]
+    deployment = TrackedDeployment("p", "dep", "token", status="BUILDING", url="app.vercel.app")
+    poller = DeploymentPoller()
+
+    intervals = []
+    for _ in range(12):
+        changed, done = asyncio.run(poller._check(deployment))
+        assert (changed, done) == (None, False)
+        intervals.append(deployment.interval)
+    assert intervals[:3] == [POLL_MIN_INTERVAL_SECONDS * 1.5, POLL_MIN_INTERVAL_SECONDS * 2.25, POLL_MIN_INTERVAL_SECONDS * 3.375]
+    assert intervals[-1] == POLL_MAX_INTERVAL_SECONDS
+
+    vercel.answers = ["READY"]
+    changed, done = asyncio.run(poller._check(deployment))
+    assert changed["status"] == "READY" and done
+    assert deployment.interval == POLL_MIN_INTERVAL_SECONDS
+
+
+def test_errors_back_off_exponentially(monkeypatch):
+    vercel = FakeVercel(monkeypatch)
+    vercel.answers = [VercelAPIError("rate limited", 429)]
+    deployment = TrackedDeployment("p", "dep", "token", status="BUILDING", url="app.vercel.app")
+    poller = DeploymentPoller()
+
+    intervals = []
+    for _ in range(8):
+        assert asyncio.run(poller._check(deployment)) == (None, False)
+        intervals.append(deployment.interval)
+    assert intervals[:3] == [4.0, 8.0, 16.0]
+    assert intervals[-1] == POLL_MAX_ERROR_INTERVAL_SECONDS
+
+    vercel.answers = ["BUILDING"]
+    asyncio.run(poller._check(deployment))
+    assert deployment.errors == 0
+
+
+def test_status_writes_skip_replaced_deployments(db):
+    replaced = vercel_project(db, {"deployment_id": "dep-new", "status": "BUILDING"})
+    finished = vercel_project(db, {"deployment_id": "dep-2", "status": "BUILDING"})
+
+    _write_status_changes([
+        (replaced, {"id": "dep-old", "status": "READY", "url": "old.vercel.app", "ready": True}),
+        (finished, {"id": "dep-2", "status": "READY", "url": "app.vercel.app", "ready": True}),
+    ])
+
+    assert service_data(db, replaced)["current_deployment"] == {"deployment_id": "dep-new", "status": "BUILDING"}
+    assert service_data(db, finished)["current_deployment"] is None
+    assert service_data(db, finished)["deployment_url"] == "https://app.vercel.app"
+
+
+def test_resume_after_restart_skips_expired_deployments(db, monkeypatch):
+    vercel = FakeVercel(monkeypatch)
+    vercel.answers = ["READY"]
+    save_service_token(db, "vercel", "token", "test")
+    for connection in db.query(ProjectServiceConnection).filter(ProjectServiceConnection.provider == "vercel"):
+        connection.service_data = {**(connection.service_data or {}), "current_deployment": None}
+    db.commit()
+
+    recent = vercel_project(db, {
+        "deployment_id": "dep-recent", "status": "BUILDING", "deployment_url": "app.vercel.app",
+        "started_at": (datetime.utcnow() - timedelta(minutes=1)).isoformat() + "Z"
+    })
+    expired = vercel_project(db, {
+        "deployment_id": "dep-stale", "status": "BUILDING",
+        "started_at": (datetime.utcnow() - timedelta(hours=2)).isoformat() + "Z"
+    })
+
+    async def restart():
+        poller = DeploymentPoller()
+        assert await poller.resume() == 1
+        assert list(poller.deployments) == [recent]
+        await asyncio.wait_for(poller._task, timeout=5)
+        return poller
+
+    poller = asyncio.run(restart())
+    assert poller.deployments == {}
+    assert vercel.calls == 1
+    assert service_data(db, recent)["current_deployment"] is None
+    assert service_data(db, recent)["deployment_url"] == "https://app.vercel.app"
+    assert service_data(db, expired)["current_deployment"]["deployment_id"] == "dep-stale"
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import uuid
+
+from app.models.env_vars import EnvVar
+from app.services import env_manager
+from app.services.env_manager import (
+    apply_env_file_changes, create_env_var, get_project_env_path, load_env_vars_from_db
+)
+from app.services import env_watcher as env_watcher_module
+from app.services.env_watcher import env_watcher
+
+
+def write_env(project, text):
+    get_project_env_path(project.id).write_text(text)
+
+
+def test_file_changes_are_applied_as_a_diff(db, project):
+    create_env_var(db, project.id, "KEEP", "1")
+    create_env_var(db, project.id, "CHANGE", "old")
+    create_env_var(db, project.id, "DROP", "x")
+
+    write_env(project, "KEEP=1\nCHANGE=new\nADD=y\n")
+
+    assert apply_env_file_changes(db, project.id) == {"added": ["ADD"], "updated": ["CHANGE"], "removed": ["DROP"]}
+    assert load_env_vars_from_db(db, project.id) == {"KEEP": "1", "CHANGE": "new", "ADD": "y"}
+    assert apply_env_file_changes(db, project.id) == {"added": [], "updated": [], "removed": []}
+
+
+def test_cache_picks_up_writes_from_other_workers(db, project):
+    create_env_var(db, project.id, "TOKEN", "a")
+    assert load_env_vars_from_db(db, project.id) == {"TOKEN": "a"}
+
+    # Another worker: straight to the database, bypassing this process's cache
+    row = db.query(EnvVar).filter(EnvVar.project_id == project.id, EnvVar.key == "TOKEN").one()
+    row.value_encrypted = env_manager.secret_box.encrypt("b")
+    db.commit()
+
+    assert load_env_vars_from_db(db, project.id) == {"TOKEN": "b"}
+
+
+def test_undecryptable_rows_are_updated_or_removed(db, project):
+    for key in ("BROKEN_KEPT", "BROKEN_DROPPED"):
+        db.add(EnvVar(id=str(uuid.uuid4()), project_id=project.id, key=key, value_encrypted="not-a-token"))
+    db.commit()
+
+    write_env(project, "BROKEN_KEPT=fixed\n")
+
+    assert apply_env_file_changes(db, project.id) == {
+        "added": [], "updated": ["BROKEN_KEPT"], "removed": ["BROKEN_DROPPED"]
+    }
+    assert load_env_vars_from_db(db, project.id) == {"BROKEN_KEPT": "fixed"}
+    assert db.query(EnvVar).filter(EnvVar.project_id == project.id).count() == 1
+
+
+def test_missing_file_changes_nothing(db, project):
+    create_env_var(db, project.id, "TOKEN", "a")
+    get_project_env_path(project.id).unlink()
+
+    assert apply_env_file_changes(db, project.id) == {"added": [], "updated": [], "removed": []}
+    assert load_env_vars_from_db(db, project.id) == {"TOKEN": "a"}
+
+
+def test_watcher_leaves_variables_alone_when_file_is_deleted(db, project):
+    create_env_var(db, project.id, "TOKEN", "a")
+    get_project_env_path(project.id).unlink()
+
+    asyncio.run(env_watcher._sync(project.id))
+
+    db.expire_all()
+    assert load_env_vars_from_db(db, project.id) == {"TOKEN": "a"}
+
+
+def test_watcher_applies_changes_off_the_loop_and_broadcasts_keys(db, project, monkeypatch):
+    create_env_var(db, project.id, "TOKEN", "a")
+    write_env(project, "TOKEN=b\nNEW=c\n")
+    threads, sent = [], []
+
+    def apply(db, project_id):
+        threads.append(threading.get_ident())
+        return apply_env_file_changes(db, project_id)
+
+    async def send_message(project_id, message):
+        threads.append(threading.get_ident())
+        sent.append((project_id, message))
+
+    monkeypatch.setattr(env_watcher_module, "apply_env_file_changes", apply)
+    monkeypatch.setattr(env_watcher_module.manager, "send_message", send_message)
+
+    asyncio.run(env_watcher._sync(project.id))
+
+    assert threads[0] != threading.get_ident()
+    assert threads[1] == threading.get_ident()
+    assert sent == [(project.id, {
+        "type": "env_updated",
+        "data": {"source": "file", "added": ["NEW"], "updated": ["TOKEN"], "removed": []}
+    })]
@@ -0,0 +1,178 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import github_service
+from app.services.github_api_cache import GitHubRequestScheduler, RateLimitState
+
+API = "https://api.github.test"
+HEADERS = {"Authorization": "token abc"}
+
+
+class FakeGitHub:
+    """httpx.MockTransport handler with per-path scripted responses and a request log"""
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+
+        self.release = None
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.release is not None:
+            await self.release.wait()
+        route = self.routes[(request.method, request.url.path)]
+        return route(request) if callable(route) else route
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self))
+
+    def calls(self, method, path):
+        return [r for r in self.requests if (r.method, r.url.path) == (method, path)]
+
+
+def run_with_client(github, body):
+    async def run():
+        async with github.client() as client:
+            return await body(client)
+    return asyncio.run(run())
+
+
+def test_etag_revalidation_replays_the_cached_body():
+    github = FakeGitHub()
+    scheduler = GitHubRequestScheduler()
+    github.routes[("GET", "/user")] = lambda request: (
+        httpx.Response(304) if request.headers.get("if-none-match") == '"v1"'
+        else httpx.Response(200, json={"login": "octo"}, headers={"etag": '"v1"'})
+    )
+
+    async def body(client):
+        first = await scheduler.request(client, "GET", f"{API}/user", HEADERS)
+        second = await scheduler.request(client, "GET", f"{API}/user", HEADERS)
+        return first, second
+
+    first, second = run_with_client(github, body)
+    assert (first.from_cache, second.from_cache) == (False, True)
+    assert second.status_code == 200
+    assert second.json() == {"login": "octo"}
+    assert github.requests[1].headers["if-none-match"] == '"v1"'
+
+
+def test_not_found_is_cached_briefly(monkeypatch):
+    github = FakeGitHub()
+    scheduler = GitHubRequestScheduler()
+    github.routes[("GET", "/repos/octo/app")] = httpx.Response(404, json={"message": "Not Found"})
+
+    async def body(client):
+        results = [await scheduler.request(client, "GET", f"{API}/repos/octo/app", HEADERS) for _ in range(2)]
+        monkeypatch.setattr(settings, "github_negative_cache_seconds", 0)
+        results.append(await scheduler.request(client, "GET", f"{API}/repos/octo/app", HEADERS))
+        return results
+
+    results = run_with_client(github, body)
+    assert [r.status_code for r in results] == [404, 404, 404]
+    assert [r.from_cache for r in results] == [False, True, False]
+    assert len(github.requests) == 2
+
+
+def test_identical_gets_in_flight_are_coalesced():
+    github = FakeGitHub()
+    scheduler = GitHubRequestScheduler()
+    github.routes[("GET", "/user/repos")] = httpx.Response(200, json=[], headers={"etag": '"r"'})
+
+    async def body(client):
+        github.release = asyncio.Event()
+        pending = asyncio.gather(*(
+            scheduler.request(client, "GET", f"{API}/user/repos", HEADERS) for _ in range(5)
+        ))
+        await asyncio.sleep(0.01)
+        github.release.set()
+        return await pending
+
+    results = run_with_client(github, body)
+    assert all(r.status_code == 200 for r in results)
+    assert len(github.requests) == 1
+
+
+def test_errors_reach_every_coalesced_caller():
+    github = FakeGitHub()
+    scheduler = GitHubRequestScheduler()
+
+    def fail(request):
+        raise httpx.ConnectError("down", request=request)
+
+    github.routes[("GET", "/user")] = fail
+
+    async def body(client):
+        github.release = asyncio.Event()
+        pending = asyncio.gather(
+            *(scheduler.request(client, "GET", f"{API}/user", HEADERS) for _ in range(3)),
+            return_exceptions=True
+        )
+        await asyncio.sleep(0.01)
+        github.release.set()
+        return await pending
+
+    results = run_with_client(github, body)
+    assert all(isinstance(r, httpx.ConnectError) for r in results)
+    assert len(github.requests) == 1
+    assert scheduler._in_flight == {}
+
+
+def test_repository_creation_invalidates_the_cached_404(monkeypatch):
+    github = FakeGitHub()
+    scheduler = GitHubRequestScheduler()
+    monkeypatch.setattr(github_service, "github_requests", scheduler)
+    monkeypatch.setattr(github_service.GitHubService, "BASE_URL", API)
+
+    @asynccontextmanager
+    async def client():
+        async with github.client() as c:
+            yield c
+
+    monkeypatch.setattr(github_service, "github_client", client)
+    github.routes[("GET", "/user")] = httpx.Response(200, json={"login": "octo"}, headers={"etag": '"u"'})
+    github.routes[("GET", "/repos/octo/app")] = httpx.Response(404, json={"message": "Not Found"})
+    github.routes[("POST", "/user/repos")] = httpx.Response(201, json={
+        "html_url": "https://github.com/octo/app", "clone_url": "c", "ssh_url": "s", "git_url": "g",
+        "name": "app", "full_name": "octo/app", "id": 1, "private": True, "default_branch": "main",
+    })
+
+    async def body():
+        service = github_service.GitHubService("abc")
+        await service.create_repository("app", private=True)
+        github.routes[("GET", "/repos/octo/app")] = httpx.Response(200, json={"name": "app"})
+        return await service.check_repository_exists("app", "octo")
+
+    assert asyncio.run(body()) is True
+    assert len(github.calls("GET", "/repos/octo/app")) == 2
+
+
+def rate_limit(remaining, limit=5000, reset_in=100.0):
+    state = RateLimitState()
+    state.update(httpx.Response(200, headers={
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-reset": str(time.time() + reset_in),
+    }))
+    return state
+
+
+def test_rate_limit_pacing(monkeypatch):
+    monkeypatch.setattr(settings, "github_rate_limit_reserve", 0.1)
+
+    assert rate_limit(4000).delay() == 0.0
+    # Inside the 10% reserve: 100 s left for 50 requests, one every 2 s
+    paced = rate_limit(50)
+    paced.next_allowed_at = time.time()
+    assert paced.delay() == pytest.approx(2.0, abs=0.1)
+    assert rate_limit(0).delay() == pytest.approx(100.0, abs=1.0)
+
+    blocked = RateLimitState()
+    blocked.update(httpx.Response(429, headers={"retry-after": "7"}))
+    assert blocked.delay() == pytest.approx(7.0, abs=0.5)
@@ -0,0 +1,65 @@
+import asyncio
+
+from app.services import github_push_queue as push_queue
+from app.services.github_push_queue import GitHubPushQueue
+
+
+def test_push_result_survives_broadcast_failure(monkeypatch):
+    async def broken_broadcast(*args, **kwargs):
+        raise RuntimeError("websocket gone")
+
+    monkeypatch.setattr(push_queue.manager, "broadcast_to_project", broken_broadcast)
+    monkeypatch.setattr(push_queue, "_record_push_state", lambda project_id, state: None)
+    monkeypatch.setattr(push_queue, "_blocking_push", lambda repo_path, branch: {"success": True, "branch": branch})
+
+    async def run():
+        queue = GitHubPushQueue()
+        return await asyncio.wait_for(queue.enqueue("p", "/tmp/repo", "main"), timeout=5)
+
+    assert asyncio.run(run()) == {"success": True, "branch": "main"}
+
+
+def test_burst_is_coalesced_and_every_caller_answered(monkeypatch):
+    pushes = []
+
+    def slow_push(repo_path, branch):
+        import time
+        time.sleep(0.05)
+        pushes.append(branch)
+        return {"success": True, "branch": branch}
+
+    async def quiet_broadcast(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(push_queue.manager, "broadcast_to_project", quiet_broadcast)
+    monkeypatch.setattr(push_queue, "_record_push_state", lambda project_id, state: None)
+    monkeypatch.setattr(push_queue, "_blocking_push", slow_push)
+
+    async def run():
+        queue = GitHubPushQueue()
+        futures = [queue.enqueue("p", "/tmp/repo", "main") for _ in range(5)]
+        await asyncio.sleep(0)
+        futures += [queue.enqueue("p", "/tmp/repo", "main") for _ in range(5)]
+        return await asyncio.wait_for(asyncio.gather(*futures), timeout=5)
+
+    results = asyncio.run(run())
+    assert all(r["success"] for r in results)
+    assert len(pushes) == 2
+
+
+def test_unexpected_worker_error_fails_the_caller(monkeypatch):
+    async def run():
+        queue = GitHubPushQueue()
+        future = queue.enqueue("p", "/tmp/repo", "main")
+        worker = queue.workers["p"]
+
+        async def broken(*args):
+            raise RuntimeError("bug")
+
+        worker._push_once = broken
+        try:
+            await asyncio.wait_for(future, timeout=5)
+        except RuntimeError as e:
+            return str(e)
+
+    assert asyncio.run(run()) == "bug"
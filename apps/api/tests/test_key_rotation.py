@@ -0,0 +1,59 @@
+import asyncio
+
+from cryptography.fernet import Fernet
+
+from app.core.crypto import SecretBox, key_id
+from app.models.env_vars import EnvVar
+from app.models.key_rotations import KeyRotation
+from app.services import key_rotation
+from app.services.key_rotation import KeyRotationRunner, rotate_batch, start_rotation
+
+
+def test_key_file_is_created_on_first_use(tmp_path, monkeypatch):
+    key_file = tmp_path / "encryption.key"
+    monkeypatch.delenv("ENCRYPTION_KEY", raising=False)
+    monkeypatch.setenv("ENCRYPTION_KEY_FILE", str(key_file))
+
+    box = SecretBox()
+    assert not key_file.exists()
+
+    assert box.decrypt(box.encrypt("secret")) == "secret"
+    assert key_file.exists()
+    assert SecretBox().primary_key_id == box.primary_key_id
+
+
+def test_rotation_resumes_from_its_checkpoint(db, project, monkeypatch):
+    old_key, new_key = Fernet.generate_key().decode(), Fernet.generate_key().decode()
+    old_box = SecretBox(old_key)
+    for i in range(5):
+        db.add(EnvVar(
+            id=f"{project.id}-{i}", project_id=project.id, key=f"KEY_{i}",
+            value_encrypted=old_box.encrypt(f"value-{i}"), key_version=key_id(old_key)
+        ))
+    db.commit()
+
+    monkeypatch.setattr(key_rotation, "secret_box", SecretBox(keys=[new_key, old_key]))
+    monkeypatch.setattr(key_rotation, "BATCH_SIZE", 2)
+    monkeypatch.setattr(key_rotation, "BATCH_PAUSE_SECONDS", 0)
+    job_id = start_rotation(db).id
+
+    # One batch, then the process "restarts"
+    assert rotate_batch(job_id) is False
+    db.expire_all()
+    checkpoint = db.get(KeyRotation, job_id).last_id
+    assert checkpoint is not None
+
+    async def resume():
+        runner = KeyRotationRunner()
+        assert await runner.resume() == job_id
+        await runner._task
+
+    asyncio.run(resume())
+
+    db.expire_all()
+    job = db.get(KeyRotation, job_id)
+    assert job.status == "completed"
+    new_box = SecretBox(new_key)
+    rows = db.query(EnvVar).filter(EnvVar.project_id == project.id).order_by(EnvVar.id).all()
+    assert [new_box.decrypt(row.value_encrypted) for row in rows] == [f"value-{i}" for i in range(5)]
+    assert {row.key_version for row in rows} == {key_id(new_key)}
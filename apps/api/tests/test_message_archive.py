@@ -0,0 +1,132 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.api.chat.messages import archive_messages, get_message_payload, get_messages
+from app.models.messages import Message
+from app.services.message_payloads import attach_payload
+from app.models.project_summaries import ProjectSummary
+from app.services import message_archive
+from app.services.message_archive import archive_project_messages, find_archived_message
+
+
+@pytest.fixture(autouse=True)
+def small_frames(monkeypatch):
+    monkeypatch.setattr(message_archive, "FRAME_MESSAGES", 4)
+    monkeypatch.setattr(message_archive, "SEGMENT_MESSAGES", 10)
+
+
+def add_messages(db, project, count, start, conversation_id=None):
+    conversation_id = conversation_id or str(uuid.uuid4())
+    ids = []
+    for i in range(count):
+        message = Message(
+            id=f"{start:%Y%m%d}-{i:04d}-{uuid.uuid4().hex[:6]}", project_id=project.id, role="user",
+            message_type="chat", content=f"message {i}", conversation_id=conversation_id,
+            created_at=start + timedelta(minutes=i)
+        )
+        db.add(message)
+        ids.append(message.id)
+    db.commit()
+    return ids
+
+
+def page(db, project, **kwargs):
+    response = Response()
+    kwargs.setdefault("limit", 5)
+    messages = asyncio.run(get_messages(
+        project.id, response, conversation_id=None, cli_filter=None,
+        before_id=kwargs.pop("before_id", None), after_id=kwargs.pop("after_id", None), db=db, **kwargs
+    ))
+    return [m.id for m in messages], response.headers["X-Has-More"] == "true"
+
+
+def test_archive_round_trip_and_pagination(db, project):
+    old_ids = add_messages(db, project, 23, datetime.utcnow() - timedelta(days=60))
+    new_ids = add_messages(db, project, 7, datetime.utcnow() - timedelta(hours=1))
+
+    assert archive_project_messages(db, project.id, older_than_days=30) == 23
+    assert db.query(Message).filter(Message.project_id == project.id).count() == 7
+
+    # Walk back from the newest page through database and archive, then forward again
+    seen = []
+    ids, has_more = page(db, project)
+    seen = ids + seen
+    while has_more:
+        ids, has_more = page(db, project, before_id=seen[0])
+        seen = ids + seen
+    assert seen == old_ids + new_ids
+
+    forward = []
+    ids, has_more = page(db, project, after_id=seen[0])
+    forward += ids
+    while has_more:
+        ids, has_more = page(db, project, after_id=forward[-1])
+        forward += ids
+    assert forward == seen[1:]
+
+
+def test_archived_message_lookup(db, project):
+    old_ids = add_messages(db, project, 12, datetime.utcnow() - timedelta(days=60))
+    archive_project_messages(db, project.id, older_than_days=30)
+    message_archive._frame_cache.clear()
+
+    record = find_archived_message(project.id, old_ids[9])
+
+    assert record["content"] == "message 9"
+    assert len(message_archive._frame_cache) == 1
+    assert find_archived_message(project.id, "no-such-id") is None
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(get_message_payload(project.id, old_ids[0], db))
+    assert error.value.detail == "Message has no stored payload"
+
+
+def test_full_database_page_does_not_read_the_archive(db, project, monkeypatch):
+    add_messages(db, project, 8, datetime.utcnow() - timedelta(days=60))
+    archive_project_messages(db, project.id, older_than_days=30)
+    new_ids = add_messages(db, project, 10, datetime.utcnow() - timedelta(hours=1))
+
+    def no_reads(*args):
+        raise AssertionError("archive frame read for a page the database filled")
+
+    monkeypatch.setattr(message_archive, "_read_frame", no_reads)
+    ids, has_more = page(db, project)
+
+    assert ids == new_ids[-5:] and has_more
+
+
+def test_summary_tracks_archived_messages(db, project):
+    add_messages(db, project, 6, datetime.utcnow() - timedelta(days=60))
+    recent = datetime.utcnow() - timedelta(hours=1)
+    add_messages(db, project, 2, recent)
+
+    archive_project_messages(db, project.id, older_than_days=30)
+    db.expire_all()
+
+    summary = db.get(ProjectSummary, project.id)
+    assert summary.message_count == 2
+    assert summary.last_message_at == recent + timedelta(minutes=1)
+
+
+def test_archive_endpoint_keeps_payloads(db, project):
+    start = datetime.utcnow() - timedelta(days=60)
+    tool_input = {"file_path": "src/a.ts", "content": "x" * 5000}
+    for i in range(3):
+        message = Message(
+            id=f"payload-{i}-{uuid.uuid4().hex[:6]}", project_id=project.id, role="assistant",
+            message_type="tool_use", content="Write", created_at=start + timedelta(minutes=i),
+            metadata_json={"tool_name": "Write", "tool_input": tool_input}
+        )
+        attach_payload(message)
+        db.add(message)
+    db.commit()
+    ids = [m.id for m in db.query(Message).filter(Message.project_id == project.id)]
+
+    assert asyncio.run(archive_messages(project.id, older_than_days=30, db=db)) == {"archived": 3}
+
+    for message_id in ids:
+        response = asyncio.run(get_message_payload(project.id, message_id, db))
+        assert response["payload"] == {"tool_input": tool_input}
@@ -0,0 +1,52 @@
+import asyncio
+import uuid
+
+from app.api.chat.messages import get_message_payload
+from app.models.message_payloads import MessagePayload
+from app.models.messages import Message
+from app.services.message_payloads import attach_payload, split_metadata
+
+
+def big_edit():
+    return {"file_path": "src/app/page.tsx", "old_string": "a" * 3000, "new_string": "b" * 3000}
+
+
+def test_raw_event_keys_are_moved_out():
+    metadata = {"tool_name": "Read", "original_event": {"type": "assistant"}, "raw_output": "x"}
+
+    compact, payload = split_metadata(metadata)
+
+    assert payload == {"original_event": {"type": "assistant"}, "raw_output": "x"}
+    assert compact == {"tool_name": "Read", "payload_keys": ["original_event", "raw_output"]}
+
+
+def test_large_tool_input_keeps_short_fields_inline():
+    compact, payload = split_metadata({"tool_name": "Edit", "tool_input": big_edit()})
+
+    assert payload == {"tool_input": big_edit()}
+    assert compact["tool_input"] == {"file_path": "src/app/page.tsx"}
+    assert compact["payload_keys"] == ["tool_input"]
+
+
+def test_small_metadata_is_left_alone():
+    metadata = {"tool_name": "Bash", "tool_input": {"command": "npm run build"}}
+
+    assert split_metadata(metadata) == (metadata, None)
+    assert split_metadata(None) == (None, None)
+
+
+def test_payload_endpoint_returns_the_original(db, project):
+    original = {"tool_name": "Edit", "tool_input": big_edit(), "original_event": {"id": "evt"}}
+    message = Message(
+        id=str(uuid.uuid4()), project_id=project.id, role="assistant", message_type="tool_use",
+        content="Editing page.tsx", metadata_json=dict(original)
+    )
+    attach_payload(message)
+    db.add(message)
+    db.commit()
+
+    stored = db.get(MessagePayload, message.id)
+    assert stored.encoding == "zlib+json"
+    assert len(stored.data) < stored.raw_size
+    response = asyncio.run(get_message_payload(project.id, message.id, db))
+    assert response["payload"] == {"tool_input": big_edit(), "original_event": {"id": "evt"}}
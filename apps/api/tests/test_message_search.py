@@ -0,0 +1,42 @@
+import uuid
+
+from app.models.messages import Message
+from app.services.message_search import _search_messages_like, fts_available, search_messages
+
+PAYLOAD = 'please fix the <img src=x onerror="alert(1)"> login button'
+
+
+def add_message(db, project, content):
+    db.add(Message(id=str(uuid.uuid4()), project_id=project.id, role="user", message_type="chat", content=content))
+    db.commit()
+
+
+def test_fts_snippets_are_escaped(db, project):
+    add_message(db, project, PAYLOAD)
+    assert fts_available(db)
+
+    [result] = search_messages(db, project.id, "login")
+
+    assert "<img" not in result["snippet"]
+    assert "&lt;img src=x onerror=&quot;alert(1)&quot;&gt;" in result["snippet"]
+    assert "<mark>login</mark>" in result["snippet"]
+
+
+def test_like_snippets_are_escaped(db, project):
+    add_message(db, project, PAYLOAD)
+
+    [result] = _search_messages_like(db, project.id, "login", limit=10, offset=0, conversation_id=None)
+
+    assert "<img" not in result["snippet"]
+    assert "&lt;img" in result["snippet"]
+    assert "<mark>login</mark>" in result["snippet"]
+
+
+def test_hidden_messages_are_not_found(db, project):
+    db.add(Message(
+        id=str(uuid.uuid4()), project_id=project.id, role="assistant", message_type="chat",
+        content="secret needle", metadata_json={"hidden_from_ui": True}
+    ))
+    db.commit()
+
+    assert search_messages(db, project.id, "needle") == []
@@ -0,0 +1,39 @@
+import uuid
+
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import flag_modified
+
+from app.models.messages import Message
+
+
+def add_message(db, project, metadata=None):
+    message = Message(
+        id=str(uuid.uuid4()), project_id=project.id, role="assistant", message_type="chat",
+        content="hello", metadata_json=metadata
+    )
+    db.add(message)
+    db.commit()
+    return message
+
+
+def test_hidden_follows_metadata_on_insert(db, project):
+    assert add_message(db, project, {"hidden_from_ui": True}).hidden is True
+    assert add_message(db, project, {"type": "chat"}).hidden is False
+    assert add_message(db, project).hidden is False
+
+
+def test_hidden_follows_in_place_metadata_edits(db, project):
+    message = add_message(db, project, {"type": "chat"})
+
+    message.metadata_json["hidden_from_ui"] = True
+    flag_modified(message, "metadata_json")
+    db.commit()
+    db.expire_all()
+
+    assert db.get(Message, message.id).hidden is True
+
+
+def test_no_single_column_hidden_index(engine):
+    names = {index["name"] for index in inspect(engine).get_indexes("messages")}
+    assert "ix_messages_hidden" not in names
+    assert "ix_messages_project_hidden_created" in names
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import uuid
+from datetime import datetime
+
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.migrations import LATEST_VERSION, run_migrations, schema_version
+from app.models.messages import Message
+from app.models.project_summaries import ProjectSummary
+
+
+def test_up_to_date_database_applies_nothing(engine):
+    assert run_migrations(engine) == 0
+
+
+def test_replaying_every_step_is_harmless(engine, db, project):
+    db.add(Message(
+        id=str(uuid.uuid4()), project_id=project.id, role="user", message_type="chat",
+        content="hi", created_at=datetime.utcnow()
+    ))
+    db.commit()
+    with engine.begin() as conn:
+        conn.execute(schema_version.update().values(version=0, fingerprint=None))
+
+    assert run_migrations(engine) == LATEST_VERSION
+    assert run_migrations(engine) == 0
+
+    db.expire_all()
+    assert db.get(ProjectSummary, project.id).message_count == 1
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT version FROM schema_version")).scalar() == LATEST_VERSION
+
+
+def test_fresh_database():
+    path = os.path.join(tempfile.mkdtemp(prefix="claudable-migrate-"), "fresh.db")
+    fresh = create_engine(f"sqlite:///{path}")
+    try:
+        assert run_migrations(fresh) == LATEST_VERSION
+        assert run_migrations(fresh) == 0
+        columns = {col["name"] for col in inspect(fresh).get_columns("messages")}
+        assert "hidden" in columns
+        indexes = {index["name"] for index in inspect(fresh).get_indexes("messages")}
+        assert "ix_messages_hidden" not in indexes
+    finally:
+        fresh.dispose()
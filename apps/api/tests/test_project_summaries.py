@@ -0,0 +1,53 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi import Response
+
+from app.api.chat.messages import clear_messages
+from app.api.projects.crud import delete_project, list_projects
+from app.models.messages import Message
+from app.models.project_summaries import ProjectSummary
+
+
+def etag(db):
+    response = Response()
+    asyncio.run(list_projects(SimpleNamespace(headers={}), response, db))
+    return response.headers["ETag"]
+
+
+def add_messages(db, project, count):
+    for i in range(count):
+        db.add(Message(
+            id=str(uuid.uuid4()), project_id=project.id, role="user", message_type="chat",
+            content="hi", created_at=datetime.utcnow() - timedelta(minutes=count - i)
+        ))
+    db.commit()
+
+
+def summary(db, project):
+    db.expire_all()
+    return db.get(ProjectSummary, project.id)
+
+
+def test_summary_follows_inserts_and_clears(db, project):
+    add_messages(db, project, 3)
+    assert summary(db, project).message_count == 3
+    before = etag(db)
+
+    asyncio.run(clear_messages(project.id, None, db))
+
+    assert summary(db, project).message_count == 0
+    assert summary(db, project).last_message_at is None
+    assert etag(db) != before
+
+
+def test_delete_project_drops_summary_and_changes_etag(db, project):
+    add_messages(db, project, 2)
+    before = etag(db)
+
+    asyncio.run(delete_project(project.id, db))
+
+    assert summary(db, project) is None
+    assert etag(db) != before
@@ -0,0 +1,68 @@
+from app.services.repo_files import parse_range_header, read_line_window
+
+import pytest
+
+
+def write(tmp_path, data: bytes):
+    path = tmp_path / "file.txt"
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_window_returns_requested_lines(tmp_path):
+    path = write(tmp_path, b"".join(f"line {i}\n".encode() for i in range(1, 101)))
+
+    window = read_line_window(path, start_line=10, max_lines=3, max_bytes=1024)
+
+    assert window["content"] == "line 10\nline 11\nline 12\n"
+    assert (window["start_line"], window["end_line"]) == (10, 12)
+    assert window["has_more"] and not window["truncated"]
+
+
+def test_window_stops_at_byte_budget(tmp_path):
+    path = write(tmp_path, b"aaaa\n" * 10)
+
+    window = read_line_window(path, start_line=1, max_lines=100, max_bytes=12)
+
+    assert window["content"] == "aaaa\naaaa\n"
+    assert window["has_more"] and not window["truncated"]
+
+
+def test_single_long_line_is_capped(tmp_path):
+    path = write(tmp_path, b"x" * 100_000 + b"\nnext\n")
+
+    window = read_line_window(path, start_line=1, max_lines=10, max_bytes=1000)
+
+    assert len(window["content"]) == 1000
+    assert window["truncated"] and window["has_more"]
+    assert window["end_line"] == 1
+
+
+def test_window_after_long_line(tmp_path):
+    path = write(tmp_path, b"x" * 100_000 + b"\nnext\n")
+
+    window = read_line_window(path, start_line=2, max_lines=10, max_bytes=1000)
+
+    assert window["content"] == "next\n"
+    assert not window["has_more"] and not window["truncated"]
+
+
+def test_last_line_without_newline(tmp_path):
+    path = write(tmp_path, b"one\ntwo")
+
+    window = read_line_window(path, start_line=1, max_lines=10, max_bytes=3)
+
+    # Cut right before the newline: the line is complete, the next one does not fit
+    assert window["content"] == "one"
+    assert window["has_more"] and not window["truncated"]
+    assert read_line_window(path, 2, 10, 1024)["content"] == "two"
+    assert read_line_window(path, 3, 10, 1024)["end_line"] == 2
+
+
+def test_range_header():
+    assert parse_range_header(None, 100) is None
+    assert parse_range_header("bytes=0-9", 100) == (0, 9)
+    assert parse_range_header("bytes=-10", 100) == (90, 99)
+    assert parse_range_header("bytes=90-", 100) == (90, 99)
+    with pytest.raises(ValueError):
+        parse_range_header("bytes=200-300", 100)
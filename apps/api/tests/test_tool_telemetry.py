@@ -0,0 +1,86 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.messages import Message
+from app.models.sessions import Session as ChatSession
+from app.models.tools import ToolUsage
+from app.services.tool_telemetry import ToolResult, ToolTelemetryRecorder, get_tool_stats
+
+
+@pytest.fixture
+def session_id(db, project):
+    session = ChatSession(id=str(uuid.uuid4()), project_id=project.id, cli_type="claude")
+    db.add(session)
+    db.commit()
+    return session.id
+
+
+def tool_use(db, project, tool_id, tool_name, tool_input, at):
+    message = Message(
+        id=str(uuid.uuid4()), project_id=project.id, role="assistant", message_type="tool_use",
+        content=tool_name, created_at=at,
+        metadata_json={"tool_name": tool_name, "tool_id": tool_id, "tool_input": tool_input}
+    )
+    db.add(message)
+    db.commit()
+    return message
+
+
+def rows(db, project):
+    return {row.tool_name: row for row in db.query(ToolUsage).filter(ToolUsage.project_id == project.id)}
+
+
+def test_calls_are_paired_by_tool_id(db, project, session_id):
+    recorder = ToolTelemetryRecorder(project.id, session_id)
+    start = datetime.utcnow()
+    edits = [{"old_string": "a" * 1000, "new_string": "b\nc"}]
+    recorder.observe(tool_use(db, project, "t1", "MultiEdit", {"file_path": "src/a.ts", "edits": edits}, start))
+    recorder.observe(tool_use(db, project, "t2", "Bash", {"command": "npm test"}, start))
+    recorder.observe_result(ToolResult("t2", True, "exit 1", start + timedelta(milliseconds=300)))
+    recorder.observe_result(ToolResult("t1", False, "ok", start + timedelta(milliseconds=40)))
+    recorder.observe_result(ToolResult("unknown", False, "ignored"))
+
+    assert recorder.flush(db) == 2
+    written = rows(db, project)
+    assert written["MultiEdit"].duration_ms == 40
+    assert written["MultiEdit"].tool_action == "complete"
+    # Bulky inputs stay in the message and its payload
+    assert written["MultiEdit"].input_data == {"file_path": "src/a.ts"}
+    assert (written["MultiEdit"].lines_added, written["MultiEdit"].lines_removed) == (2, 1)
+    assert written["Bash"].is_error is True
+    assert written["Bash"].error_message == "exit 1"
+    assert written["Bash"].input_data == {"command": "npm test"}
+
+
+def test_unanswered_calls_are_written_as_incomplete(db, project, session_id):
+    recorder = ToolTelemetryRecorder(project.id, session_id)
+    recorder.observe(tool_use(db, project, "t1", "Read", {"file_path": "a.ts"}, datetime.utcnow()))
+
+    assert recorder.flush(db) == 0
+    assert recorder.flush(db, final=True) == 1
+    row = rows(db, project)["Read"]
+    assert row.tool_action == "incomplete"
+    assert row.duration_ms is None
+
+
+def test_stats_buckets_and_percentiles(db, project, session_id):
+    recorder = ToolTelemetryRecorder(project.id, session_id)
+    start = datetime.utcnow()
+    durations = [50] * 10 + [300] * 9 + [70000]
+    for i, duration in enumerate(durations):
+        recorder.observe(tool_use(db, project, f"g{i}", "Grep", {"pattern": "x"}, start))
+        recorder.observe_result(ToolResult(f"g{i}", i == 0, "", start + timedelta(milliseconds=duration)))
+    recorder.observe(tool_use(db, project, "open", "Grep", {"pattern": "x"}, start))
+    recorder.flush(db, final=True)
+
+    [stats] = get_tool_stats(db, project.id)
+    assert stats["calls"] == 21
+    assert stats["errors"] == 1
+    assert stats["incomplete"] == 1
+    assert stats["p50_ms"] == 100
+    assert stats["p95_ms"] == 500
+    assert stats["max_duration_ms"] == 70000
+    histogram = {bucket["le_ms"]: bucket["count"] for bucket in stats["histogram"]}
+    assert (histogram[100], histogram[500], histogram[None]) == (10, 9, 1)
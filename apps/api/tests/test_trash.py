@@ -0,0 +1,47 @@
+import asyncio
+import os
+
+from app.api.projects.crud import delete_project
+from app.services.project.trash import ProjectReaper, get_trash_dir, move_to_trash, project_reaper
+
+
+def test_move_to_trash_renames_the_project_directory(project):
+    project_root = os.path.dirname(project.repo_path)
+    open(os.path.join(project.repo_path, "index.ts"), "w").close()
+
+    trash_path = move_to_trash(project.id)
+
+    assert not os.path.exists(project_root)
+    assert os.path.dirname(trash_path) == get_trash_dir()
+    assert os.path.exists(os.path.join(trash_path, "repo", "index.ts"))
+    assert move_to_trash(project.id) is None
+
+
+def test_reaper_removes_leftovers_on_resume():
+    os.makedirs(get_trash_dir(), exist_ok=True)
+    leftover = os.path.join(get_trash_dir(), "left-over.1234abcd")
+    os.makedirs(os.path.join(leftover, "node_modules", "pkg"))
+
+    async def run():
+        reaper = ProjectReaper()
+        assert await reaper.resume() >= 1
+        await reaper._task
+
+    asyncio.run(run())
+    assert not os.path.exists(leftover)
+
+
+def test_delete_project_returns_before_files_are_removed(db, project):
+    project_root = os.path.dirname(project.repo_path)
+
+    async def run():
+        await delete_project(project.id, db)
+        # The request only renamed the directory; the reaper removes it afterwards
+        assert not os.path.exists(project_root)
+        trashed = [name for name in os.listdir(get_trash_dir()) if name.startswith(project.id)]
+        assert trashed
+        await project_reaper._task
+        return trashed
+
+    trashed = asyncio.run(run())
+    assert not any(os.path.exists(os.path.join(get_trash_dir(), name)) for name in trashed)
@@ -0,0 +1,117 @@
+import asyncio
+
+from app.services import type_check_daemon
+from app.services.type_check_daemon import TypeCheckDaemon
+
+
+async def ask(daemon: TypeCheckDaemon, payload: bytes = b"{}") -> bytes:
+    server = await asyncio.start_server(daemon._handle_client, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"{len(payload)}\n".encode() + payload)
+        await writer.drain()
+        reply = await reader.read()
+        writer.close()
+        return reply
+    finally:
+        server.close()
+
+
+def test_check_without_tsc_has_no_verdict(tmp_path):
+    daemon = TypeCheckDaemon("test", str(tmp_path))
+
+    assert asyncio.run(daemon.check()) == (None, "")
+
+
+def test_unavailable_when_tsc_is_not_running(tmp_path):
+    daemon = TypeCheckDaemon("test", str(tmp_path))
+
+    assert asyncio.run(ask(daemon)) == b"UNAVAILABLE\n"
+
+
+def test_unavailable_when_the_check_raises(tmp_path):
+    daemon = TypeCheckDaemon("test", str(tmp_path))
+
+    async def broken(edited_file=None):
+        raise RuntimeError("boom")
+
+    daemon.check = broken
+    assert asyncio.run(ask(daemon)) == b"UNAVAILABLE\n"
+
+
+def test_reports_failures_and_passes(tmp_path):
+    daemon = TypeCheckDaemon("test", str(tmp_path))
+
+    async def failing(edited_file=None):
+        return False, "src/a.ts(1,1): error TS2322: nope"
+
+    daemon.check = failing
+    assert asyncio.run(ask(daemon)) == b"FAIL\nsrc/a.ts(1,1): error TS2322: nope\n"
+
+    async def passing(edited_file=None):
+        return True, ""
+
+    daemon.check = passing
+    assert asyncio.run(ask(daemon)) == b"OK\n"
+
+
+class FakeTsc:
+    """Stands in for the tsc process; the test feeds its output lines"""
+
+    returncode = None
+
+    def __init__(self):
+        self.lines: asyncio.Queue = asyncio.Queue()
+        self.stdout = self._read()
+
+    async def _read(self):
+        while True:
+            line = await self.lines.get()
+            if line is None:
+                return
+            yield line.encode() + b"\n"
+
+
+async def started_daemon(repo_path):
+    daemon = TypeCheckDaemon("test", str(repo_path))
+    daemon.process = FakeTsc()
+    daemon._reader_task = asyncio.create_task(daemon._read_output())
+    daemon.process.lines.put_nowait("Starting compilation in watch mode...")
+    daemon.process.lines.put_nowait("Found 0 errors. Watching for file changes.")
+    while daemon.cycle == 0:
+        await asyncio.sleep(0.01)
+    return daemon
+
+
+def test_results_from_before_the_edit_are_not_reported(tmp_path, monkeypatch):
+    monkeypatch.setattr(type_check_daemon, "CHANGE_DETECT_GRACE_SECONDS", 0.2)
+
+    async def run():
+        daemon = await started_daemon(tmp_path)
+        await asyncio.sleep(0.02)
+        (tmp_path / "a.ts").write_text("const a: number = 'x'")
+        # tsc never starts a new cycle for the write
+        result = await daemon.check(str(tmp_path / "a.ts"))
+        daemon._reader_task.cancel()
+        return result
+
+    assert asyncio.run(run()) == (None, "")
+
+
+def test_waits_for_the_cycle_that_covers_the_edit(tmp_path):
+    async def run():
+        daemon = await started_daemon(tmp_path)
+        await asyncio.sleep(0.02)
+        (tmp_path / "a.ts").write_text("const a: number = 'x'")
+        check = asyncio.create_task(daemon.check(str(tmp_path / "a.ts")))
+        await asyncio.sleep(0.1)
+        assert not check.done()
+        daemon.process.lines.put_nowait("File change detected. Starting incremental compilation...")
+        daemon.process.lines.put_nowait("a.ts(1,7): error TS2322: Type 'string' is not assignable to type 'number'.")
+        daemon.process.lines.put_nowait("Found 1 error. Watching for file changes.")
+        result = await check
+        daemon._reader_task.cancel()
+        return result
+
+    assert asyncio.run(run()) == (False, "a.ts(1,7): error TS2322: Type 'string' is not assignable to type 'number'.")
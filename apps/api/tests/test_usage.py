@@ -0,0 +1,53 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app.models.messages import Message
+from app.models.sessions import Session as ChatSession
+from app.services.usage import backfill_usage_rollups, get_project_usage, record_session_usage
+
+
+def add_session(db, project, **values):
+    session = ChatSession(id=str(uuid.uuid4()), project_id=project.id, cli_type="claude", **values)
+    db.add(session)
+    db.commit()
+    return session.id
+
+
+def test_runs_accumulate_into_one_rollup_row(db, project):
+    session_id = add_session(db, project, model="sonnet")
+    result = {"duration_ms": 1000, "total_cost_usd": 0.5, "num_turns": 2, "total_tokens": 100}
+
+    record_session_usage(db, session_id, "claude", "sonnet", result, messages=3, tools_used=1)
+    record_session_usage(db, session_id, "claude", "sonnet", result, messages=1)
+
+    usage = get_project_usage(db, project.id)
+    [row] = usage["rows"]
+    assert row["sessions"] == 1
+    assert row["turns"] == 4
+    assert row["messages"] == 4
+    assert row["total_tokens"] == 200
+    assert row["duration_ms"] == 2000
+    assert usage["totals"]["total_cost_usd"] == 1.0
+
+
+def test_backfill_counts_earlier_sessions_once(db, project):
+    started = datetime.utcnow() - timedelta(minutes=5)
+    session_id = add_session(db, project, started_at=started, completed_at=started + timedelta(seconds=30))
+    add_session(db, project, started_at=started)  # still running, left alone
+    for _ in range(2):
+        db.add(Message(
+            id=str(uuid.uuid4()), project_id=project.id, session_id=session_id, role="user",
+            message_type="chat", content="hi"
+        ))
+    db.commit()
+
+    with db.get_bind().begin() as connection:
+        assert backfill_usage_rollups(connection) == 1
+        assert backfill_usage_rollups(connection) == 0
+
+    totals = get_project_usage(db, project.id)["totals"]
+    assert totals["sessions"] == 1
+    assert totals["messages"] == 2
+    assert totals["duration_ms"] == 30000
+    db.expire_all()
+    assert db.get(ChatSession, session_id).duration_ms == 30000
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.db import writer
+
+
+@pytest.fixture
+def held_gate():
+    """The gate held by another (worker) session until the test ends"""
+    assert writer._write_lock.acquire(timeout=1)
+    yield
+    writer._write_lock.release()
+
+
+def test_event_loop_thread_never_waits_for_the_gate(held_gate):
+    session = SimpleNamespace(info={})
+
+    async def write():
+        started = time.monotonic()
+        writer._acquire(session)
+        return time.monotonic() - started
+
+    assert asyncio.run(write()) < 0.1
+    assert writer._LOCK_HELD_KEY not in session.info
+
+
+def test_worker_threads_queue_on_the_gate():
+    first, second = SimpleNamespace(info={}), SimpleNamespace(info={})
+    writer._acquire(first)
+    assert first.info[writer._LOCK_HELD_KEY]
+
+    acquired = threading.Event()
+
+    def worker():
+        writer._acquire(second)
+        acquired.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert not acquired.wait(0.1)
+
+    writer._after_transaction_end(first, SimpleNamespace(parent=None))
+    assert acquired.wait(1)
+    thread.join()
+    writer._after_transaction_end(second, SimpleNamespace(parent=None))
+    assert not writer._write_lock.locked()
+
+
+def test_event_loop_thread_takes_a_free_gate():
+    session = SimpleNamespace(info={})
+
+    async def write():
+        writer._acquire(session)
+
+    asyncio.run(write())
+    assert session.info[writer._LOCK_HELD_KEY]
+    writer._after_transaction_end(session, SimpleNamespace(parent=None))
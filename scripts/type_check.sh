@@ -2,9 +2,27 @@
 payload=$(cat)                     # STDIN 소비
 cd "$CLAUDE_PROJECT_DIR" || exit 2
 
+# Fast path: ask the API's incremental type-check daemon (see type_check_daemon.py)
+PORT_FILE="$CLAUDE_PROJECT_DIR/../data/typecheck.port"
+if [ -f "$PORT_FILE" ] && exec 3<>"/dev/tcp/127.0.0.1/$(cat "$PORT_FILE")" 2>/dev/null; then
+  printf '%s\n%s' "$(printf '%s' "$payload" | wc -c | tr -d ' ')" "$payload" >&3
+  read -r STATUS <&3
+  DIAGNOSTICS=$(cat <&3)
+  exec 3<&-
+  if [ "$STATUS" = "FAIL" ]; then
+    echo "$DIAGNOSTICS" >&2       # Claude 에 피드백
+    exit 2
+  fi
+  if [ "$STATUS" = "OK" ]; then
+    exit 0
+  fi
+  # UNAVAILABLE or no reply: the daemon cannot vouch for this edit, fall through
+fi
+
+# Fallback: cold full type check
 TSC_OUT=$(npx --no-install tsc --noEmit 2>&1)
 if [ $? -ne 0 ]; then
   echo "$TSC_OUT" >&2             # Claude 에 피드백
   exit 2
 fi
-exit 0                             # 통과 = 조용히
\ No newline at end of file
+exit 0                             # 통과 = 조용히